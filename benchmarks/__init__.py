@@ -0,0 +1,12 @@
+"""
+Offline, reproducible load benchmarks for the API.
+
+- ``datagen``: synthetic movies, genres, users and favorites
+- ``tmdb_stub``: local HTTP server answering like the TMDb API
+- ``scenarios``: request mixes (browse, search, detail, favorites churn, ...)
+- ``driver``: concurrent load driver reporting throughput and latency percentiles
+- ``results``: JSON result files and comparisons between runs
+
+Run them through the ``bench_seed``, ``bench_run`` and ``bench_compare``
+management commands.
+"""
@@ -0,0 +1,129 @@
+"""Synthetic, deterministic benchmark data"""
+from datetime import date, timedelta
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from movies.models import Genre, Movie, UserFavorite
+
+# Synthetic rows live far above real TMDb ids so they never collide
+SYNTHETIC_TMDB_ID_START = 900_000_000
+USERNAME_PREFIX = 'bench_user_'
+USER_PASSWORD = 'benchmark-password'
+
+GENRES = [
+    (28, 'Action'), (12, 'Adventure'), (16, 'Animation'), (35, 'Comedy'),
+    (80, 'Crime'), (99, 'Documentary'), (18, 'Drama'), (10751, 'Family'),
+    (14, 'Fantasy'), (36, 'History'), (27, 'Horror'), (10402, 'Music'),
+    (9648, 'Mystery'), (10749, 'Romance'), (878, 'Science Fiction'),
+    (10770, 'TV Movie'), (53, 'Thriller'), (10752, 'War'), (37, 'Western'),
+]
+
+WORDS = [
+    'night', 'return', 'shadow', 'city', 'last', 'star', 'river', 'secret',
+    'empire', 'dream', 'storm', 'lost', 'king', 'game', 'fire', 'ghost',
+    'legend', 'road', 'winter', 'heart', 'silent', 'edge', 'dark', 'island',
+    'journey', 'war', 'summer', 'machine', 'echo', 'garden', 'blood', 'light',
+]
+
+
+def synthetic_title(rng: random.Random) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))).title()
+
+
+def synthetic_overview(rng: random.Random) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(30, 90))).capitalize() + '.'
+
+
+def synthetic_movie_fields(tmdb_id: int) -> dict:
+    """Field values for a synthetic movie, derived from its TMDb id only"""
+    rng = random.Random(tmdb_id)
+    title = synthetic_title(rng)
+    return {
+        'tmdb_id': tmdb_id,
+        'title': title,
+        'original_title': title,
+        'overview': synthetic_overview(rng),
+        'tagline': synthetic_title(rng),
+        'release_date': date(1970, 1, 1) + timedelta(days=rng.randint(0, 20000)),
+        'poster_path': f'/{tmdb_id}.jpg',
+        'backdrop_path': f'/{tmdb_id}_backdrop.jpg',
+        'vote_average': round(rng.uniform(2.0, 9.5), 1),
+        'vote_count': rng.randint(0, 20000),
+        'popularity': round(rng.uniform(0.5, 500.0), 3),
+        'runtime': rng.randint(70, 180),
+        'original_language': rng.choice(['en', 'en', 'en', 'fr', 'es', 'ja', 'ko']),
+    }
+
+
+def synthetic_genre_ids(tmdb_id: int) -> list:
+    rng = random.Random(-tmdb_id)
+    return [genre_id for genre_id, _ in rng.sample(GENRES, rng.randint(1, 4))]
+
+
+@transaction.atomic
+def generate(movies=1000, users=50, favorites_per_user=20, seed=42, batch_size=1000) -> dict:
+    """Create (or top up) a synthetic dataset; returns row counts
+
+    Re-running with the same arguments is a no-op, so datasets are
+    reproducible between benchmark runs and machines.
+    """
+    genres = {}
+    for tmdb_id, name in GENRES:
+        genre, _ = Genre.objects.get_or_create(tmdb_id=tmdb_id, defaults={'name': name})
+        genres[tmdb_id] = genre.id
+
+    tmdb_ids = range(SYNTHETIC_TMDB_ID_START, SYNTHETIC_TMDB_ID_START + movies)
+    existing = set(Movie.objects.filter(tmdb_id__in=tmdb_ids).values_list('tmdb_id', flat=True))
+    missing = [tmdb_id for tmdb_id in tmdb_ids if tmdb_id not in existing]
+
+    Through = Movie.genres.through
+    for start in range(0, len(missing), batch_size):
+        chunk = missing[start:start + batch_size]
+        Movie.objects.bulk_create(
+            [Movie(**synthetic_movie_fields(tmdb_id)) for tmdb_id in chunk], batch_size=batch_size
+        )
+        movie_ids = dict(Movie.objects.filter(tmdb_id__in=chunk).values_list('tmdb_id', 'id'))
+        Through.objects.bulk_create([
+            Through(movie_id=movie_ids[tmdb_id], genre_id=genres[genre_tmdb_id])
+            for tmdb_id in chunk
+            for genre_tmdb_id in synthetic_genre_ids(tmdb_id)
+        ], batch_size=batch_size, ignore_conflicts=True)
+
+    usernames = [f'{USERNAME_PREFIX}{i}' for i in range(users)]
+    existing_users = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+    # Hash once and share it; benchmarks shouldn't spend minutes in PBKDF2
+    password = make_password(USER_PASSWORD)
+    User.objects.bulk_create([
+        User(username=username, email=f'{username}@example.com', password=password)
+        for username in usernames if username not in existing_users
+    ], batch_size=batch_size)
+
+    rng = random.Random(seed)
+    movie_ids = list(
+        Movie.objects.filter(tmdb_id__in=tmdb_ids).order_by('tmdb_id').values_list('id', flat=True)
+    )
+    user_ids = list(User.objects.filter(username__in=usernames).order_by('id').values_list('id', flat=True))
+    favorites = [
+        UserFavorite(user_id=user_id, movie_id=movie_id)
+        for user_id in user_ids
+        for movie_id in rng.sample(movie_ids, min(favorites_per_user, len(movie_ids)))
+    ]
+    UserFavorite.objects.bulk_create(favorites, batch_size=batch_size, ignore_conflicts=True)
+
+    return {
+        'movies': len(movie_ids),
+        'genres': len(genres),
+        'users': len(user_ids),
+        'favorites': UserFavorite.objects.filter(user_id__in=user_ids).count(),
+    }
+
+
+@transaction.atomic
+def clear() -> dict:
+    """Delete every synthetic row"""
+    movies, _ = Movie.objects.filter(tmdb_id__gte=SYNTHETIC_TMDB_ID_START).delete()
+    users, _ = User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+    return {'movies': movies, 'users': users}
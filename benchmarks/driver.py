@@ -0,0 +1,121 @@
+"""Threaded HTTP load driver"""
+from collections import Counter, defaultdict
+from http.cookiejar import DefaultCookiePolicy
+from typing import Callable, Dict, List
+import random
+import threading
+import time
+
+import requests
+
+
+def percentile(values, q):
+    """Return the q-th percentile (0-100) of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies: List[float], statuses: Counter, errors: int, duration: float) -> dict:
+    return {
+        'requests': len(latencies),
+        'rps': round(len(latencies) / duration, 2) if duration else 0.0,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p90_ms': round(percentile(latencies, 90), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'max_ms': round(max(latencies), 3) if latencies else 0.0,
+        'statuses': {str(code): count for code, count in sorted(statuses.items())},
+        'errors': errors,
+    }
+
+
+class LoadDriver:
+    """Runs a request picker from N threads for a fixed duration
+
+    Every thread has its own session and a random generator seeded from the
+    run seed, so the same seed replays the same request sequence per thread.
+    """
+
+    def __init__(self, base_url: str, pick: Callable, context, concurrency=8, duration=10.0,
+                 seed=42, warmup=0.0, timeout=30.0):
+        self.base_url = base_url.rstrip('/')
+        self.pick = pick
+        self.context = context
+        self.concurrency = concurrency
+        self.duration = duration
+        self.seed = seed
+        self.warmup = warmup
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, List[float]] = defaultdict(list)
+        self._statuses: Dict[str, Counter] = defaultdict(Counter)
+        self._errors: Counter = Counter()
+
+    def _worker(self, index: int, start_at: float, record_after: float, stop_at: float):
+        rng = random.Random(f'{self.seed}:{index}')
+        session = requests.Session()
+        # Behave like token API clients: a session cookie from login would
+        # otherwise switch later requests to CSRF-checked session auth
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        latencies = defaultdict(list)
+        statuses = defaultdict(Counter)
+        errors = Counter()
+
+        while time.monotonic() < start_at:
+            time.sleep(0.001)
+
+        while True:
+            now = time.monotonic()
+            if now >= stop_at:
+                break
+            label, method, path, kwargs = self.pick(rng, self.context)
+            start = time.perf_counter()
+            try:
+                response = session.request(method, self.base_url + path, timeout=self.timeout, **kwargs)
+                status = response.status_code
+            except requests.RequestException:
+                status = None
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+            if now < record_after:
+                continue
+            latencies[label].append(elapsed_ms)
+            if status is None:
+                errors[label] += 1
+            else:
+                statuses[label][status] += 1
+
+        with self._lock:
+            for label, values in latencies.items():
+                self._latencies[label].extend(values)
+            for label, counts in statuses.items():
+                self._statuses[label].update(counts)
+            self._errors.update(errors)
+
+    def run(self) -> dict:
+        start_at = time.monotonic() + 0.05
+        record_after = start_at + self.warmup
+        stop_at = record_after + self.duration
+
+        threads = [
+            threading.Thread(target=self._worker, args=(i, start_at, record_after, stop_at), daemon=True)
+            for i in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        all_latencies = [value for values in self._latencies.values() for value in values]
+        all_statuses = sum(self._statuses.values(), Counter())
+        return {
+            'overall': summarize(all_latencies, all_statuses, sum(self._errors.values()), self.duration),
+            'endpoints': {
+                label: summarize(self._latencies[label], self._statuses[label], self._errors[label], self.duration)
+                for label in sorted(self._latencies)
+            },
+        }
@@ -0,0 +1,76 @@
+"""Benchmark result files and run-to-run comparisons"""
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional
+import json
+import platform
+import subprocess
+
+from django.conf import settings
+
+# Metrics where a higher value is better; the rest are latencies
+HIGHER_IS_BETTER = {'rps'}
+COMPARED_METRICS = ['rps', 'p50_ms', 'p95_ms', 'p99_ms']
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, stderr=subprocess.DEVNULL, text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_meta(scenario: str, options: dict, dataset: dict) -> dict:
+    return {
+        'scenario': scenario,
+        'git_commit': git_revision(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'database': settings.DATABASES['default']['ENGINE'].rsplit('.', 1)[-1],
+        'cache': settings.CACHES['default']['BACKEND'].rsplit('.', 1)[-1],
+        'options': options,
+        'dataset': dataset,
+    }
+
+
+def default_path(meta: dict) -> Path:
+    stamp = meta['timestamp'].replace(':', '').replace('-', '')[:15]
+    return Path(settings.BASE_DIR) / 'benchmarks' / 'results' / (
+        f"{meta['scenario']}-{meta['git_commit'] or 'nogit'}-{stamp}.json"
+    )
+
+
+def save(result: dict, path: Optional[Path] = None) -> Path:
+    path = Path(path) if path else default_path(result['meta'])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(result, indent=2, sort_keys=True) + '\n')
+    return path
+
+
+def load(path) -> dict:
+    return json.loads(Path(path).read_text())
+
+
+def compare(baseline: dict, candidate: dict, threshold: float = 0.1) -> List[dict]:
+    """Per-endpoint metric changes; ``regression`` marks changes worse than the threshold"""
+    rows = []
+    sections = [('overall', baseline['overall'], candidate['overall'])] + [
+        (label, baseline['endpoints'][label], candidate['endpoints'][label])
+        for label in sorted(set(baseline['endpoints']) & set(candidate['endpoints']))
+    ]
+    for label, before, after in sections:
+        for metric in COMPARED_METRICS:
+            old, new = before.get(metric, 0.0), after.get(metric, 0.0)
+            change = (new - old) / old if old else 0.0
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            rows.append({
+                'endpoint': label,
+                'metric': metric,
+                'baseline': old,
+                'candidate': new,
+                'change': round(change, 4),
+                'regression': worse > threshold,
+            })
+    return rows
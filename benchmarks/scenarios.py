@@ -0,0 +1,179 @@
+"""
+Request mixes for the load driver.
+
+A scenario is a weighted list of request builders. Each builder receives a
+per-thread ``random.Random`` and the shared ``ScenarioContext`` and returns
+``(label, method, path, kwargs)``; the label groups latencies in the report.
+"""
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+import random
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+from movies.models import Genre, Movie, UserFavorite
+from users.tokens import UserClaimsRefreshToken
+
+from .datagen import USER_PASSWORD, USERNAME_PREFIX, WORDS
+
+RequestSpec = Tuple[str, str, str, dict]
+
+
+@dataclass
+class ScenarioContext:
+    """Ids and credentials sampled from the database before a run"""
+    tmdb_ids: List[int]
+    movie_ids: List[int]
+    genres: List[str]
+    usernames: List[str]
+    # (access token, ids of that user's seeded favorites)
+    users: List[Tuple[str, List[int]]] = field(default_factory=list)
+
+    @classmethod
+    def load(cls, sample_size=2000, with_tokens=False, token_count=20) -> 'ScenarioContext':
+        movies = list(Movie.objects.order_by('id').values_list('id', 'tmdb_id')[:sample_size])
+        usernames = list(
+            User.objects.filter(username__startswith=USERNAME_PREFIX)
+            .order_by('id')
+            .values_list('username', flat=True)
+        )
+        context = cls(
+            tmdb_ids=[tmdb_id for _, tmdb_id in movies],
+            movie_ids=[movie_id for movie_id, _ in movies],
+            genres=list(Genre.objects.order_by('name').values_list('name', flat=True)),
+            usernames=usernames,
+        )
+        if with_tokens:
+            users = User.objects.filter(username__in=usernames[:token_count]).order_by('id')
+            for user in users:
+                favorite_ids = list(UserFavorite.objects.filter(user=user).values_list('movie_id', flat=True))
+                token = str(UserClaimsRefreshToken.for_user(user).access_token)
+                context.users.append((token, favorite_ids or context.movie_ids[:20]))
+        return context
+
+    def pick_user(self, rng: random.Random) -> Tuple[dict, List[int]]:
+        """Auth kwargs for a random user and the movie ids that user churns over"""
+        token, movie_ids = rng.choice(self.users)
+        return {'headers': {'Authorization': f'Bearer {token}'}}, movie_ids
+
+
+def movie_list(rng, ctx):
+    return 'movie-list', 'GET', f'/api/movies/?page={rng.randint(1, 5)}', {}
+
+
+def movie_list_by_genre(rng, ctx):
+    return 'movie-list:genre', 'GET', f'/api/movies/?genre={rng.choice(ctx.genres)}', {}
+
+
+def trending(rng, ctx):
+    return 'trending-movies', 'GET', '/api/movies/trending/', {}
+
+
+def recommended(rng, ctx):
+    return 'recommended-movies', 'GET', '/api/movies/recommended/', {}
+
+
+def genres(rng, ctx):
+    return 'genre-list', 'GET', '/api/movies/genres/', {}
+
+
+def detail(rng, ctx):
+    return 'movie-detail', 'GET', f'/api/movies/{rng.choice(ctx.tmdb_ids)}/', {}
+
+
+def search(rng, ctx):
+    return 'movie-search', 'GET', f'/api/movies/search/?q={rng.choice(WORDS)}', {}
+
+
+def list_search(rng, ctx):
+    return 'movie-list:search', 'GET', f'/api/movies/?search={rng.choice(WORDS)}', {}
+
+
+def favorites_list(rng, ctx):
+    auth, _ = ctx.pick_user(rng)
+    return 'user-favorites', 'GET', '/api/movies/favorites/', auth
+
+
+# Adds and removes draw from the user's seeded favorites, so both hit
+# existing and missing rows about equally often
+def favorite_add(rng, ctx):
+    auth, movie_ids = ctx.pick_user(rng)
+    return 'favorite-add', 'POST', '/api/movies/favorites/', {'json': {'movie_id': rng.choice(movie_ids)}, **auth}
+
+
+def favorite_remove(rng, ctx):
+    auth, movie_ids = ctx.pick_user(rng)
+    return 'favorite-remove', 'DELETE', f'/api/movies/favorites/{rng.choice(movie_ids)}/delete/', auth
+
+
+def for_you(rng, ctx):
+    auth, _ = ctx.pick_user(rng)
+    return 'personalized-recommendations', 'GET', '/api/movies/recommended/for-you/', auth
+
+
+def login(rng, ctx):
+    return 'user-login', 'POST', '/api/auth/login/', {
+        'json': {'username': rng.choice(ctx.usernames), 'password': USER_PASSWORD},
+    }
+
+
+def clear_cache():
+    cache.clear()
+
+
+@dataclass
+class Scenario:
+    name: str
+    description: str
+    mix: List[Tuple[Callable, int]]
+    needs_users: bool = False
+    needs_tokens: bool = False
+    # Runs before the first request, e.g. to start from a cold cache
+    setup: Optional[Callable[[], None]] = None
+
+    def build_picker(self) -> Callable[[random.Random, ScenarioContext], RequestSpec]:
+        builders = [builder for builder, _ in self.mix]
+        weights = [weight for _, weight in self.mix]
+
+        def pick(rng, ctx):
+            return rng.choices(builders, weights)[0](rng, ctx)
+        return pick
+
+
+SCENARIOS: Dict[str, Scenario] = {scenario.name: scenario for scenario in [
+    Scenario(
+        'browse',
+        'Anonymous browsing: lists, genres, trending and recommended',
+        [(movie_list, 40), (movie_list_by_genre, 20), (trending, 15), (recommended, 15), (genres, 10)],
+    ),
+    Scenario(
+        'search',
+        'Anonymous title/overview search',
+        [(search, 70), (list_search, 30)],
+    ),
+    Scenario(
+        'detail',
+        'Anonymous movie detail pages across the sampled catalogue',
+        [(detail, 100)],
+    ),
+    Scenario(
+        'favorites_churn',
+        'Authenticated users adding, removing and reading favorites',
+        [(favorite_add, 30), (favorite_remove, 20), (favorites_list, 30), (for_you, 20)],
+        needs_users=True,
+        needs_tokens=True,
+    ),
+    Scenario(
+        'cold_cache_storm',
+        'Mixed read traffic starting from an empty cache',
+        [(movie_list, 30), (detail, 30), (trending, 15), (recommended, 15), (genres, 10)],
+        setup=clear_cache,
+    ),
+    Scenario(
+        'login_storm',
+        'Concurrent logins with valid credentials',
+        [(login, 100)],
+        needs_users=True,
+    ),
+]}
@@ -0,0 +1,173 @@
+"""
+Local stand-in for the TMDb API.
+
+Answers the endpoints ``TMDbService`` uses with deterministic payloads
+(the same ids always produce the same movies), with configurable latency
+and error rate so upstream slowness and outages can be reproduced.
+
+    python -m benchmarks.tmdb_stub --port 8001 --latency 0.05
+    TMDB_BASE_URL=http://127.0.0.1:8001/3 python manage.py runserver
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import argparse
+import json
+import random
+import re
+import threading
+import time
+
+from .datagen import GENRES, SYNTHETIC_TMDB_ID_START, synthetic_title, synthetic_overview
+
+PAGE_SIZE = 20
+TOTAL_PAGES = 500
+
+STATUS_NAMES = ['Released'] * 8 + ['Post Production', 'In Production']
+
+
+def movie_summary(tmdb_id: int) -> dict:
+    rng = random.Random(tmdb_id)
+    title = synthetic_title(rng)
+    return {
+        'id': tmdb_id,
+        'title': title,
+        'original_title': title,
+        'overview': synthetic_overview(rng),
+        'release_date': f'{rng.randint(1970, 2025)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}',
+        'poster_path': f'/{tmdb_id}.jpg',
+        'backdrop_path': f'/{tmdb_id}_backdrop.jpg',
+        'vote_average': round(rng.uniform(2.0, 9.5), 1),
+        'vote_count': rng.randint(0, 20000),
+        'popularity': round(rng.uniform(0.5, 500.0), 3),
+        'original_language': rng.choice(['en', 'en', 'en', 'fr', 'es', 'ja', 'ko']),
+        'genre_ids': [genre_id for genre_id, _ in rng.sample(GENRES, rng.randint(1, 4))],
+        'adult': False,
+        'video': False,
+    }
+
+
+def movie_details(tmdb_id: int) -> dict:
+    rng = random.Random(-tmdb_id)
+    details = movie_summary(tmdb_id)
+    genre_ids = details.pop('genre_ids')
+    details.update({
+        'genres': [{'id': genre_id, 'name': dict(GENRES)[genre_id]} for genre_id in genre_ids],
+        'imdb_id': f'tt{tmdb_id % 10000000:07d}',
+        'tagline': synthetic_title(rng),
+        'runtime': rng.randint(70, 180),
+        'budget': rng.randint(0, 200) * 1000000,
+        'revenue': rng.randint(0, 900) * 1000000,
+        'status': rng.choice(STATUS_NAMES),
+    })
+    return details
+
+
+def movie_page(seed: str, page: int) -> dict:
+    """A page of movies for a list endpoint; ids are stable per (seed, page)"""
+    rng = random.Random(f'{seed}:{page}')
+    start = SYNTHETIC_TMDB_ID_START
+    results = [movie_summary(start + rng.randint(0, 50000)) for _ in range(PAGE_SIZE)]
+    return {
+        'page': page,
+        'results': results,
+        'total_pages': TOTAL_PAGES,
+        'total_results': TOTAL_PAGES * PAGE_SIZE,
+    }
+
+
+ROUTES = [
+    (re.compile(r'^genre/movie/list$'), lambda match, query: {
+        'genres': [{'id': genre_id, 'name': name} for genre_id, name in GENRES],
+    }),
+    (re.compile(r'^movie/(\d+)$'), lambda match, query: movie_details(int(match.group(1)))),
+    (re.compile(r'^movie/(\d+)/(recommendations|similar)$'), lambda match, query: movie_page(
+        match.group(0), int(query.get('page', 1)),
+    )),
+    (re.compile(r'^(movie/popular|movie/top_rated|movie/now_playing|movie/upcoming|trending/movie/\w+)$'),
+     lambda match, query: movie_page(match.group(1), int(query.get('page', 1)))),
+    (re.compile(r'^search/movie$'), lambda match, query: movie_page(
+        f"search:{query.get('query', '')}", int(query.get('page', 1)),
+    )),
+    (re.compile(r'^discover/movie$'), lambda match, query: movie_page(
+        'discover:' + json.dumps(sorted(query.items())), int(query.get('page', 1)),
+    )),
+]
+
+
+class TMDbStubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        path = re.sub(r'^/3/', '', url.path).strip('/')
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        with server.stats_lock:
+            server.request_count += 1
+
+        if server.latency:
+            time.sleep(server.latency * random.uniform(0.5, 1.5))
+
+        if server.error_rate and random.random() < server.error_rate:
+            return self.respond(503, {'status_code': 503, 'status_message': 'Service unavailable'})
+
+        for pattern, handler in ROUTES:
+            match = pattern.match(path)
+            if match:
+                return self.respond(200, handler(match, query))
+
+        self.respond(404, {'status_code': 34, 'status_message': 'The resource could not be found.'})
+
+    def respond(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json;charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TMDbStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.0, error_rate=0.0):
+        super().__init__(address, TMDbStubHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.request_count = 0
+        self.stats_lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/3'
+
+
+def start_stub(port=0, latency=0.0, error_rate=0.0) -> TMDbStubServer:
+    """Start the stub on a background thread; ``port=0`` picks a free port"""
+    server = TMDbStubServer(('127.0.0.1', port), latency=latency, error_rate=error_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--latency', type=float, default=0.0, help='Mean response delay in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 503')
+    args = parser.parse_args()
+
+    server = TMDbStubServer(('127.0.0.1', args.port), latency=args.latency, error_rate=args.error_rate)
+    print(f'TMDb stub listening on {server.base_url}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
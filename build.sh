@@ -9,6 +9,10 @@ echo "Starting build process..."
 echo "Installing Python dependencies..."
 pip install -r requirements.txt
 
+# Generate the API schemas served by /api/schema/ and /swagger.json
+echo "Building API schemas..."
+python manage.py build_schema
+
 # Collect static files
 echo "Collecting static files..."
 python manage.py collectstatic --no-input
@@ -17,8 +21,7 @@ python manage.py collectstatic --no-input
 echo "Running database migrations..."
 python manage.py migrate
 
-# Populate initial data (optional - only on first deploy)
-echo "Populating movie data..."
-python manage.py populate_movies --pages 2 --categories popular trending
+# Movie data is ingested by Celery (beat runs movies.tasks.refresh_catalog);
+# to fill a new database right away: python manage.py populate_movies --async
 
 echo "Build completed successfully!"
\ No newline at end of file
@@ -0,0 +1,20 @@
+"""
+Gunicorn configuration, read from the working directory by default
+(``gunicorn movie_backend.wsgi``).
+
+Workers are threaded (gthread): each process serves up to ``WEB_THREADS``
+requests at once. The per-process limits in the app (adaptive concurrency
+in ``movie_backend/concurrency.py``, password hashing slots in
+``users/services/hashing_service.py``) act on those concurrent requests;
+with sync workers a process only ever has one request in flight.
+"""
+import os
+
+wsgi_app = "movie_backend.wsgi:application"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+worker_class = "gthread"
+threads = int(os.environ.get("WEB_THREADS", 8))
+timeout = int(os.environ.get("WEB_TIMEOUT", 30))
+# Recycle workers now and then; staggered so they don't all restart together
+max_requests = int(os.environ.get("WEB_MAX_REQUESTS", 2000))
+max_requests_jitter = max_requests // 10
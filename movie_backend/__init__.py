@@ -0,0 +1,14 @@
+# The Celery app loads on first use, not on every Django startup (importing
+# celery costs each web worker and management command about 50 ms).
+# movies.tasks imports it, and `celery -A movie_backend` finds movie_backend.celery.
+
+
+def __getattr__(name):
+    if name == "celery_app":
+        from .celery import app
+
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ("celery_app",)
@@ -0,0 +1,61 @@
+"""
+Celery application.
+
+Workers run ingestion and cache jobs from ``movies.tasks``; ``celery beat``
+schedules the periodic ones (``CELERY_BEAT_SCHEDULE``). Every task records
+its wall time, DB queries and TMDb calls into the metrics registry under
+``task:<name>``, next to the API endpoints.
+
+    celery -A movie_backend worker -l info
+    celery -A movie_backend beat -l info
+"""
+from contextlib import ExitStack
+from celery import Celery, Task
+from celery.exceptions import Retry
+from django.db import connections
+import os
+import time
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "movie_backend.settings")
+
+
+class InstrumentedTask(Task):
+    """Task that records per-task metrics, like RequestMetricsMiddleware does for views"""
+
+    def __call__(self, *args, **kwargs):
+        from movie_backend import metrics
+
+        collector = metrics.RequestMetrics()
+        token = metrics.current_request.set(collector)
+        outcome, wall_ms = 'failures', 0.0
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(collector.db_wrapper))
+                start = time.perf_counter()
+                try:
+                    # A worker (or apply()) has already pushed the request;
+                    # Task.__call__ would push a bare one over it and retry()
+                    # would then re-raise instead of retrying
+                    if self.request.called_directly:
+                        result = super().__call__(*args, **kwargs)
+                    else:
+                        result = self.run(*args, **kwargs)
+                    outcome = 'successes'
+                    return result
+                except Retry:
+                    outcome = 'retries'
+                    raise
+                finally:
+                    wall_ms = (time.perf_counter() - start) * 1000
+        finally:
+            metrics.current_request.reset(token)
+            name = f'task:{self.name}'
+            collector.record_into(metrics.registry, name, wall_ms)
+            metrics.registry.record(name, outcome, 1)
+            metrics.registry.maybe_flush()
+
+
+app = Celery("movie_backend", task_cls=InstrumentedTask)
+app.config_from_object("django.conf:settings", namespace="CELERY")
+app.autodiscover_tasks()
@@ -0,0 +1,109 @@
+"""
+Circuit breaker shared by every worker through the default cache.
+
+closed:    calls go through; failures are counted in a sliding window
+open:      calls are rejected immediately until ``reset_timeout`` passes
+half-open: one caller, across all workers, may probe the upstream (claimed
+           with an atomic ``cache.add``); success closes the circuit and
+           failure opens it again
+
+State lives in the Django cache, so with Redis all workers trip and recover
+together; with a local-memory cache each process keeps its own circuit.
+Cache errors fail open (the call is allowed).
+"""
+from django.core.cache import cache
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, failure_threshold: int = 5, failure_window: int = 30,
+                 reset_timeout: int = 30, probe_timeout: int = 15):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.failure_window = failure_window
+        self.reset_timeout = reset_timeout
+        self.probe_timeout = probe_timeout
+        # Whether the current thread holds the half-open probe
+        self._local = threading.local()
+
+    def _key(self, part: str) -> str:
+        return f"circuit:{self.name}:{part}"
+
+    def state(self) -> str:
+        try:
+            values = cache.get_many([self._key('open'), self._key('tripped')])
+        except Exception as e:
+            logger.error(f"Circuit {self.name} state error: {e}")
+            return self.CLOSED
+        if self._key('open') in values:
+            return self.OPEN
+        if self._key('tripped') in values:
+            return self.HALF_OPEN
+        return self.CLOSED
+
+    def allow(self) -> bool:
+        """Whether a call may go to the upstream now"""
+        self._local.probing = False
+        state = self.state()
+        if state == self.CLOSED:
+            return True
+        if state == self.OPEN:
+            return False
+        try:
+            self._local.probing = cache.add(self._key('probe'), 1, self.probe_timeout)
+        except Exception as e:
+            logger.error(f"Circuit {self.name} probe error: {e}")
+            return True
+        return self._local.probing
+
+    def record_success(self):
+        if getattr(self._local, 'probing', False):
+            self._local.probing = False
+            self.close()
+
+    def record_failure(self):
+        if getattr(self._local, 'probing', False):
+            self._local.probing = False
+            self.trip()
+            return
+
+        key = self._key('failures')
+        try:
+            cache.add(key, 0, self.failure_window)
+            failures = cache.incr(key)
+        except ValueError:
+            # Expired between add and incr; this failure starts a new window
+            cache.set(key, 1, self.failure_window)
+            failures = 1
+        except Exception as e:
+            logger.error(f"Circuit {self.name} failure count error: {e}")
+            return
+        if failures >= self.failure_threshold:
+            self.trip()
+
+    def trip(self):
+        """Open the circuit for ``reset_timeout`` seconds"""
+        try:
+            cache.set(self._key('open'), 1, self.reset_timeout)
+            # Outlives the open key; while only this is set the circuit is half-open
+            cache.set(self._key('tripped'), 1, self.reset_timeout + 60 * 60)
+            cache.delete_many([self._key('failures'), self._key('probe')])
+            logger.warning(f"Circuit {self.name} opened for {self.reset_timeout}s")
+        except Exception as e:
+            logger.error(f"Circuit {self.name} trip error: {e}")
+
+    def close(self):
+        try:
+            cache.delete_many([
+                self._key('open'), self._key('tripped'), self._key('failures'), self._key('probe'),
+            ])
+            logger.info(f"Circuit {self.name} closed")
+        except Exception as e:
+            logger.error(f"Circuit {self.name} close error: {e}")
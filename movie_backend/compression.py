@@ -0,0 +1,86 @@
+"""
+Response body compression: Accept-Encoding negotiation and codecs.
+
+Brotli is used when the ``brotli`` package is installed and the client
+accepts it, gzip otherwise. Levels come from ``COMPRESSION``;
+``manage.py bench_compression`` shows the CPU/size tradeoff of each level.
+"""
+from typing import Iterable, Iterator, Optional
+import gzip
+import zlib
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+
+def _gzip_compress(data: bytes, level: int) -> bytes:
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _gzip_stream(chunks: Iterable[bytes], level: int) -> Iterator[bytes]:
+    # wbits=31: gzip container
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _brotli_compress(data: bytes, level: int) -> bytes:
+    return brotli.compress(data, quality=level, mode=brotli.MODE_TEXT)
+
+
+def _brotli_stream(chunks: Iterable[bytes], level: int) -> Iterator[bytes]:
+    compressor = brotli.Compressor(quality=level, mode=brotli.MODE_TEXT)
+    for chunk in chunks:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+# encoding -> (compress, stream, decompress), in server preference order
+CODECS = {}
+if brotli is not None:
+    CODECS['br'] = (_brotli_compress, _brotli_stream, brotli.decompress)
+CODECS['gzip'] = (_gzip_compress, _gzip_stream, gzip.decompress)
+
+
+def negotiate(accept_encoding: str, available=None) -> Optional[str]:
+    """Preferred encoding in ``available`` that the client accepts, or None"""
+    accepted = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+
+    for encoding in available if available is not None else CODECS:
+        if accepted.get(encoding, accepted.get('*', 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress(encoding: str, data: bytes, level: int) -> bytes:
+    return CODECS[encoding][0](data, level)
+
+
+def compress_stream(encoding: str, chunks: Iterable[bytes], level: int) -> Iterator[bytes]:
+    """Compress a streaming body, flushing after every chunk"""
+    return CODECS[encoding][1](chunks, level)
+
+
+def decompress(encoding: str, data: bytes) -> bytes:
+    return CODECS[encoding][2](data)
@@ -0,0 +1,177 @@
+"""
+Adaptive concurrency limits per endpoint class.
+
+Each class (cheap reads, searches, TMDb-filling lookups) has a limit on
+requests in flight in this worker process, adjusted from the latencies it
+observes, in the style of the gradient limiter:
+
+- Latencies are averaged over windows of ``WINDOW_SECONDS`` (and at least
+  ``MIN_SAMPLES`` requests) and compared with a slow moving average of past
+  windows (the baseline), which takes minutes to follow a slowdown. While the
+  window stays within ``TOLERANCE`` times the baseline the limit grows by
+  about its square root per window; when latency rises past it the limit
+  shrinks in proportion (by at most half per window).
+- Server errors cut the limit multiplicatively (``BACKOFF``).
+- The limit only grows while the class actually uses half of it, so a
+  quiet period doesn't leave an inflated limit behind.
+
+Classes have priorities: while a higher-priority class is congested (its
+latency is over tolerance, or it shed a request within the last
+``CONGESTION_SECONDS``), lower-priority classes are held to their minimum
+limit, so expensive endpoints give way to the cheap ones first. Limits are
+per process and need no coordination; every worker sees the same slow
+database or TMDb and backs off on its own. They count the requests a
+process serves at once, so they need threaded workers (``gunicorn.conf.py``).
+"""
+from typing import Dict, Optional
+from django.conf import settings
+import math
+import os
+import threading
+import time
+
+
+class AdaptiveLimit:
+    """Gradient/AIMD concurrency limit for one endpoint class"""
+
+    def __init__(self, name: str, priority: int = 0, initial_limit: int = 20, min_limit: int = 2,
+                 max_limit: int = 200, tolerance: float = 2.0, smoothing: float = 0.2,
+                 backoff: float = 0.9, window_seconds: float = 0.5, min_samples: int = 10,
+                 baseline_windows: int = 600,
+                 congestion_seconds: float = 1.0):
+        self.name = name
+        self.priority = priority
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.backoff = backoff
+        self.window_seconds = window_seconds
+        self.min_samples = min_samples
+        self.baseline_windows = baseline_windows
+        self.congestion_seconds = congestion_seconds
+
+        self.limit = float(initial_limit)
+        self.inflight = 0
+        self.baseline_ms: Optional[float] = None
+        self.congested_until = 0.0
+        self.shed = 0
+        self._window_total = 0.0
+        self._window_count = 0
+        self._window_peak = 0
+        self._window_start = time.monotonic()
+        self._lock = threading.Lock()
+
+    def congested(self) -> bool:
+        return time.monotonic() < self.congested_until
+
+    def try_acquire(self, limit: Optional[float] = None) -> bool:
+        """Take an in-flight slot unless the class is at its (or the given) limit"""
+        with self._lock:
+            if self.inflight >= math.floor(self.limit if limit is None else min(limit, self.limit)):
+                self.shed += 1
+                self.congested_until = time.monotonic() + self.congestion_seconds
+                return False
+            self.inflight += 1
+            self._window_peak = max(self._window_peak, self.inflight)
+            return True
+
+    def release(self, latency_ms: float, failed: bool = False):
+        """Give back a slot and feed the request's outcome into the limit"""
+        with self._lock:
+            self.inflight -= 1
+            if failed:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                return
+            self._window_total += latency_ms
+            self._window_count += 1
+            now = time.monotonic()
+            if self._window_count >= self.min_samples and now - self._window_start >= self.window_seconds:
+                self._window_start = now
+                self._update(self._window_total / self._window_count)
+
+    def _update(self, latency_ms: float):
+        peak = self._window_peak
+        self._window_total, self._window_count, self._window_peak = 0.0, 0, self.inflight
+
+        if self.baseline_ms is None:
+            self.baseline_ms = latency_ms
+        else:
+            self.baseline_ms += (latency_ms - self.baseline_ms) / self.baseline_windows
+            if self.baseline_ms > latency_ms * 2:
+                # Latency has settled lower than the baseline remembers; catch up
+                self.baseline_ms *= 0.95
+
+        gradient = max(0.5, min(1.0, self.tolerance * self.baseline_ms / max(latency_ms, 1e-3)))
+        if gradient < 1.0:
+            self.congested_until = time.monotonic() + self.congestion_seconds
+        elif peak < self.limit / 2:
+            return
+        target = self.limit * gradient + math.sqrt(self.limit)
+        self.limit = self.limit * (1 - self.smoothing) + target * self.smoothing
+        self.limit = max(self.min_limit, min(self.max_limit, self.limit))
+
+    def status(self) -> dict:
+        return {
+            'priority': self.priority,
+            'limit': round(self.limit, 1),
+            'inflight': self.inflight,
+            'baseline_ms': round(self.baseline_ms, 1) if self.baseline_ms is not None else None,
+            'congested': self.congested(),
+            'shed': self.shed,
+        }
+
+
+class ConcurrencyLimiter:
+    """The per-process set of class limits, built from ``ADAPTIVE_CONCURRENCY['CLASSES']``"""
+
+    def __init__(self):
+        self.options = getattr(settings, 'ADAPTIVE_CONCURRENCY', {})
+        self._limits: Dict[str, AdaptiveLimit] = {}
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _build(self) -> Dict[str, AdaptiveLimit]:
+        shared = {
+            key.lower(): self.options[key]
+            for key in (
+                'TOLERANCE', 'SMOOTHING', 'BACKOFF', 'WINDOW_SECONDS', 'MIN_SAMPLES',
+                'BASELINE_WINDOWS', 'CONGESTION_SECONDS',
+            )
+            if key in self.options
+        }
+        return {
+            name: AdaptiveLimit(
+                name,
+                priority=spec.get('PRIORITY', 0),
+                initial_limit=spec.get('INITIAL_LIMIT', 20),
+                min_limit=spec.get('MIN_LIMIT', 2),
+                max_limit=spec.get('MAX_LIMIT', 200),
+                **shared,
+            )
+            for name, spec in self.options.get('CLASSES', {}).items()
+        }
+
+    def limits(self) -> Dict[str, AdaptiveLimit]:
+        # Counters inherited through fork describe the parent's requests
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._limits = self._build()
+                    self._pid = os.getpid()
+        return self._limits
+
+    def acquire(self, name: str) -> Optional[AdaptiveLimit]:
+        """The class's limit with a slot taken, or None when the request should be shed"""
+        limits = self.limits()
+        limit = limits[name]
+        ceiling = None
+        if any(other.priority < limit.priority and other.congested() for other in limits.values()):
+            ceiling = limit.min_limit
+        return limit if limit.try_acquire(ceiling) else None
+
+    def status(self) -> dict:
+        return {name: limit.status() for name, limit in self.limits().items()}
+
+
+concurrency_limiter = ConcurrencyLimiter()
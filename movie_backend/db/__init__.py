@@ -0,0 +1,31 @@
+"""
+Database connection strategy helpers.
+
+``DB_CONNECTION_MODE`` picks how Django gets Postgres connections:
+``pool`` (the ``postgresql_pool`` backend, a psycopg_pool pool per worker
+process), ``persistent`` (``CONN_MAX_AGE`` with health checks) or
+``per_request`` (a new connection per request).
+"""
+from django.db import connections
+import os
+
+_fork_handler_installed = False
+
+
+def _forget_inherited_connections():
+    """Drop connections inherited from the parent process
+
+    The socket belongs to the parent's session, so it must be neither used
+    nor closed (closing would end the parent's session); the child opens
+    its own on first use.
+    """
+    for connection in connections.all(initialized_only=True):
+        connection.connection = None
+
+
+def install_fork_handler():
+    """Make persistent connections safe when gunicorn forks after they opened"""
+    global _fork_handler_installed
+    if not _fork_handler_installed and hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=_forget_inherited_connections)
+        _fork_handler_installed = True
@@ -0,0 +1,106 @@
+"""
+PostgreSQL backend that takes connections from a psycopg_pool pool.
+
+Django 4.2 has no built-in pooling. Every process (gunicorn worker) opens
+its own pool on first use; pools are keyed by process id, so a pool
+created before a fork is never shared with the children. Closing the
+Django connection at the end of a request returns it to the pool, so
+``CONN_MAX_AGE`` must be 0. Pool options go in ``OPTIONS['pool']``:
+
+    min_size, max_size   connections kept open / opened at most
+    timeout              seconds to wait for a free connection
+    max_idle             idle connections above min_size are closed after this
+    max_lifetime         connections are replaced after this
+    check                check each connection before handing it out
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS
+from django.db.backends.postgresql import base
+import os
+import threading
+
+try:
+    from psycopg import IsolationLevel
+    from psycopg_pool import ConnectionPool
+except ImportError as e:  # pragma: no cover - optional dependency
+    raise ImproperlyConfigured(f"The postgresql_pool backend requires psycopg 3 and psycopg_pool: {e}")
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    # (alias, pid) -> pool
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(self, settings_dict, alias=DEFAULT_DB_ALIAS):
+        super().__init__(settings_dict, alias)
+        if settings_dict.get('CONN_MAX_AGE'):
+            raise ImproperlyConfigured('Pooled connections require CONN_MAX_AGE = 0.')
+
+    @property
+    def pool_options(self) -> dict:
+        return dict(self.settings_dict['OPTIONS'].get('pool') or {})
+
+    @property
+    def pool(self) -> ConnectionPool:
+        key = (self.alias, os.getpid())
+        pool = self._pools.get(key)
+        if pool is None:
+            with self._pools_lock:
+                pool = self._pools.get(key)
+                if pool is None:
+                    pool = self._pools[key] = self._create_pool()
+        return pool
+
+    def _create_pool(self) -> ConnectionPool:
+        options = self.pool_options
+        check = options.pop('check', True)
+        isolation_level = self.settings_dict['OPTIONS'].get('isolation_level')
+
+        def configure(connection):
+            if isolation_level is not None:
+                connection.isolation_level = IsolationLevel(isolation_level)
+
+        return ConnectionPool(
+            kwargs=self.get_connection_params(),
+            configure=configure,
+            check=ConnectionPool.check_connection if check else None,
+            name=f'django-{self.alias}-{os.getpid()}',
+            open=True,
+            **options,
+        )
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pool', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        isolation_level = self.settings_dict['OPTIONS'].get('isolation_level')
+        try:
+            self.isolation_level = IsolationLevel(
+                IsolationLevel.READ_COMMITTED if isolation_level is None else isolation_level
+            )
+        except ValueError:
+            raise ImproperlyConfigured(f'Invalid transaction isolation level {isolation_level}.')
+        return self.pool.getconn()
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                # Back to the pool, which rolls back or discards it as needed
+                self.connection._pool.putconn(self.connection)
+                self.connection = None
+
+    @classmethod
+    def close_pools(cls):
+        """Close this process's pools"""
+        pid = os.getpid()
+        with cls._pools_lock:
+            for key in [key for key in cls._pools if key[1] == pid]:
+                cls._pools.pop(key).close()
+
+    @classmethod
+    def pool_stats(cls) -> dict:
+        """psycopg_pool statistics of this process's pools, by alias"""
+        pid = os.getpid()
+        return {alias: pool.get_stats() for (alias, key_pid), pool in list(cls._pools.items()) if key_pid == pid}
@@ -0,0 +1,222 @@
+"""
+Read replica routing.
+
+``ReplicaRouter`` sends catalog reads (``DATABASE_REPLICAS['MODELS']``)
+made while serving a safe request to a healthy replica; every write, and
+every read of other models (users, favorites, sessions), goes to the
+primary. ``ReplicaRoutingMiddleware`` opens the routing state for each
+request:
+
+* unsafe methods (POST, PUT, PATCH, DELETE) read from the primary;
+* once a request writes, its later reads use the primary too;
+* a client whose request wrote reads from the primary for
+  ``STICKY_SECONDS`` afterwards (cookie, and a cache key per user), so it
+  sees its own writes before the replicas catch up.
+
+``ReplicaHealth`` measures replica lag in a background thread; a replica
+that is unreachable or more than ``MAX_LAG_SECONDS`` behind is drained
+until it catches up. Outside a request (management commands, Celery
+tasks) everything uses the primary.
+"""
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+import logging
+import os
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+STICKY_COOKIE = 'db_primary'
+
+POSTGRES_LAG_SQL = (
+    'SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0 '
+    'WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+    'ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END'
+)
+
+
+def _options() -> dict:
+    return getattr(settings, 'DATABASE_REPLICAS', {})
+
+
+def sticky_key(user_id) -> str:
+    return f"db_primary:{user_id}"
+
+
+@dataclass
+class RoutingState:
+    """Routing decisions for one request"""
+    request: object = None
+    pinned: bool = False
+    wrote: bool = False
+    _sticky: Optional[bool] = field(default=None, repr=False)
+
+    def is_sticky(self) -> bool:
+        """Did this client write within the last STICKY_SECONDS?"""
+        if self._sticky is None:
+            self._sticky = False  # user lookups below must not recurse here
+            self._sticky = self._recently_wrote()
+        return self._sticky
+
+    def _recently_wrote(self) -> bool:
+        request = self.request
+        if request is None:
+            return False
+        try:
+            if float(request.COOKIES.get(STICKY_COOKIE, 0)) > time.time():
+                return True
+        except ValueError:
+            pass
+        # Set by Django's or DRF's authentication by the time the view reads
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            return False
+        try:
+            return bool(cache.get(sticky_key(user.pk)))
+        except Exception as e:
+            logger.error(f"Replica sticky cache get error: {e}")
+            return True
+
+
+_state: ContextVar[Optional[RoutingState]] = ContextVar('db_routing_state', default=None)
+
+
+def get_state() -> Optional[RoutingState]:
+    return _state.get()
+
+
+def begin(request, pinned: bool = False):
+    """Open the routing state for a request; returns a token for ``end``"""
+    return _state.set(RoutingState(request=request, pinned=pinned))
+
+
+def end(token):
+    _state.reset(token)
+
+
+class ReplicaHealth:
+    """Replica lag, measured every LAG_CHECK_INTERVAL seconds in a daemon thread"""
+
+    def __init__(self):
+        self._lag: Dict[str, Optional[float]] = {}
+        self._checked_at: Optional[float] = None
+        self._thread_pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def aliases(self) -> List[str]:
+        return [alias for alias in _options().get('ALIASES', []) if alias in settings.DATABASES]
+
+    def healthy(self) -> List[str]:
+        self._ensure_thread()
+        max_lag = _options().get('MAX_LAG_SECONDS', 10.0)
+        return [
+            alias for alias in self.aliases
+            if self._lag.get(alias) is not None and self._lag[alias] <= max_lag
+        ]
+
+    def status(self) -> dict:
+        max_lag = _options().get('MAX_LAG_SECONDS', 10.0)
+        return {
+            alias: {
+                'lag_seconds': self._lag.get(alias),
+                'healthy': self._lag.get(alias) is not None and self._lag[alias] <= max_lag,
+            }
+            for alias in self.aliases
+        }
+
+    def measure(self, alias: str) -> float:
+        connection = connections[alias]
+        sql = POSTGRES_LAG_SQL if connection.vendor == 'postgresql' else 'SELECT 1'
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
+            value = cursor.fetchone()[0]
+        return float(value) if connection.vendor == 'postgresql' else 0.0
+
+    def check(self):
+        """Measure every replica once; errors count as unhealthy"""
+        max_lag = _options().get('MAX_LAG_SECONDS', 10.0)
+        for alias in self.aliases:
+            was_healthy = self._lag.get(alias) is not None and self._lag[alias] <= max_lag
+            try:
+                lag = self.measure(alias)
+            except Exception as e:
+                logger.warning(f"Replica {alias} check failed, draining it: {e}")
+                connections[alias].close()
+                lag = None
+            self._lag[alias] = lag
+            if was_healthy and lag is not None and lag > max_lag:
+                logger.warning(f"Replica {alias} is {lag:.1f}s behind, draining it")
+            elif not was_healthy and lag is not None and lag <= max_lag:
+                logger.info(f"Replica {alias} is healthy ({lag:.1f}s behind)")
+        self._checked_at = time.monotonic()
+
+    def _run(self):
+        interval = _options().get('LAG_CHECK_INTERVAL', 5.0)
+        while True:
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Replica health check error: {e}")
+            time.sleep(interval)
+
+    def _ensure_thread(self):
+        # Threads don't survive fork; start one per worker process
+        if self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread_pid != os.getpid():
+                self._lag = {}
+                threading.Thread(target=self._run, name='replica-health', daemon=True).start()
+                self._thread_pid = os.getpid()
+
+
+replica_health = ReplicaHealth()
+
+
+class ReplicaRouter:
+    """Catalog reads to a healthy replica, everything else to the primary"""
+
+    def __init__(self):
+        self.models = {label.lower() for label in _options().get('MODELS', [])}
+        self.replicas = set(_options().get('ALIASES', []))
+
+    def _routed(self, model) -> bool:
+        return model._meta.label_lower in self.models
+
+    def db_for_read(self, model, **hints):
+        if not self._routed(model):
+            return DEFAULT_DB_ALIAS
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        state = _state.get()
+        if (
+            state is None
+            or state.pinned
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+            or state.is_sticky()
+        ):
+            return DEFAULT_DB_ALIAS
+        healthy = replica_health.healthy()
+        return random.choice(healthy) if healthy else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.pinned = state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary
+        return db not in self.replicas
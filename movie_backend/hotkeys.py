@@ -0,0 +1,139 @@
+"""
+Decayed access-frequency sketch ("top-K") shared by every worker.
+
+Each worker counts accesses in memory and periodically adds the counts to
+a Redis sorted set, weighted by ``2 ** (age / half_life)`` so that recent
+accesses outweigh old ones (forward decay: ranking by the stored score is
+ranking by exponentially decayed count, without ever rewriting old
+entries). When the weights grow too large the whole set is rescaled once,
+and it is trimmed to the ``max_keys`` hottest members, so memory stays
+bounded. Without Redis the sketch is kept per process.
+"""
+from collections import defaultdict
+from typing import Dict, List, Tuple
+import logging
+import threading
+import time
+
+from .redis_client import get_redis_client, redis_key
+
+logger = logging.getLogger(__name__)
+
+# Rescale once weights reach 2 ** RESCALE_AFTER half-lives
+RESCALE_AFTER = 32
+
+# KEYS: scores, epoch. ARGV: now, half-life, max members, then member/count pairs
+RECORD_SCRIPT = """
+local now = tonumber(ARGV[1])
+local half_life = tonumber(ARGV[2])
+local epoch = tonumber(redis.call('GET', KEYS[2]) or now)
+local age = (now - epoch) / half_life
+if age > %(rescale)d then
+    redis.call('ZUNIONSTORE', KEYS[1], 1, KEYS[1], 'WEIGHTS', math.pow(2, -age))
+    epoch = now
+    age = 0
+end
+redis.call('SET', KEYS[2], epoch)
+local weight = math.pow(2, age)
+for i = 4, #ARGV, 2 do
+    redis.call('ZINCRBY', KEYS[1], tonumber(ARGV[i + 1]) * weight, ARGV[i])
+end
+local extra = redis.call('ZCARD', KEYS[1]) - tonumber(ARGV[3])
+if extra > 0 then
+    redis.call('ZREMRANGEBYRANK', KEYS[1], 0, extra - 1)
+end
+return epoch
+""" % {'rescale': RESCALE_AFTER}
+
+
+class DecayedTopK:
+    """Hottest members by exponentially decayed access count"""
+
+    def __init__(self, name: str, half_life: float = 3600, max_keys: int = 10000, flush_interval: float = 5):
+        self.scores_key = redis_key('hotkeys', name, 'scores')
+        self.epoch_key = redis_key('hotkeys', name, 'epoch')
+        self.half_life = half_life
+        self.max_keys = max_keys
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, int] = defaultdict(int)
+        self._local: Dict[str, float] = {}
+        self._local_epoch = time.time()
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._script = None
+
+    def record(self, member: str, count: int = 1):
+        with self._lock:
+            self._pending[member] += count
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Push pending counts to Redis (or the per-process sketch)"""
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(int)
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+
+        client = get_redis_client()
+        if client is None:
+            self._record_local(pending)
+            return
+        try:
+            if self._script is None:
+                self._script = client.register_script(RECORD_SCRIPT)
+            args = [time.time(), self.half_life, self.max_keys]
+            for member, count in pending.items():
+                args.extend((member, count))
+            self._script(keys=[self.scores_key, self.epoch_key], args=args)
+        except Exception as e:
+            logger.error(f"Hot key sketch flush error: {e}")
+
+    def _record_local(self, pending: Dict[str, int]):
+        with self._lock:
+            age = (time.time() - self._local_epoch) / self.half_life
+            if age > RESCALE_AFTER:
+                scale = 2 ** -age
+                self._local = {member: score * scale for member, score in self._local.items()}
+                self._local_epoch, age = time.time(), 0
+            weight = 2 ** age
+            for member, count in pending.items():
+                self._local[member] = self._local.get(member, 0.0) + count * weight
+            if len(self._local) > self.max_keys:
+                hottest = sorted(self._local.items(), key=lambda item: item[1], reverse=True)
+                self._local = dict(hottest[:self.max_keys])
+
+    def top(self, n: int) -> List[Tuple[str, float]]:
+        """The n hottest members with their decayed access counts, hottest first"""
+        self.flush()
+        client = get_redis_client()
+        if client is None:
+            with self._lock:
+                hottest = sorted(self._local.items(), key=lambda item: item[1], reverse=True)[:n]
+                epoch = self._local_epoch
+        else:
+            try:
+                pipe = client.pipeline(transaction=False)
+                pipe.zrevrange(self.scores_key, 0, n - 1, withscores=True)
+                pipe.get(self.epoch_key)
+                hottest, epoch = pipe.execute()
+            except Exception as e:
+                logger.error(f"Hot key sketch read error: {e}")
+                return []
+            hottest = [(m.decode() if isinstance(m, bytes) else m, score) for m, score in hottest]
+            epoch = float(epoch) if epoch else time.time()
+        decay = 2 ** -((time.time() - epoch) / self.half_life)
+        return [(member, score * decay) for member, score in hottest]
+
+    def reset(self):
+        with self._lock:
+            self._pending.clear()
+            self._local.clear()
+        client = get_redis_client()
+        if client is None:
+            return
+        try:
+            client.delete(self.scores_key, self.epoch_key)
+        except Exception as e:
+            logger.error(f"Hot key sketch reset error: {e}")
@@ -0,0 +1,275 @@
+"""
+Cache keyspace analytics: hit ratios, hot keys and memory per key prefix.
+
+- **Hits and misses.** Every ``CacheService`` lookup is counted per key
+  prefix (``movie_details``, ``search``, ...). Workers buffer counts and
+  add them to a Redis hash every few seconds, like the metrics registry.
+- **Hot keys.** Lookups are also counted per key in a decayed top-K sketch
+  (see ``movie_backend.hotkeys``).
+- **Memory.** ``sample`` walks the keyspace with ``SCAN`` in bounded steps
+  (at most ``STEP_MAX_KEYS`` keys or ``STEP_BUDGET_MS`` per step), counting
+  keys per prefix and measuring ``MEMORY USAGE`` for a fraction of them.
+  The cursor and partial counts live in Redis, so successive steps from
+  any worker continue one pass; a finished pass becomes the reported
+  snapshot. ``SCAN`` never blocks Redis for long, and a lock keeps two
+  steps from running at once.
+
+Without Redis, hits, misses and hot keys are kept per process and memory
+isn't available.
+"""
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from django.conf import settings
+import logging
+import random
+import threading
+import time
+
+from .hotkeys import DecayedTopK
+from .redis_client import get_redis_client, redis_key
+
+logger = logging.getLogger(__name__)
+
+# Buckets for keys that don't belong to the Django cache, or have no prefix
+OTHER = '(other)'
+UNPREFIXED = '(unprefixed)'
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class CacheAnalytics:
+    """Per-prefix hit ratios, hot keys and sampled memory of the cache"""
+
+    def __init__(self):
+        options = getattr(settings, 'CACHE_ANALYTICS', {})
+        self.enabled = options.get('ENABLED', True)
+        self.flush_interval = options.get('FLUSH_INTERVAL', 5)
+        self.scan_count = options.get('SCAN_COUNT', 200)
+        self.step_max_keys = options.get('STEP_MAX_KEYS', 2000)
+        self.step_budget_ms = options.get('STEP_BUDGET_MS', 50)
+        self.memory_sample_rate = options.get('MEMORY_SAMPLE_RATE', 0.1)
+        self.hot_keys = DecayedTopK(
+            'cache_keys',
+            half_life=options.get('HOT_KEYS_HALF_LIFE', 600),
+            max_keys=options.get('HOT_KEYS_MAX', 2000),
+            flush_interval=self.flush_interval,
+        )
+        self.key_prefix = settings.CACHES.get('default', {}).get('KEY_PREFIX', '')
+
+        self._pending: Dict[str, int] = defaultdict(int)
+        self._local: Dict[str, int] = defaultdict(int)
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _key(self, part: str) -> str:
+        return redis_key('keyspace', part)
+
+    # Hits and misses
+
+    def record(self, key: str, hit: bool):
+        """Count one cache lookup"""
+        if not self.enabled:
+            return
+        prefix = key.split(':', 1)[0]
+        with self._lock:
+            self._pending[f'{prefix}|{"hits" if hit else "misses"}'] += 1
+        self.hot_keys.record(key)
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Push pending hit and miss counts to Redis (or the per-process totals)"""
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(int)
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+        client = get_redis_client()
+        if client is None:
+            with self._lock:
+                for field, count in pending.items():
+                    self._local[field] += count
+            return
+        try:
+            pipe = client.pipeline(transaction=False)
+            for field, count in pending.items():
+                pipe.hincrby(self._key('access'), field, count)
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Cache analytics flush error: {e}")
+
+    def access(self) -> Dict[str, dict]:
+        """Hits, misses and hit ratio per prefix, across all workers"""
+        self.flush()
+        client = get_redis_client()
+        if client is None:
+            with self._lock:
+                counts = dict(self._local)
+        else:
+            try:
+                counts = {_text(field): int(count) for field, count in client.hgetall(self._key('access')).items()}
+            except Exception as e:
+                logger.error(f"Cache analytics read error: {e}")
+                return {}
+        prefixes = defaultdict(lambda: {'hits': 0, 'misses': 0})
+        for field, count in counts.items():
+            prefix, _, kind = field.rpartition('|')
+            prefixes[prefix][kind] = count
+        for stats in prefixes.values():
+            total = stats['hits'] + stats['misses']
+            stats['hit_ratio'] = round(stats['hits'] / total, 4) if total else None
+        return dict(sorted(prefixes.items(), key=lambda item: -(item[1]['hits'] + item[1]['misses'])))
+
+    def hottest(self, n: int) -> List[Tuple[str, float]]:
+        """The n most accessed cache keys with their decayed access counts"""
+        return self.hot_keys.top(n)
+
+    # Memory sampling
+
+    def prefix_of(self, raw_key: str) -> str:
+        """The CacheService prefix of a raw Redis key (``<KEY_PREFIX>:<version>:<prefix>:...``)"""
+        if self.key_prefix:
+            if not raw_key.startswith(f'{self.key_prefix}:'):
+                return OTHER
+            raw_key = raw_key[len(self.key_prefix) + 1:]
+        parts = raw_key.split(':')
+        if len(parts) > 1 and parts[0].isdigit():
+            # Django cache version; raw keys (redis_key) have none
+            parts = parts[1:]
+        return parts[0] if len(parts) > 1 else UNPREFIXED
+
+    def sample(self, max_keys: Optional[int] = None, budget_ms: Optional[float] = None) -> Optional[dict]:
+        """Advance the keyspace pass by one bounded step
+
+        Returns the step's progress, ``{'skipped': True}`` when another step
+        is running, or None without Redis.
+        """
+        client = get_redis_client()
+        if client is None:
+            return None
+        max_keys = self.step_max_keys if max_keys is None else max_keys
+        budget_ms = self.step_budget_ms if budget_ms is None else budget_ms
+        try:
+            if not client.set(self._key('lock'), 1, nx=True, px=int(budget_ms * 10) + 1000):
+                return {'skipped': True}
+        except Exception as e:
+            logger.error(f"Keyspace sample lock error: {e}")
+            return None
+
+        start = time.monotonic()
+        try:
+            cursor = int(client.get(self._key('cursor')) or 0)
+            fields: Dict[str, int] = defaultdict(int)
+            scanned = 0
+            while True:
+                cursor, keys = client.scan(cursor, count=self.scan_count)
+                measured = [key for key in keys if random.random() < self.memory_sample_rate]
+                if measured:
+                    pipe = client.pipeline(transaction=False)
+                    for key in measured:
+                        pipe.memory_usage(key)
+                    usages = dict(zip(measured, pipe.execute(raise_on_error=False)))
+                else:
+                    usages = {}
+                for key in keys:
+                    prefix = self.prefix_of(_text(key))
+                    fields[f'{prefix}|keys'] += 1
+                    usage = usages.get(key)
+                    if isinstance(usage, int):
+                        fields[f'{prefix}|measured'] += 1
+                        fields[f'{prefix}|bytes'] += usage
+                scanned += len(keys)
+                if cursor == 0 or scanned >= max_keys or (time.monotonic() - start) * 1000 >= budget_ms:
+                    break
+
+            pipe = client.pipeline(transaction=False)
+            pipe.hsetnx(self._key('pass'), '_started', time.time())
+            for field, count in fields.items():
+                pipe.hincrby(self._key('pass'), field, count)
+            if cursor == 0:
+                # Pass complete: it becomes the reported snapshot
+                pipe.hset(self._key('pass'), mapping={'_finished': time.time(), '_dbsize': client.dbsize()})
+                pipe.rename(self._key('pass'), self._key('last'))
+                pipe.delete(self._key('cursor'))
+            else:
+                pipe.set(self._key('cursor'), cursor)
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Keyspace sample error: {e}")
+            return None
+        finally:
+            try:
+                client.delete(self._key('lock'))
+            except Exception as e:
+                logger.error(f"Keyspace sample unlock error: {e}")
+        return {
+            'scanned': scanned,
+            'pass_complete': cursor == 0,
+            'ms': round((time.monotonic() - start) * 1000, 1),
+        }
+
+    def memory(self) -> Optional[dict]:
+        """Keys and estimated memory per prefix from the last complete pass
+
+        Before the first pass completes, the pass in progress is reported,
+        with key counts scaled up to the current database size.
+        """
+        client = get_redis_client()
+        if client is None:
+            return None
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.hgetall(self._key('last'))
+            pipe.hgetall(self._key('pass'))
+            pipe.dbsize()
+            last, current, dbsize = pipe.execute()
+        except Exception as e:
+            logger.error(f"Keyspace memory read error: {e}")
+            return None
+
+        complete = bool(last)
+        fields = {_text(field): float(value) for field, value in (last or current).items()}
+        in_progress = sum(int(value) for field, value in current.items() if _text(field).endswith('|keys'))
+        prefixes = defaultdict(lambda: {'keys': 0, 'measured': 0, 'bytes': 0})
+        for field, value in fields.items():
+            if not field.startswith('_'):
+                prefix, _, kind = field.rpartition('|')
+                prefixes[prefix][kind] = int(value)
+
+        seen = sum(stats['keys'] for stats in prefixes.values())
+        scale = 1.0 if complete or not seen else max(1.0, dbsize / seen)
+        report = {}
+        for prefix, stats in prefixes.items():
+            keys = stats['keys'] * scale
+            avg_bytes = stats['bytes'] / stats['measured'] if stats['measured'] else None
+            report[prefix] = {
+                'keys': round(keys),
+                'avg_bytes': round(avg_bytes) if avg_bytes is not None else None,
+                'estimated_bytes': round(keys * avg_bytes) if avg_bytes is not None else None,
+            }
+        return {
+            'complete': complete,
+            'started': fields.get('_started'),
+            'finished': fields.get('_finished'),
+            'dbsize': dbsize,
+            'scanned_in_current_pass': in_progress,
+            'prefixes': dict(sorted(report.items(), key=lambda item: -(item[1]['estimated_bytes'] or 0))),
+        }
+
+    def reset(self):
+        with self._lock:
+            self._pending.clear()
+            self._local.clear()
+        self.hot_keys.reset()
+        client = get_redis_client()
+        if client is None:
+            return
+        try:
+            client.delete(*(self._key(part) for part in ('access', 'cursor', 'pass', 'last')))
+        except Exception as e:
+            logger.error(f"Cache analytics reset error: {e}")
+
+
+cache_analytics = CacheAnalytics()
@@ -0,0 +1,289 @@
+"""
+Low-overhead performance metrics.
+
+Each worker records values into in-memory log-linear ("HDR-style")
+histograms and periodically flushes the bucket counts into Redis hashes,
+where they add up across every worker. Percentiles are computed from the
+merged buckets when the admin metrics endpoint is read.
+
+Request-scoped measurements (DB queries, cache hits, TMDb calls, serializer
+time) are collected on a ``RequestMetrics`` object held in a context
+variable, so instrumented code doesn't need a reference to the request.
+"""
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+from django.conf import settings
+import logging
+import threading
+import time
+
+from .keyspace import cache_analytics
+from .redis_client import get_redis_client, redis_key
+
+logger = logging.getLogger(__name__)
+
+# 16 sub-buckets per power of two: at most ~6% relative error per value
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+# Values are stored as integers in thousandths (e.g. microseconds for ms)
+SCALE = 1000
+
+
+def _bucket_index(value: float) -> int:
+    n = max(0, int(value * SCALE))
+    shift = max(0, n.bit_length() - SUB_BUCKET_BITS - 1)
+    return shift * SUB_BUCKETS + (n >> shift)
+
+
+def _bucket_midpoint(index: int) -> float:
+    shift = max(0, index // SUB_BUCKETS - 1)
+    mantissa = index - shift * SUB_BUCKETS
+    lower = mantissa << shift
+    upper = (mantissa + 1) << shift
+    return (lower + upper - 1) / 2 / SCALE
+
+
+class Histogram:
+    """Sparse log-linear histogram with constant-time recording"""
+
+    __slots__ = ('counts', 'count', 'total')
+
+    def __init__(self):
+        self.counts = defaultdict(int)
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, value: float):
+        self.counts[_bucket_index(value)] += 1
+        self.count += 1
+        self.total += value
+
+    def merge(self, other: 'Histogram'):
+        for index, count in other.counts.items():
+            self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+
+    def percentile(self, q: float) -> float:
+        """Value at the q-th percentile (0-100)"""
+        if not self.count:
+            return 0.0
+        rank = max(1, q / 100 * self.count)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return _bucket_midpoint(index)
+        return _bucket_midpoint(max(self.counts))
+
+    def summary(self) -> dict:
+        return {
+            'count': self.count,
+            'mean': round(self.total / self.count, 3) if self.count else 0.0,
+            'p50': round(self.percentile(50), 3),
+            'p95': round(self.percentile(95), 3),
+            'p99': round(self.percentile(99), 3),
+        }
+
+
+class MetricsRegistry:
+    """Per-process histograms, flushed into Redis so all workers aggregate"""
+
+    def __init__(self):
+        options = getattr(settings, 'METRICS', {})
+        self.flush_interval = options.get('FLUSH_INTERVAL', 10)
+        self.retention = options.get('RETENTION', 60 * 60 * 24)
+        self._pending: Dict[tuple, Histogram] = defaultdict(Histogram)
+        # Used instead of Redis when the cache backend isn't Redis
+        self._local: Dict[tuple, Histogram] = defaultdict(Histogram)
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _index_key(self) -> str:
+        return redis_key('metrics', 'index')
+
+    def _histogram_key(self, name: str, metric: str) -> str:
+        return redis_key('metrics', 'hist', name, metric)
+
+    def record(self, name: str, metric: str, value: float):
+        """Record one value for a metric of an endpoint (or other component)"""
+        with self._lock:
+            self._pending[(name, metric)].record(value)
+
+    def maybe_flush(self):
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Push pending bucket counts to Redis"""
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(Histogram)
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+
+        client = get_redis_client()
+        if client is None:
+            with self._lock:
+                for key, histogram in pending.items():
+                    self._local[key].merge(histogram)
+            return
+
+        try:
+            pipe = client.pipeline(transaction=False)
+            for (name, metric), histogram in pending.items():
+                key = self._histogram_key(name, metric)
+                for index, count in histogram.counts.items():
+                    pipe.hincrby(key, index, count)
+                pipe.hincrby(key, 'count', histogram.count)
+                pipe.hincrbyfloat(key, 'sum', histogram.total)
+                pipe.expire(key, self.retention)
+                pipe.sadd(self._index_key(), f'{name}|{metric}')
+            pipe.expire(self._index_key(), self.retention)
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Metrics flush error: {e}")
+
+    def histograms(self) -> Dict[tuple, Histogram]:
+        """Merged histograms from every worker"""
+        self.flush()
+        client = get_redis_client()
+        if client is None:
+            with self._lock:
+                merged = defaultdict(Histogram)
+                for key, histogram in self._local.items():
+                    merged[key].merge(histogram)
+                return merged
+
+        merged = {}
+        members = sorted(m.decode() if isinstance(m, bytes) else m for m in client.smembers(self._index_key()))
+        pipe = client.pipeline(transaction=False)
+        for member in members:
+            pipe.hgetall(self._histogram_key(*member.split('|', 1)))
+        for member, fields in zip(members, pipe.execute()):
+            if not fields:
+                continue
+            histogram = Histogram()
+            for field, value in fields.items():
+                field = field.decode() if isinstance(field, bytes) else field
+                if field == 'count':
+                    histogram.count = int(value)
+                elif field == 'sum':
+                    histogram.total = float(value)
+                else:
+                    histogram.counts[int(field)] = int(value)
+            merged[tuple(member.split('|', 1))] = histogram
+        return merged
+
+    def snapshot(self, prefix: Optional[str] = None) -> dict:
+        """p50/p95/p99 summaries grouped by endpoint, then metric"""
+        result = defaultdict(dict)
+        for (name, metric), histogram in sorted(self.histograms().items()):
+            if prefix and not name.startswith(prefix):
+                continue
+            result[name][metric] = histogram.summary()
+        return dict(result)
+
+    def reset(self):
+        with self._lock:
+            self._pending.clear()
+            self._local.clear()
+        client = get_redis_client()
+        if client is None:
+            return
+        try:
+            members = client.smembers(self._index_key())
+            keys = [
+                self._histogram_key(*(m.decode() if isinstance(m, bytes) else m).split('|', 1))
+                for m in members
+            ]
+            client.delete(self._index_key(), *keys)
+        except Exception as e:
+            logger.error(f"Metrics reset error: {e}")
+
+
+class RequestMetrics:
+    """Measurements collected while one request is handled"""
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_ms = 0.0
+        self.cache_hits = defaultdict(int)
+        self.cache_misses = defaultdict(int)
+        self.tmdb_calls = 0
+        self.tmdb_ms = 0.0
+        self.timings = defaultdict(float)
+        self._active_timings = set()
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        """Django ``execute_wrapper`` hook counting queries and their time"""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_queries += 1
+            self.db_ms += (time.perf_counter() - start) * 1000
+
+    def record_into(self, registry: MetricsRegistry, name: str, wall_ms: float):
+        registry.record(name, 'wall_ms', wall_ms)
+        registry.record(name, 'db_queries', self.db_queries)
+        registry.record(name, 'db_ms', self.db_ms)
+        for prefix, count in self.cache_hits.items():
+            registry.record(name, f'cache_hits:{prefix}', count)
+        for prefix, count in self.cache_misses.items():
+            registry.record(name, f'cache_misses:{prefix}', count)
+        if self.tmdb_calls:
+            registry.record(name, 'tmdb_calls', self.tmdb_calls)
+            registry.record(name, 'tmdb_ms', self.tmdb_ms)
+        for timing, elapsed in self.timings.items():
+            registry.record(name, f'{timing}_ms', elapsed)
+
+
+registry = MetricsRegistry()
+current_request: ContextVar[Optional[RequestMetrics]] = ContextVar('current_request_metrics', default=None)
+
+
+def record_cache_access(key: str, hit: bool):
+    """Count a CacheService hit or miss under the key's prefix
+
+    Counted for the current request, and in the process-wide cache
+    analytics (``movie_backend.keyspace``).
+    """
+    cache_analytics.record(key, hit)
+    metrics = current_request.get()
+    if metrics is not None:
+        prefix = key.split(':', 1)[0]
+        if hit:
+            metrics.cache_hits[prefix] += 1
+        else:
+            metrics.cache_misses[prefix] += 1
+
+
+def record_tmdb_call(elapsed_ms: float):
+    metrics = current_request.get()
+    if metrics is not None:
+        metrics.tmdb_calls += 1
+        metrics.tmdb_ms += elapsed_ms
+
+
+@contextmanager
+def measure(name: str):
+    """Add the time spent in the block to a request timing
+
+    Nested blocks with the same name (e.g. nested serializers) are only
+    counted once, by the outermost block.
+    """
+    metrics = current_request.get()
+    if metrics is None or name in metrics._active_timings:
+        yield
+        return
+
+    metrics._active_timings.add(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.timings[name] += (time.perf_counter() - start) * 1000
+        metrics._active_timings.discard(name)
@@ -0,0 +1,106 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+import hashlib
+import logging
+
+from movie_backend import compression, metrics
+
+logger = logging.getLogger(__name__)
+
+re_strong_etag = _lazy_re_compile(r'^\s*"')
+
+
+class CompressionMiddleware:
+    """Compress API responses with brotli or gzip
+
+    Bodies smaller than ``MIN_SIZE`` or of other content types are sent as
+    they are. Compressed bytes of cacheable responses (GET, 200, not
+    ``Cache-Control: private``/``no-store``) are cached under a hash of the
+    uncompressed body, so hot endpoints are compressed once per distinct
+    payload rather than on every hit. Streaming responses are compressed
+    on the fly.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        options = getattr(settings, 'COMPRESSION', {})
+        self.enabled = options.get('ENABLED', True)
+        self.path_prefixes = tuple(options.get('PATH_PREFIXES', ['/api/']))
+        self.content_types = tuple(options.get('CONTENT_TYPES', ['application/json', 'text/']))
+        self.min_size = options.get('MIN_SIZE', 1024)
+        self.levels = {'br': options.get('BROTLI_LEVEL', 5), 'gzip': options.get('GZIP_LEVEL', 6)}
+        self.encodings = [encoding for encoding in compression.CODECS if self.levels.get(encoding)]
+        self.cache_min_size = options.get('CACHE_MIN_SIZE', 4096)
+        self.cache_timeout = getattr(settings, 'CACHE_TTL', {}).get('COMPRESSED_RESPONSES', 600)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            not self.enabled
+            or not request.path.startswith(self.path_prefixes)
+            or response.has_header('Content-Encoding')
+            or not response.get('Content-Type', '').startswith(self.content_types)
+        ):
+            return response
+
+        # The representation depends on Accept-Encoding even when this one is not compressed
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        encoding = compression.negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''), self.encodings)
+        if encoding is None:
+            return response
+        level = self.levels[encoding]
+
+        if response.streaming:
+            response.streaming_content = compression.compress_stream(
+                encoding, response.streaming_content, level
+            )
+            del response.headers['Content-Length']
+        else:
+            with metrics.measure('compression'):
+                response.content = self.compressed_content(request, response, encoding, level)
+            response.headers['Content-Length'] = str(len(response.content))
+
+        # Compressed and uncompressed bodies are not byte-identical
+        etag = response.get('ETag')
+        if etag and re_strong_etag.match(etag):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def is_cacheable(self, request, response) -> bool:
+        cache_control = response.get('Cache-Control', '')
+        return (
+            request.method in ('GET', 'HEAD')
+            and response.status_code == 200
+            and len(response.content) >= self.cache_min_size
+            and 'private' not in cache_control
+            and 'no-store' not in cache_control
+        )
+
+    def compressed_content(self, request, response, encoding, level) -> bytes:
+        content = response.content
+        if not self.is_cacheable(request, response):
+            return compression.compress(encoding, content, level)
+
+        digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+        key = f"compressed:{encoding}{level}:{digest}"
+        try:
+            compressed = cache.get(key)
+        except Exception as e:
+            logger.error(f"Compressed response cache get error: {e}")
+            compressed = None
+        metrics.record_cache_access(key, compressed is not None)
+        if compressed is not None:
+            return compressed
+
+        compressed = compression.compress(encoding, content, level)
+        try:
+            cache.set(key, compressed, self.cache_timeout)
+        except Exception as e:
+            logger.error(f"Compressed response cache set error: {e}")
+        return compressed
@@ -0,0 +1,108 @@
+from django.conf import settings
+from django.http import JsonResponse
+import time
+
+from movie_backend import metrics
+from movie_backend.concurrency import concurrency_limiter
+
+
+class ReleasingIterator:
+    """Iterate a streaming body, calling ``release`` once it is exhausted or closed
+
+    Servers close the body when a client goes away, possibly before reading
+    any of it, so this is a class rather than a generator (whose ``finally``
+    would not run if it never started). ``HttpResponse`` closes it with the
+    response.
+    """
+
+    def __init__(self, content, release):
+        self.content = iter(content)
+        self.release = release
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self.content)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        release, self.release = self.release, None
+        if release is not None:
+            release()
+
+
+class AdaptiveConcurrencyMiddleware:
+    """Shed requests over their endpoint class's adaptive concurrency limit
+
+    Views are mapped to classes by URL name in
+    ``ADAPTIVE_CONCURRENCY['VIEWS']``; ``<name>:<param>`` applies when the
+    query parameter is set (e.g. ``movie-list:search``). Requests over the
+    limit get a 503 with ``Retry-After`` straight away instead of queueing
+    behind slow ones. Unmapped views are not limited. See
+    ``movie_backend.concurrency``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        options = getattr(settings, 'ADAPTIVE_CONCURRENCY', {})
+        self.enabled = options.get('ENABLED', True)
+        self.retry_after = options.get('RETRY_AFTER', 1)
+        self.views = options.get('VIEWS', {})
+        self.variants = {}
+        for view in self.views:
+            name, _, param = view.partition(':')
+            if param:
+                self.variants.setdefault(name, []).append(param)
+
+    def classify(self, request):
+        match = request.resolver_match
+        name = match.url_name if match else None
+        for param in self.variants.get(name, ()):
+            if request.GET.get(param, '').lower() not in ('', '0', 'false', 'no'):
+                return self.views[f'{name}:{param}']
+        return self.views.get(name)
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        except Exception:
+            self.release(request, failed=True)
+            raise
+        failed = response.status_code >= 500
+        if response.streaming:
+            # The body is produced while the server iterates it; hold the slot until then
+            response.streaming_content = ReleasingIterator(
+                response.streaming_content, lambda: self.release(request, failed=failed)
+            )
+        else:
+            self.release(request, failed=failed)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self.enabled:
+            return None
+        name = self.classify(request)
+        if name is None:
+            return None
+        limit = concurrency_limiter.acquire(name)
+        if limit is None:
+            metrics.registry.record(f'concurrency:{name}', 'shed', 1)
+            response = JsonResponse(
+                {'detail': 'The server is busy, please try again shortly.'}, status=503,
+            )
+            response.headers['Retry-After'] = str(self.retry_after)
+            return response
+        request.concurrency_slot = (limit, time.perf_counter())
+        return None
+
+    @staticmethod
+    def release(request, failed: bool):
+        slot = getattr(request, 'concurrency_slot', None)
+        if slot is not None:
+            limit, start = slot
+            request.concurrency_slot = None
+            limit.release((time.perf_counter() - start) * 1000, failed=failed)
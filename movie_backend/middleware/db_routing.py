@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.cache import cache
+import logging
+import time
+
+from movie_backend.db import router
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaRoutingMiddleware:
+    """Open the read replica routing state for each request
+
+    See ``movie_backend.db.router``. Unsafe methods read from the primary;
+    a request that wrote makes its client read from the primary for
+    ``DATABASE_REPLICAS['STICKY_SECONDS']``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = bool(getattr(settings, 'DATABASE_ROUTERS', None))
+        self.sticky_seconds = getattr(settings, 'DATABASE_REPLICAS', {}).get('STICKY_SECONDS', 5)
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+        token = router.begin(request, pinned=request.method not in SAFE_METHODS)
+        try:
+            response = self.get_response(request)
+            if router.get_state().wrote and self.sticky_seconds:
+                self.stick(request, response)
+            return response
+        finally:
+            router.end(token)
+
+    def stick(self, request, response):
+        response.set_cookie(
+            router.STICKY_COOKIE, f"{time.time() + self.sticky_seconds:.3f}",
+            max_age=self.sticky_seconds, httponly=True, samesite='Lax',
+        )
+        # API clients using JWT may not keep cookies
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            try:
+                cache.set(router.sticky_key(user.pk), 1, self.sticky_seconds)
+            except Exception as e:
+                logger.error(f"Replica sticky cache set error: {e}")
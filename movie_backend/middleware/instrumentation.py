@@ -0,0 +1,49 @@
+from contextlib import ExitStack
+from django.conf import settings
+from django.db import connections
+import random
+import time
+
+from movie_backend import metrics
+
+
+class RequestMetricsMiddleware:
+    """Record per-endpoint performance histograms for API requests
+
+    For every resolved view this records wall time, DB query count and
+    time, CacheService hits/misses per key prefix, TMDb calls and latency,
+    and serializer time. See ``movie_backend.metrics``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        options = getattr(settings, 'METRICS', {})
+        self.enabled = options.get('ENABLED', True)
+        self.path_prefixes = tuple(options.get('PATH_PREFIXES', ['/api/']))
+        self.sample_rate = options.get('SAMPLE_RATE', 1.0)
+
+    def __call__(self, request):
+        if (
+            not self.enabled
+            or not request.path.startswith(self.path_prefixes)
+            or (self.sample_rate < 1.0 and random.random() >= self.sample_rate)
+        ):
+            return self.get_response(request)
+
+        collector = metrics.RequestMetrics()
+        token = metrics.current_request.set(collector)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(collector.db_wrapper))
+                start = time.perf_counter()
+                response = self.get_response(request)
+                wall_ms = (time.perf_counter() - start) * 1000
+        finally:
+            metrics.current_request.reset(token)
+
+        match = getattr(request, 'resolver_match', None)
+        endpoint = match.view_name if match else 'unresolved'
+        collector.record_into(metrics.registry, endpoint, wall_ms)
+        metrics.registry.maybe_flush()
+        return response
@@ -0,0 +1,61 @@
+from contextlib import ExitStack
+from django.conf import settings
+from django.db import connections
+import logging
+import random
+
+from movie_backend import metrics
+from movie_backend.query_budget import QueryBudgetExceeded, QueryCounter, get_view_budget
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetMiddleware:
+    """Enforce the query budgets declared by views
+
+    ``raise`` mode (tests) fails the request with ``QueryBudgetExceeded``;
+    ``log`` mode checks a sample of requests and logs and records a metric
+    for each overrun. See ``movie_backend.query_budget``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        options = getattr(settings, 'QUERY_BUDGETS', {})
+        self.mode = options.get('MODE', 'log')
+        self.path_prefixes = tuple(options.get('PATH_PREFIXES', ['/api/']))
+        self.sample_rate = 1.0 if self.mode == 'raise' else options.get('SAMPLE_RATE', 1.0)
+
+    def __call__(self, request):
+        if (
+            self.mode == 'off'
+            or not request.path.startswith(self.path_prefixes)
+            or (self.sample_rate < 1.0 and random.random() >= self.sample_rate)
+        ):
+            return self.get_response(request)
+
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+
+        match = getattr(request, 'resolver_match', None)
+        budget = get_view_budget(match.func) if match else None
+        if budget is None:
+            return response
+
+        problems = counter.violations(budget)
+        if problems:
+            self.report(match.view_name, request, counter, budget, problems)
+        return response
+
+    def report(self, endpoint, request, counter, budget, problems):
+        message = f"Query budget exceeded for {endpoint} ({request.method} {request.path}): " + '; '.join(problems)
+        if self.mode == 'raise':
+            raise QueryBudgetExceeded(message)
+
+        logger.warning(message)
+        if counter.queries > budget.queries:
+            metrics.registry.record(endpoint, 'query_budget_overrun', counter.queries - budget.queries)
+        if counter.duplicates > budget.duplicates:
+            metrics.registry.record(endpoint, 'duplicate_query_overrun', counter.duplicates - budget.duplicates)
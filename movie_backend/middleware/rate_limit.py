@@ -0,0 +1,22 @@
+import math
+
+
+class RateLimitHeadersMiddleware:
+    """Add RateLimit-* headers to throttled endpoints' responses
+
+    ``CatalogRateThrottle`` leaves its result on the request; throttled
+    (429) responses also get ``Retry-After`` from DRF.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        result = getattr(request, 'rate_limit', None)
+        if result is not None:
+            response.headers['RateLimit-Limit'] = str(result.limit)
+            response.headers['RateLimit-Remaining'] = str(result.remaining)
+            response.headers['RateLimit-Reset'] = str(math.ceil(result.reset_after))
+            response.headers['RateLimit-Policy'] = result.policy
+        return response
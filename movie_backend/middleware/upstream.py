@@ -0,0 +1,21 @@
+from django.conf import settings
+
+from movie_backend import upstream
+
+
+class UpstreamBudgetMiddleware:
+    """Give each request a total time budget for TMDb calls
+
+    See ``movie_backend.upstream``; the budget is
+    ``TMDB_CLIENT['REQUEST_BUDGET']`` seconds (0 disables it).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.seconds = getattr(settings, 'TMDB_CLIENT', {}).get('REQUEST_BUDGET', 0)
+
+    def __call__(self, request):
+        if not self.seconds:
+            return self.get_response(request)
+        with upstream.budget(self.seconds):
+            return self.get_response(request)
@@ -0,0 +1,30 @@
+"""JSON parser backed by orjson, falling back to DRF's stdlib parser"""
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from .renderers import FastJSONRenderer, orjson
+
+
+class FastJSONParser(JSONParser):
+    """Drop-in ``JSONParser`` using orjson when available
+
+    orjson rejects NaN and Infinity like the strict stdlib parser, so the
+    fast path is only used with ``STRICT_JSON`` enabled (the default).
+    """
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None or not self.strict:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            body = stream.read()
+            if encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+                body = body.decode(encoding)
+            return orjson.loads(body)
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,131 @@
+"""
+Per-view SQL query budgets.
+
+Views declare how many queries a request may run and how many of those may
+repeat SQL that already ran in the same request (the signature of an N+1):
+
+    class MovieListView(generics.ListAPIView):
+        query_budget = QueryBudget(queries=3)
+
+    @query_budget(queries=2)
+    @api_view(['GET'])
+    def movie_search(request): ...
+
+``QueryBudgetMiddleware`` counts the queries of each request and, depending
+on ``QUERY_BUDGETS['MODE']``, raises (tests), logs and records a metric
+(production, sampled), or does nothing. A system check makes sure every
+view in the configured URLconfs declares a budget.
+"""
+from collections import Counter
+from importlib import import_module
+from typing import Optional
+from django.conf import settings
+from django.core import checks
+from django.urls import URLPattern, URLResolver
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryBudget:
+    """Maximum total and duplicate SQL queries for one request"""
+
+    __slots__ = ('queries', 'duplicates')
+
+    def __init__(self, queries: int, duplicates: int = 0):
+        self.queries = queries
+        self.duplicates = duplicates
+
+    def __repr__(self):
+        return f'QueryBudget(queries={self.queries}, duplicates={self.duplicates})'
+
+
+def query_budget(queries: int, duplicates: int = 0):
+    """Declare a budget on a function view
+
+    Apply it outermost (above ``@api_view``) so it decorates the view
+    function Django resolves.
+    """
+    def decorator(view_func):
+        view_func.query_budget = QueryBudget(queries, duplicates)
+        return view_func
+    return decorator
+
+
+def get_view_budget(view_func) -> Optional[QueryBudget]:
+    """Budget declared on a resolved view function or its class"""
+    budget = getattr(view_func, 'query_budget', None)
+    if budget is None:
+        view_class = getattr(view_func, 'view_class', None) or getattr(view_func, 'cls', None)
+        budget = getattr(view_class, 'query_budget', None)
+    return budget
+
+
+class QueryCounter:
+    """``execute_wrapper`` hook counting queries and repeated SQL"""
+
+    def __init__(self):
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        self.statements[sql] += 1
+        return execute(sql, params, many, context)
+
+    @property
+    def queries(self) -> int:
+        return sum(self.statements.values())
+
+    @property
+    def duplicates(self) -> int:
+        return self.queries - len(self.statements)
+
+    def most_repeated(self):
+        """(sql, count) of the most repeated statement"""
+        return self.statements.most_common(1)[0] if self.statements else ('', 0)
+
+    def violations(self, budget: QueryBudget) -> list:
+        problems = []
+        if self.queries > budget.queries:
+            problems.append(f'{self.queries} queries (budget {budget.queries})')
+        if self.duplicates > budget.duplicates:
+            sql, count = self.most_repeated()
+            problems.append(
+                f'{self.duplicates} duplicate queries (budget {budget.duplicates}); '
+                f'ran {count}x: {sql[:200]}'
+            )
+        return problems
+
+
+def _iter_patterns(patterns, prefix=''):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _iter_patterns(pattern.url_patterns, prefix + str(pattern.pattern))
+        elif isinstance(pattern, URLPattern):
+            yield prefix + str(pattern.pattern), pattern
+
+
+def budgeted_urlconfs():
+    return getattr(settings, 'QUERY_BUDGETS', {}).get('URLCONFS', [])
+
+
+def iter_budgeted_patterns():
+    """(urlconf, route, pattern) for each view that must declare a budget"""
+    for urlconf in budgeted_urlconfs():
+        for route, pattern in _iter_patterns(import_module(urlconf).urlpatterns):
+            yield urlconf, route, pattern
+
+
+def check_view_budgets(app_configs=None, **kwargs):
+    """System check: every view in the budgeted URLconfs declares a budget"""
+    errors = []
+    for urlconf, route, pattern in iter_budgeted_patterns():
+        if get_view_budget(pattern.callback) is None:
+            errors.append(checks.Error(
+                f"View for '{route}' in {urlconf} does not declare a query budget.",
+                hint='Set a query_budget = QueryBudget(...) class attribute, or decorate '
+                     'the function view with @query_budget(...).',
+                obj=f'{urlconf}:{pattern.name or route}',
+                id='query_budget.E001',
+            ))
+    return errors
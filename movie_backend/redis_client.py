@@ -0,0 +1,27 @@
+"""
+Helpers for talking to the Redis server behind the default cache directly.
+
+Used for data structures the Django cache API can't express (sorted sets,
+hashes, Lua scripts). Everything here degrades gracefully when the cache
+backend isn't Redis, e.g. local development with an in-memory cache.
+"""
+from django.conf import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def get_redis_client():
+    """Return the raw Redis client behind the default cache, or None"""
+    try:
+        from django_redis import get_redis_connection
+
+        return get_redis_connection('default')
+    except (ImportError, NotImplementedError):
+        return None
+
+
+def redis_key(*parts) -> str:
+    """Build a raw Redis key namespaced with the cache KEY_PREFIX"""
+    prefix = settings.CACHES.get('default', {}).get('KEY_PREFIX', '')
+    return ':'.join(str(part) for part in ((prefix,) if prefix else ()) + parts)
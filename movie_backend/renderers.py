@@ -0,0 +1,49 @@
+"""
+JSON renderer backed by orjson.
+
+orjson encodes straight to bytes in C. Types it doesn't handle the way DRF
+does (datetimes, Decimals, lazy strings, ...) are passed to DRF's own
+``JSONEncoder.default``, so the output matches ``JSONRenderer`` byte for
+byte, except that floats in exponent notation lose the ``+`` (``1e16``,
+not ``1e+16``) and NaN/Infinity render as ``null`` rather than raising.
+Anything the fast path can't express (indented output, ASCII-only
+or non-compact settings, integers beyond 64 bits) falls back to DRF's
+stdlib implementation, as does everything when orjson isn't installed.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Python-level conversions, shared with the stdlib renderer
+_drf_default = JSONEncoder().default
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+class FastJSONRenderer(JSONRenderer):
+    """Drop-in ``JSONRenderer`` using orjson when available"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=_drf_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same as JSONRenderer: escape U+2028/U+2029 to stay a JavaScript subset
+        if b'\xe2\x80' in ret:
+            ret = ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+        return ret
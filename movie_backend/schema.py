@@ -0,0 +1,121 @@
+"""
+Prebuilt API schemas.
+
+Both schemas are generated once, by ``manage.py build_schema`` at build
+time, into ``API_SCHEMA_DIR``: ``openapi.json`` (OpenAPI 3, drf-spectacular)
+and ``swagger.json`` (Swagger 2.0, drf-yasg). Requests are served from
+those files, read once per process, so neither generator is imported by
+the web workers. If a file is missing (e.g. a local checkout that never
+ran the build), it is generated on first request and kept in memory.
+"""
+from typing import Callable, Dict
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control
+from django.utils.module_loading import import_string
+from django.views.decorators.http import condition
+import hashlib
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_FILES = {
+    'openapi': 'openapi.json',
+    'swagger': 'swagger.json',
+}
+
+_loaded: Dict[str, bytes] = {}
+_lock = threading.Lock()
+
+
+def generate_openapi() -> bytes:
+    """OpenAPI 3 schema from drf-spectacular (``SPECTACULAR_SETTINGS``)"""
+    from drf_spectacular.renderers import OpenApiJsonRenderer
+    from drf_spectacular.settings import spectacular_settings
+
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    return OpenApiJsonRenderer().render(schema, renderer_context={})
+
+
+def generate_swagger() -> bytes:
+    """Swagger 2.0 schema from drf-yasg"""
+    from drf_yasg import openapi
+    from drf_yasg.codecs import OpenAPICodecJson
+    from drf_yasg.generators import OpenAPISchemaGenerator
+
+    info = openapi.Info(
+        title="Movies recommmendation app",
+        default_version='v1',
+        description="APIs for Movies recommendation app",
+        contact=openapi.Contact(email="wanguiwamutitu@gmail.com"),
+        license=openapi.License(name="BSD License"),
+    )
+    schema = OpenAPISchemaGenerator(info).get_schema(request=None, public=True)
+    return OpenAPICodecJson(validators=[]).encode(schema)
+
+
+GENERATORS: Dict[str, Callable[[], bytes]] = {
+    'openapi': generate_openapi,
+    'swagger': generate_swagger,
+}
+
+
+def schema_path(name: str) -> str:
+    return os.path.join(settings.API_SCHEMA_DIR, SCHEMA_FILES[name])
+
+
+def build(name: str) -> str:
+    """Generate a schema and write it to its file; returns the path"""
+    path = schema_path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    content = GENERATORS[name]()
+    with open(path, 'wb') as f:
+        f.write(content)
+    _loaded.pop(name, None)
+    return path
+
+
+def load(name: str) -> bytes:
+    """The schema's bytes: from its file, or generated once if there is none"""
+    content = _loaded.get(name)
+    if content is None:
+        with _lock:
+            content = _loaded.get(name)
+            if content is None:
+                try:
+                    with open(schema_path(name), 'rb') as f:
+                        content = f.read()
+                except FileNotFoundError:
+                    logger.warning(f"{schema_path(name)} not found, generating it; run 'manage.py build_schema'")
+                    content = GENERATORS[name]()
+                _loaded[name] = content
+    return content
+
+
+def _etag(request, name: str) -> str:
+    return hashlib.blake2b(load(name), digest_size=8).hexdigest()
+
+
+@condition(etag_func=_etag)
+def schema_file(request, name: str):
+    """Serve a prebuilt schema"""
+    response = HttpResponse(load(name), content_type='application/json')
+    patch_cache_control(response, public=True, max_age=3600)
+    return response
+
+
+def lazy_view(path: str, **initkwargs):
+    """A class-based view imported on its first request rather than with the URLconf"""
+    view = None
+
+    def wrapper(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            view = import_string(path).as_view(**initkwargs)
+        return view(request, *args, **kwargs)
+
+    wrapper.csrf_exempt = True
+    return wrapper
@@ -0,0 +1,78 @@
+from typing import Optional
+import logging
+import time
+import uuid
+
+from .redis_client import get_redis_client, redis_key
+
+logger = logging.getLogger(__name__)
+
+# Drop expired holders, then take a slot if one is free
+ACQUIRE_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1] - ARGV[2])
+if redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[3]) then
+    redis.call('ZADD', KEYS[1], ARGV[1], ARGV[4])
+    redis.call('PEXPIRE', KEYS[1], math.ceil(ARGV[2] * 1000))
+    return 1
+end
+return 0
+"""
+
+# Returned when Redis can't be reached; the caller is admitted (fail open)
+UNTRACKED = ''
+
+
+class RedisSemaphore:
+    """Counting semaphore shared by every worker process through Redis
+
+    Holders are members of a sorted set scored by acquire time, so a slot
+    held by a crashed worker frees itself after ``timeout`` seconds.
+    """
+
+    def __init__(self, name: str, limit: int, timeout: float):
+        self.key = redis_key('semaphore', name)
+        self.limit = limit
+        self.timeout = timeout
+        self._script = None
+
+    def _get_script(self):
+        if self._script is None:
+            client = get_redis_client()
+            if client is None:
+                return None
+            self._script = client.register_script(ACQUIRE_SCRIPT)
+        return self._script
+
+    def acquire(self, limit: Optional[int] = None) -> Optional[str]:
+        """Take a slot; returns a release token, or None when all slots are taken"""
+        token = uuid.uuid4().hex
+        try:
+            script = self._get_script()
+            if script is None:
+                return UNTRACKED
+            acquired = script(
+                keys=[self.key],
+                args=[time.time(), self.timeout, limit if limit is not None else self.limit, token],
+            )
+        except Exception as e:
+            logger.error(f"Semaphore acquire error for {self.key}: {e}")
+            return UNTRACKED
+        return token if acquired else None
+
+    def release(self, token: Optional[str]):
+        """Give back a slot taken by ``acquire``"""
+        if not token:
+            return
+        try:
+            get_redis_client().zrem(self.key, token)
+        except Exception as e:
+            logger.error(f"Semaphore release error for {self.key}: {e}")
+
+    def count(self) -> int:
+        """Number of slots currently held"""
+        try:
+            client = get_redis_client()
+            return client.zcount(self.key, time.time() - self.timeout, '+inf') if client else 0
+        except Exception as e:
+            logger.error(f"Semaphore count error for {self.key}: {e}")
+            return 0
@@ -11,9 +11,10 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
 import os
+import sys
 import dj_database_url
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 from datetime import timedelta
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -28,6 +29,10 @@ SECRET_KEY = config('SECRET_KEY', default="django-insecure-_8r8d@a%bi)y*dipk$#8z
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = config('DEBUG', default=True, cast=bool)
 
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+# Runs the apps' tests; the test_*.py scripts at the root are manual checks
+TEST_RUNNER = 'movie_backend.test_runner.AppTestRunner'
+
 # Determine if we're on Render
 RENDER = config('RENDER', default=False, cast=bool)
 
@@ -57,6 +62,25 @@ else:
 TMDB_API_KEY = config("TMDB_API_KEY", default="")
 TMDB_BASE_URL = config("TMDB_BASE_URL", default="https://api.themoviedb.org/3")
 
+TMDB_CLIENT = {
+    'CONNECT_TIMEOUT': config('TMDB_CONNECT_TIMEOUT', default=3.05, cast=float),
+    'READ_TIMEOUT': config('TMDB_READ_TIMEOUT', default=10.0, cast=float),
+    # Retries for connection errors, 5xx and 429 responses
+    'MAX_RETRIES': config('TMDB_MAX_RETRIES', default=2, cast=int),
+    'RETRY_BACKOFF': 0.25,  # seconds, doubled per attempt
+    'MAX_RETRY_AFTER': 5.0,  # longest 429 Retry-After we are willing to wait
+    # Total upstream seconds per incoming request (0 disables the budget)
+    'REQUEST_BUDGET': config('TMDB_REQUEST_BUDGET', default=3.0, cast=float),
+    'POOL_SIZE': config('TMDB_POOL_SIZE', default=10, cast=int),
+    # Shared across workers through the cache; see movie_backend/circuit_breaker.py
+    'CIRCUIT_BREAKER': {
+        'FAILURE_THRESHOLD': config('TMDB_BREAKER_FAILURES', default=5, cast=int),
+        'FAILURE_WINDOW': 30,  # seconds in which the failures must happen
+        'RESET_TIMEOUT': config('TMDB_BREAKER_RESET', default=30, cast=int),
+        'PROBE_TIMEOUT': 15,  # seconds before a stuck half-open probe is retried
+    },
+}
+
 # Application definition
 INSTALLED_APPS = [
     "django.contrib.admin",
@@ -68,7 +92,6 @@ INSTALLED_APPS = [
     "rest_framework",
     "rest_framework_simplejwt.token_blacklist",
     "corsheaders",  # Add this for frontend integration
-    "drf_yasg",
     'drf_spectacular',
     "movies",
     "users",
@@ -77,6 +100,13 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",  # Add for static files
+    "movie_backend.middleware.instrumentation.RequestMetricsMiddleware",
+    "movie_backend.middleware.compression.CompressionMiddleware",
+    "movie_backend.middleware.query_budget.QueryBudgetMiddleware",
+    "movie_backend.middleware.upstream.UpstreamBudgetMiddleware",
+    "movie_backend.middleware.concurrency.AdaptiveConcurrencyMiddleware",
+    "movie_backend.middleware.db_routing.ReplicaRoutingMiddleware",
+    "movie_backend.middleware.rate_limit.RateLimitHeadersMiddleware",
     "corsheaders.middleware.CorsMiddleware",  # Add for CORS
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -118,6 +148,9 @@ if RENDER:
             conn_health_checks=True,
         )
     }
+elif config("DATABASE_URL", default=""):
+    # Any database URL, e.g. sqlite:///primary.sqlite3 for local replica testing
+    DATABASES = {"default": dj_database_url.parse(config("DATABASE_URL"))}
 else:
     # Development database configuration
     DATABASES = {
@@ -131,6 +164,50 @@ else:
         }
     }
 
+# Read replicas (see movie_backend/db/router.py): comma-separated database URLs,
+# available as the aliases replica_1, replica_2, ...
+DATABASE_REPLICA_URLS = config("DATABASE_REPLICA_URLS", default="", cast=Csv())
+for index, url in enumerate(DATABASE_REPLICA_URLS, 1):
+    DATABASES[f"replica_{index}"] = {**dj_database_url.parse(url), "TEST": {"MIRROR": "default"}}
+
+DATABASE_REPLICAS = {
+    "ALIASES": [f"replica_{index}" for index in range(1, len(DATABASE_REPLICA_URLS) + 1)],
+    # Only catalog reads go to replicas; auth, favorites and sessions stay on the primary
+    "MODELS": ["movies.movie", "movies.genre", "movies.movie_genres"],
+    # After a catalog write, the client reads from the primary for this long
+    "STICKY_SECONDS": config("DATABASE_REPLICA_STICKY_SECONDS", default=5, cast=int),
+    # Replicas further behind than this (or unreachable) are drained
+    "MAX_LAG_SECONDS": config("DATABASE_REPLICA_MAX_LAG", default=10.0, cast=float),
+    "LAG_CHECK_INTERVAL": 5.0,
+}
+DATABASE_ROUTERS = ["movie_backend.db.router.ReplicaRouter"] if DATABASE_REPLICA_URLS else []
+
+# Connection strategy (see movie_backend/db): pool, persistent or per_request
+DB_CONNECTION_MODE = config("DB_CONNECTION_MODE", default="persistent")
+for database in DATABASES.values():
+    if DB_CONNECTION_MODE == "pool" and database["ENGINE"] == "django.db.backends.postgresql":
+        database.update({
+            "ENGINE": "movie_backend.db.backends.postgresql_pool",
+            # Closing a pooled connection returns it to the pool
+            "CONN_MAX_AGE": 0,
+        })
+        database.setdefault("OPTIONS", {})["pool"] = {
+            # Per worker process; keep max_size * workers below Postgres max_connections
+            "min_size": config("DB_POOL_MIN_SIZE", default=2, cast=int),
+            "max_size": config("DB_POOL_MAX_SIZE", default=10, cast=int),
+            "timeout": config("DB_POOL_TIMEOUT", default=10.0, cast=float),
+            "max_idle": config("DB_POOL_MAX_IDLE", default=300.0, cast=float),
+            "max_lifetime": config("DB_POOL_MAX_LIFETIME", default=3600.0, cast=float),
+            "check": True,
+        }
+    elif DB_CONNECTION_MODE == "persistent":
+        database.update({
+            "CONN_MAX_AGE": config("DB_CONN_MAX_AGE", default=600, cast=int),
+            "CONN_HEALTH_CHECKS": True,
+        })
+    else:
+        database["CONN_MAX_AGE"] = 0
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -149,6 +226,28 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Request threads per gunicorn worker process (gunicorn.conf.py)
+WEB_THREADS = config('WEB_THREADS', default=8, cast=int)
+
+# Only a few request threads may hash passwords at once, so login/registration
+# bursts are shed with a 429 instead of occupying every thread.
+# Use `manage.py bench_password_hashing` to pick PBKDF2_ITERATIONS.
+AUTH_HASHING = {
+    'CONCURRENCY': config('AUTH_HASHING_CONCURRENCY', default=max(1, WEB_THREADS // 4), cast=int),  # per process
+    'GLOBAL_LIMIT': config('AUTH_HASHING_GLOBAL_LIMIT', default=8, cast=int),  # across all workers, 0 disables
+    'TIMEOUT': config('AUTH_HASHING_TIMEOUT', default=5.0, cast=float),  # slot lease in Redis
+    'RETRY_AFTER': 1,
+    'PBKDF2_ITERATIONS': config('AUTH_PBKDF2_ITERATIONS', default=600000, cast=int),
+}
+
+PASSWORD_HASHERS = [
+    "users.hashers.TunablePBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/topics/i18n/
 
@@ -172,12 +271,37 @@ if RENDER:
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# JWT authentication mode:
+# - "database": load the user row from the database on every request
+# - "cached": load the user row through a short-TTL cache
+# - "stateless": build the user from token claims (signature check only).
+#   Claims such as is_staff/is_superuser are trusted until the access token
+#   expires (ACCESS_TOKEN_LIFETIME), so a deactivated or demoted user keeps
+#   them meanwhile. Staff-only API views re-check through the cached user row
+#   (users.permissions.IsStaffUser); other code reading request.user.is_staff
+#   must do the same.
+JWT_AUTH_MODE = config('JWT_AUTH_MODE', default='database')
+
+JWT_AUTHENTICATION_CLASSES = {
+    'database': "rest_framework_simplejwt.authentication.JWTAuthentication",
+    'cached': "users.authentication.CachedUserJWTAuthentication",
+    'stateless': "rest_framework_simplejwt.authentication.JWTStatelessUserAuthentication",
+}
+
+if JWT_AUTH_MODE == 'database':
+    AUTHENTICATION_CLASSES = [
+        JWT_AUTHENTICATION_CLASSES['database'],
+        "rest_framework.authentication.SessionAuthentication",
+    ]
+else:
+    # Session auth costs a cache hit per anonymous request; keep it only for the browsable API
+    AUTHENTICATION_CLASSES = [JWT_AUTHENTICATION_CLASSES[JWT_AUTH_MODE]] + (
+        ["rest_framework.authentication.SessionAuthentication"] if DEBUG else []
+    )
+
 # REST Framework Configuration
 REST_FRAMEWORK = {
-    "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
-        "rest_framework.authentication.SessionAuthentication",
-    ],
+    "DEFAULT_AUTHENTICATION_CLASSES": AUTHENTICATION_CLASSES,
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
     ],
@@ -185,8 +309,18 @@ REST_FRAMEWORK = {
     "PAGE_SIZE": 20,
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'movie_backend.renderers.FastJSONRenderer',
     ] + (['rest_framework.renderers.BrowsableAPIRenderer'] if DEBUG else []),
+    'DEFAULT_PARSER_CLASSES': [
+        'movie_backend.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Proxies in front of the app (Render's load balancer; none elsewhere):
+    # the client IP used by throttles is that many hops from the end of
+    # X-Forwarded-For, so addresses a client adds are ignored. With 0 the
+    # header is ignored and REMOTE_ADDR is used
+    'NUM_PROXIES': config('NUM_PROXIES', default=1 if RENDER else 0, cast=int),
 }
 
 # JWT Configuration
@@ -207,6 +341,7 @@ SIMPLE_JWT = {
     "USER_ID_CLAIM": "user_id",
     "AUTH_TOKEN_CLASSES": ("rest_framework_simplejwt.tokens.AccessToken",),
     "TOKEN_TYPE_CLAIM": "token_type",
+    "TOKEN_USER_CLASS": "users.authentication.ClaimsTokenUser",
 }
 
 # Redis Cache Configuration
@@ -236,8 +371,219 @@ CACHE_TTL = {
     'POPULAR_MOVIES': 60 * 30,       
     'TOP_RATED_MOVIES': 60 * 60,     
     'MOVIE_DETAILS': 60 * 60 * 2,    
+    # Last good TMDb payloads, served when TMDb is slow or failing
+    'TMDB_STALE': 60 * 60 * 24 * 7,
     'GENRES': 60 * 60 * 24,          
     'SEARCH_RESULTS': 60 * 10,      
+    'USER_FAVORITES': 60 * 5,
+    'USER_RECOMMENDATIONS': 60 * 30,
+    'AUTH_USER': 60,
+    # Serialized movie detail payloads (detail and batch endpoints)
+    'MOVIE_PAYLOAD': 60 * 60,
+    # Compressed bodies of cacheable API responses, keyed by content hash
+    'COMPRESSED_RESPONSES': 60 * 10,
+}
+
+# Per-key TTLs for TMDb payloads, adapted to how often each key's content changes
+# (see CacheService.adaptive_ttl). CACHE_TTL values above are the starting TTLs.
+ADAPTIVE_TTL = {
+    'ENABLED': config('ADAPTIVE_TTL_ENABLED', default=True, cast=bool),
+    # Unchanged payload: TTL * GROWTH; changed payload: TTL * SHRINK
+    'GROWTH': 1.5,
+    'SHRINK': 0.5,
+    # Bounds as multiples of the category's CACHE_TTL ...
+    'MIN_FACTOR': 0.25,
+    'MAX_FACTOR': 8,
+    # ... or in seconds per category, e.g. {'TRENDING_MOVIES': (300, 3600)}
+    'BOUNDS': {
+        'SEARCH_RESULTS': (60 * 5, 60 * 60),
+    },
+    # Expirations are spread over the last JITTER (fraction) of each TTL
+    'JITTER': 0.1,
+    'STATE_TTL': 60 * 60 * 24 * 7,
+}
+
+# Personalized recommendations (built from the genres of a user's favorites)
+PERSONAL_RECOMMENDATIONS = {
+    'NEIGHBOURS_PER_MOVIE': 50,
+    'RESULTS_LIMIT': 20,
+    # Add/subtract one favorite's contribution instead of recomputing everything
+    'INCREMENTAL_UPDATES': config('RECOMMENDATIONS_INCREMENTAL_UPDATES', default=True, cast=bool),
+    # Bulk syncs changing more favorites than this drop the user's caches
+    # instead of updating them per movie
+    'INCREMENTAL_BATCH_LIMIT': 5,
+    # Per-user lock around cache updates; if it can't be taken within LOCK_WAIT
+    # seconds, the user's caches are dropped instead
+    'LOCK_TIMEOUT': 10,
+    'LOCK_WAIT': 0.5,
+}
+
+# Batch movie lookups (GET /api/movies/batch/?ids=...)
+MOVIE_BATCH = {
+    'MAX_IDS': 100,
+    # Fetch ids missing locally from TMDb when the client asks for it
+    'TMDB_FILL': config('MOVIE_BATCH_TMDB_FILL', default=True, cast=bool),
+    'MAX_TMDB_FETCHES': 10,
+    'TMDB_WORKERS': config('MOVIE_BATCH_TMDB_WORKERS', default=4, cast=int),
+}
+
+# API response compression (see movie_backend/middleware/compression.py)
+COMPRESSION = {
+    'ENABLED': config('COMPRESSION_ENABLED', default=True, cast=bool),
+    'PATH_PREFIXES': ['/api/'],
+    'CONTENT_TYPES': ['application/json', 'application/x-ndjson', 'text/csv'],
+    # Smaller bodies gain less than the compression costs
+    'MIN_SIZE': config('COMPRESSION_MIN_SIZE', default=1024, cast=int),
+    # 0 disables an encoding; see "manage.py bench_compression"
+    'BROTLI_LEVEL': config('COMPRESSION_BROTLI_LEVEL', default=5, cast=int),
+    'GZIP_LEVEL': config('COMPRESSION_GZIP_LEVEL', default=6, cast=int),
+    # Only bodies at least this large have their compressed bytes cached
+    'CACHE_MIN_SIZE': config('COMPRESSION_CACHE_MIN_SIZE', default=4096, cast=int),
+}
+
+# Rows per server-side cursor fetch (and genre query) in catalog exports
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
+# Cache keyspace analytics (see movie_backend/keyspace.py)
+CACHE_ANALYTICS = {
+    'ENABLED': config('CACHE_ANALYTICS_ENABLED', default=True, cast=bool),
+    'FLUSH_INTERVAL': 5,
+    'HOT_KEYS_HALF_LIFE': 600,  # seconds
+    'HOT_KEYS_MAX': 2000,
+    # Each sampling step scans at most this many keys, or runs this long
+    'STEP_MAX_KEYS': config('CACHE_ANALYTICS_STEP_MAX_KEYS', default=2000, cast=int),
+    'STEP_BUDGET_MS': config('CACHE_ANALYTICS_STEP_BUDGET_MS', default=50, cast=int),
+    'SCAN_COUNT': 200,
+    # Fraction of scanned keys whose MEMORY USAGE is measured
+    'MEMORY_SAMPLE_RATE': config('CACHE_ANALYTICS_MEMORY_SAMPLE_RATE', default=0.1, cast=float),
+}
+
+# Access-frequency driven cache warming (see movies/services/warming_service.py)
+CACHE_WARMING = {
+    'ENABLED': config('CACHE_WARMING_ENABLED', default=True, cast=bool),
+    # Accesses lose half their weight in the ranking after this many seconds
+    'HALF_LIFE': 60 * 60,
+    # Most accessed lookups kept in the shared sketch
+    'MAX_KEYS': 10000,
+    'FLUSH_INTERVAL': 5,
+    # Defaults for "manage.py cache_warm" and the warm_caches task
+    'TOP': config('CACHE_WARMING_TOP', default=200, cast=int),
+    'CONCURRENCY': config('CACHE_WARMING_CONCURRENCY', default=8, cast=int),
+    'BUDGET': config('CACHE_WARMING_BUDGET', default=30.0, cast=float),
+}
+
+# GCRA throttle for the public catalog endpoints (see movie_backend/throttling.py)
+CATALOG_THROTTLE = {
+    'ENABLED': config('CATALOG_THROTTLE_ENABLED', default=True, cast=bool),
+    # Cost units per window; the whole window's budget may be spent as a burst
+    'RATES': {
+        'anon': config('CATALOG_THROTTLE_ANON_RATE', default='300/min'),
+        'user': config('CATALOG_THROTTLE_USER_RATE', default='1200/min'),
+    },
+    # Cost per request by URL name; "<name>:search" applies when ?search= is given
+    'COSTS': {
+        'default': 1,
+        'movie-detail': 1,
+        'genre-list': 1,
+        'movie-list': 2,
+        'movie-list:search': 10,
+        'trending-movies': 2,
+        'recommended-movies': 2,
+        'movie-search': 10,
+        'movie-batch': 5,
+    },
+}
+
+# Adaptive concurrency limits per endpoint class (see movie_backend/concurrency.py)
+ADAPTIVE_CONCURRENCY = {
+    'ENABLED': config('ADAPTIVE_CONCURRENCY_ENABLED', default=True, cast=bool),
+    # Limits are per worker process, sized from its threads (gunicorn.conf.py);
+    # PRIORITY 0 is served first
+    'CLASSES': {
+        'read': {'PRIORITY': 0, 'INITIAL_LIMIT': WEB_THREADS, 'MIN_LIMIT': max(2, WEB_THREADS // 4), 'MAX_LIMIT': WEB_THREADS},
+        'search': {'PRIORITY': 1, 'INITIAL_LIMIT': max(1, WEB_THREADS // 2), 'MIN_LIMIT': 1, 'MAX_LIMIT': WEB_THREADS},
+        'ingest': {'PRIORITY': 2, 'INITIAL_LIMIT': max(1, WEB_THREADS // 4), 'MIN_LIMIT': 1, 'MAX_LIMIT': max(1, WEB_THREADS // 2)},
+    },
+    # Class by URL name; "<name>:<param>" applies when the query parameter is set
+    'VIEWS': {
+        'movie-list': 'read',
+        'movie-detail': 'read',
+        'genre-list': 'read',
+        'trending-movies': 'read',
+        'recommended-movies': 'read',
+        'movie-batch': 'read',
+        'movie-list:search': 'search',
+        'movie-search': 'search',
+        'movie-batch:fill_from_tmdb': 'ingest',
+    },
+    # Window latency may reach this multiple of the baseline before limits shrink
+    'TOLERANCE': config('ADAPTIVE_CONCURRENCY_TOLERANCE', default=2.0, cast=float),
+    'WINDOW_SECONDS': 0.5,  # limits are updated at most this often
+    'MIN_SAMPLES': 10,  # requests per update
+    'BASELINE_WINDOWS': 600,  # windows averaged into the baseline latency (about 5 minutes)
+    'SMOOTHING': 0.2,
+    'BACKOFF': 0.9,  # limit multiplier on a server error
+    'CONGESTION_SECONDS': 1.0,
+    'RETRY_AFTER': 1,
+}
+
+# Django admin changelists (movies/admin.py)
+ADMIN_CHANGELISTS = {
+    # Above this many rows, page counts use the planner's estimate instead of COUNT(*)
+    'ESTIMATED_COUNT_THRESHOLD': config('ADMIN_ESTIMATED_COUNT_THRESHOLD', default=100000, cast=int),
+    # Movies refreshed per "Refresh selected movies from TMDb" action
+    'REFRESH_LIMIT': 100,
+}
+
+# Celery (see movie_backend/celery.py and movies/tasks.py)
+CELERY_BROKER_URL = config('CELERY_BROKER_URL', default=config('REDIS_URL', default='redis://127.0.0.1:6379/1'))
+CELERY_RESULT_BACKEND = config('CELERY_RESULT_BACKEND', default=None)
+# Run tasks inline, without a broker or worker (tests, local runs); use CELERY_BROKER_URL=memory://
+CELERY_TASK_ALWAYS_EAGER = config('CELERY_TASK_ALWAYS_EAGER', default=TESTING, cast=bool)
+CELERY_TASK_EAGER_PROPAGATES = True
+CELERY_TASK_SERIALIZER = 'json'
+CELERY_ACCEPT_CONTENT = ['json']
+CELERY_TIMEZONE = TIME_ZONE
+# Units are idempotent, so redeliver them if a worker dies mid-task
+CELERY_TASK_ACKS_LATE = True
+CELERY_TASK_REJECT_ON_WORKER_LOST = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_TASK_SOFT_TIME_LIMIT = 300
+CELERY_TASK_TIME_LIMIT = 360
+CELERY_BEAT_SCHEDULE = {
+    'refresh-catalog': {'task': 'movies.tasks.refresh_catalog', 'schedule': 60 * 60 * 6},
+    'refresh-movie-details': {'task': 'movies.tasks.refresh_movie_details', 'schedule': 60 * 60},
+    # Shortly before the trending cache (CACHE_TTL['TRENDING_MOVIES']) expires
+    'warm-caches': {'task': 'movies.tasks.warm_caches', 'schedule': 60 * 10},
+}
+
+# Ingestion task sizes (movies/tasks.py)
+INGESTION_TASKS = {
+    'CATEGORIES': ['popular', 'top_rated', 'trending'],
+    'PAGES': config('INGESTION_PAGES', default=5, cast=int),
+    'DETAILS_LIMIT': config('INGESTION_DETAILS_LIMIT', default=200, cast=int),
+    'DETAILS_CHUNK_SIZE': 20,
+    # Skip a unit while an identical one has been running for less than this
+    'LOCK_TIMEOUT': 300,
+}
+
+# Request performance metrics (see movie_backend/metrics.py)
+METRICS = {
+    'ENABLED': config('METRICS_ENABLED', default=True, cast=bool),
+    'PATH_PREFIXES': ['/api/'],
+    'SAMPLE_RATE': config('METRICS_SAMPLE_RATE', default=1.0, cast=float),
+    'FLUSH_INTERVAL': 10,  # seconds between pushes of worker histograms to Redis
+    'RETENTION': 60 * 60 * 24,
+}
+
+# Per-view SQL query budgets (see movie_backend/query_budget.py)
+QUERY_BUDGETS = {
+    # raise: fail the request (tests), log: warn and record a metric, off
+    'MODE': config('QUERY_BUDGET_MODE', default='raise' if TESTING else 'log'),
+    'SAMPLE_RATE': config('QUERY_BUDGET_SAMPLE_RATE', default=1.0 if DEBUG else 0.05, cast=float),
+    'PATH_PREFIXES': ['/api/'],
+    # Every view in these URLconfs must declare a budget (system check)
+    'URLCONFS': ['movies.urls', 'users.urls'],
 }
 
 # API Documentation
@@ -249,6 +595,17 @@ SPECTACULAR_SETTINGS = {
     'SCHEMA_PATH_PREFIX': '/api/',
 }
 
+# Schemas written by "manage.py build_schema" and served as files (see movie_backend/schema.py);
+# drf-yasg only generates swagger.json there, so it isn't an installed app
+API_SCHEMA_DIR = config('API_SCHEMA_DIR', default=os.path.join(BASE_DIR, 'schema'))
+
+# Import time budgets in ms, checked by "manage.py import_budget"
+IMPORT_BUDGET = {
+    'worker': config('IMPORT_BUDGET_WORKER_MS', default=650, cast=int),  # WSGI app and URLconf
+    'manage': config('IMPORT_BUDGET_MANAGE_MS', default=650, cast=int),  # django.setup() and a command
+    'celery': config('IMPORT_BUDGET_CELERY_MS', default=800, cast=int),  # Celery app and task modules
+}
+
 # CORS Configuration (for frontend integration)
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",  # React development server
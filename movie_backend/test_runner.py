@@ -0,0 +1,16 @@
+"""
+Test runner for ``manage.py test``.
+
+Without labels, Django discovers tests from the project root, which also
+imports the ``test_*.py`` scripts there. Those are manual checks against a
+running server and the live TMDb API (``python3 test_auth.py``), not unit
+tests, so a bare ``manage.py test`` runs the apps' tests only.
+"""
+from django.test.runner import DiscoverRunner
+
+TEST_APPS = ['movies', 'users']
+
+
+class AppTestRunner(DiscoverRunner):
+    def build_suite(self, test_labels=None, *args, **kwargs):
+        return super().build_suite(test_labels or TEST_APPS, *args, **kwargs)
@@ -0,0 +1,166 @@
+"""
+GCRA rate limiting for the catalog endpoints.
+
+The generic cell rate algorithm keeps one number per client, its
+"theoretical arrival time" (TAT): each request pushes the TAT forward by
+``cost * period / limit`` and is allowed while the TAT stays within
+``period`` (the burst allowance) of now. It behaves like a sliding window
+without storing individual requests, and the check-and-update is a single
+Lua script call, so each request costs one Redis round trip. Without Redis
+the state is kept per process.
+
+Clients share one budget across the catalog endpoints; each endpoint
+charges its own cost (``CATALOG_THROTTLE['COSTS']``), so a search costs
+several detail lookups. Anonymous clients (by IP) and authenticated users
+(by id) have separate rates.
+"""
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+import logging
+import math
+import threading
+import time
+
+from .redis_client import get_redis_client, redis_key
+
+logger = logging.getLogger(__name__)
+
+# KEYS: client key. ARGV: emission interval (ms per unit of cost), burst (ms), cost.
+# Returns {allowed, remaining cost, retry after ms, reset after ms}.
+GCRA_SCRIPT = """
+local clock = redis.call('TIME')
+local now = clock[1] * 1000 + math.floor(clock[2] / 1000)
+local interval = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local increment = interval * tonumber(ARGV[3])
+local tat = math.max(tonumber(redis.call('GET', KEYS[1]) or now), now)
+local new_tat = tat + increment
+local allow_at = new_tat - burst
+if now < allow_at then
+    return {0, math.floor((burst - (tat - now)) / interval), allow_at - now, tat - now}
+end
+redis.call('SET', KEYS[1], new_tat, 'PX', math.max(1, new_tat - now))
+return {1, math.floor((burst - (new_tat - now)) / interval), 0, new_tat - now}
+"""
+
+PERIODS = {'s': 1, 'sec': 1, 'm': 60, 'min': 60, 'h': 3600, 'hour': 3600, 'd': 86400, 'day': 86400}
+
+
+def parse_rate(rate: str) -> Tuple[int, int]:
+    """'300/min' -> (300, 60); also '10/5s'"""
+    count, _, period = rate.partition('/')
+    digits = ''.join(ch for ch in period if ch.isdigit())
+    unit = period[len(digits):]
+    return int(count), int(digits or 1) * PERIODS[unit]
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float  # seconds
+    reset_after: float  # seconds until the budget is full again
+    policy: str
+
+
+class GCRALimiter:
+    """GCRA in Redis (one Lua call per check), or per process without Redis"""
+
+    def __init__(self, name: str = 'catalog'):
+        self.name = name
+        self._script = None
+        self._local: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def key(self, ident: str) -> str:
+        return redis_key('throttle', self.name, ident)
+
+    def check(self, ident: str, limit: int, period: int, cost: int = 1) -> Optional[Tuple[int, int, float, float]]:
+        """(allowed, remaining cost, retry after ms, reset after ms), or None if Redis failed"""
+        interval = period * 1000 / limit
+        burst = period * 1000
+        client = get_redis_client()
+        if client is None:
+            return self._check_local(self.key(ident), interval, burst, cost)
+        try:
+            if self._script is None:
+                self._script = client.register_script(GCRA_SCRIPT)
+            allowed, remaining, retry_after, reset_after = self._script(
+                keys=[self.key(ident)], args=[interval, burst, cost],
+            )
+            return int(allowed), int(remaining), float(retry_after), float(reset_after)
+        except Exception as e:
+            logger.error(f"Throttle check error: {e}")
+            return None
+
+    def _check_local(self, key: str, interval: float, burst: float, cost: int):
+        now = time.monotonic() * 1000
+        with self._lock:
+            tat = max(self._local.get(key, now), now)
+            new_tat = tat + interval * cost
+            allow_at = new_tat - burst
+            if now < allow_at:
+                return 0, math.floor((burst - (tat - now)) / interval), allow_at - now, tat - now
+            self._local[key] = new_tat
+            if len(self._local) > 100000:
+                # Drop clients whose budget is full again
+                self._local = {k: v for k, v in self._local.items() if v > now}
+            return 1, math.floor((burst - (new_tat - now)) / interval), 0.0, new_tat - now
+
+
+limiter = GCRALimiter()
+
+
+class CatalogRateThrottle(BaseThrottle):
+    """Cost-weighted GCRA throttle for the read-only catalog endpoints
+
+    Rates are ``CATALOG_THROTTLE['RATES']['anon' | 'user']``; a view's cost
+    comes from ``COSTS`` by URL name (``<name>:search`` when the request
+    has a ``search`` parameter). The result is left on the request for
+    ``RateLimitHeadersMiddleware``. Redis errors let the request through.
+    """
+
+    def __init__(self):
+        self.options = getattr(settings, 'CATALOG_THROTTLE', {})
+        self.result: Optional[RateLimitResult] = None
+
+    def get_cost(self, request, view) -> int:
+        costs = self.options.get('COSTS', {})
+        match = getattr(request, 'resolver_match', None)
+        name = match.url_name if match else ''
+        if request.query_params.get('search') and f'{name}:search' in costs:
+            name = f'{name}:search'
+        return costs.get(name, costs.get('default', 1))
+
+    def allow_request(self, request, view) -> bool:
+        # Cache warm-up replays (set server-side, see movies.services.warming_service)
+        if not self.options.get('ENABLED', True) or getattr(request._request, 'warm_up', False):
+            return True
+        user = request.user
+        if user and user.is_authenticated:
+            scope, ident = 'user', f'user:{user.pk}'
+        else:
+            scope, ident = 'anon', f'anon:{self.get_ident(request)}'
+        limit, period = parse_rate(self.options.get('RATES', {}).get(scope, '300/min'))
+        cost = self.get_cost(request, view)
+
+        checked = limiter.check(ident, limit, period, cost)
+        if checked is None:
+            return True
+        allowed, remaining, retry_after, reset_after = checked
+        self.result = RateLimitResult(
+            allowed=bool(allowed),
+            limit=limit,
+            remaining=max(0, remaining),
+            retry_after=retry_after / 1000,
+            reset_after=reset_after / 1000,
+            policy=f'{limit};w={period}',
+        )
+        request._request.rate_limit = self.result
+        return self.result.allowed
+
+    def wait(self) -> Optional[float]:
+        return self.result.retry_after if self.result else None
@@ -0,0 +1,35 @@
+"""
+Per-request time budget for upstream (TMDb) calls.
+
+``UpstreamBudgetMiddleware`` opens a budget for each request; upstream
+clients ask ``remaining()`` how long they may still wait and shorten their
+timeouts, or give up immediately, so a slow upstream can't hold a worker
+for the full client timeout. Outside a request (management commands,
+Celery tasks) there is no budget and ``remaining()`` returns None.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+import time
+
+_deadline: ContextVar[Optional[float]] = ContextVar('upstream_deadline', default=None)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current budget, or None when there is no budget"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+@contextmanager
+def budget(seconds: float):
+    """Limit upstream time in the block; nested budgets never extend an outer one"""
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(deadline if outer is None else min(deadline, outer))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
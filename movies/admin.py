@@ -1,5 +1,90 @@
-from django.contrib import admin
+from datetime import date
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchQuery, SearchVector
+from django.db import connections
+from django.db.models import Exists, OuterRef, Q
+from movie_backend.paginators import EstimatedCountPaginator
 from .models import Movie, Genre, UserFavorite
+from .services.movie_service import movie_service
+
+
+class InputFilter(admin.SimpleListFilter):
+    """List filter with a text box (and suggestions) instead of one link per value
+
+    Link filters list every distinct value, which on a large table is a
+    query over all of it; this one only filters by what was typed.
+    """
+    template = 'admin/movies/input_filter.html'
+    placeholder = ''
+
+    def lookups(self, request, model_admin):
+        # Only used as suggestions for the text box
+        return [(value, value) for value in self.suggestions()]
+
+    def suggestions(self):
+        return []
+
+    def has_output(self):
+        return True
+
+    def choices(self, changelist):
+        yield {
+            'parameter_name': self.parameter_name,
+            'value': self.value() or '',
+            'placeholder': self.placeholder,
+            'suggestions': [value for value, _ in self.lookup_choices],
+            'hidden': [
+                (name, value) for name, value in changelist.params.items()
+                if name not in (self.parameter_name, 'p')
+            ],
+            'clear_query_string': changelist.get_query_string(remove=[self.parameter_name]),
+        }
+
+
+class GenreFilter(InputFilter):
+    title = 'genre'
+    parameter_name = 'genre'
+    placeholder = 'Genre name'
+
+    def suggestions(self):
+        return list(Genre.objects.values_list('name', flat=True))
+
+    def queryset(self, request, queryset):
+        if not self.value():
+            return queryset
+        # EXISTS instead of a join, so the changelist needs no DISTINCT
+        through = Movie.genres.through.objects.filter(movie_id=OuterRef('pk'), genre__name__iexact=self.value())
+        return queryset.filter(Exists(through))
+
+
+class ReleaseYearFilter(InputFilter):
+    title = 'release year'
+    parameter_name = 'year'
+    placeholder = '1999 or 1990-1999'
+
+    def queryset(self, request, queryset):
+        value = (self.value() or '').replace(' ', '')
+        first, _, last = value.partition('-')
+        if not first.isdigit() or (last and not last.isdigit()):
+            return queryset
+        # A range on the indexed date, not a year extraction over every row
+        return queryset.filter(
+            release_date__gte=date(int(first), 1, 1),
+            release_date__lte=date(int(last or first), 12, 31),
+        )
+
+
+class LanguageFilter(InputFilter):
+    title = 'original language'
+    parameter_name = 'language'
+    placeholder = 'ISO code, e.g. en'
+
+    def queryset(self, request, queryset):
+        if not self.value():
+            return queryset
+        return queryset.filter(original_language=self.value().strip().lower())
 
 
 @admin.register(Genre)
@@ -12,22 +97,27 @@ class GenreAdmin(admin.ModelAdmin):
 @admin.register(Movie)
 class MovieAdmin(admin.ModelAdmin):
     list_display = [
-        'title', 
-        'release_date', 
-        'vote_average', 
-        'popularity', 
+        'title',
+        'release_date',
+        'vote_average',
+        'popularity',
         'status'
     ]
     list_filter = [
-        'status', 
-        'release_date', 
-        'genres',
-        'original_language'
+        'status',
+        ReleaseYearFilter,
+        GenreFilter,
+        LanguageFilter,
     ]
-    search_fields = ['title', 'original_title', 'overview']
+    # On PostgreSQL, get_search_results also matches the overview by full-text search
+    search_fields = ['title', 'original_title']
+    search_help_text = 'Title, original title, overview words or TMDb id'
     readonly_fields = ['created_at', 'updated_at', 'poster_url', 'backdrop_url']
     filter_horizontal = ['genres']
-    
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['refresh_from_tmdb']
+
     fieldsets = (
         ('Basic Information', {
             'fields': ('title', 'original_title', 'overview', 'tagline')
@@ -53,10 +143,62 @@ class MovieAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term or connections[queryset.db].vendor != 'postgresql':
+            return super().get_search_results(request, queryset, search_term)
+
+        # Each condition is served by its own index (see migration 0002)
+        condition = (
+            Q(title__icontains=search_term)
+            | Q(original_title__icontains=search_term)
+            | Q(overview_vector=SearchQuery(search_term, config='english', search_type='websearch'))
+        )
+        if search_term.isdigit():
+            condition |= Q(tmdb_id=int(search_term))
+        queryset = queryset.alias(overview_vector=SearchVector('overview', config='english'))
+        return queryset.filter(condition), False
+
+    @admin.action(description='Refresh selected movies from TMDb')
+    def refresh_from_tmdb(self, request, queryset):
+        limit = getattr(settings, 'ADMIN_CHANGELISTS', {}).get('REFRESH_LIMIT', 100)
+        tmdb_ids = list(queryset.order_by().values_list('tmdb_id', flat=True)[:limit + 1])
+        if len(tmdb_ids) > limit:
+            self.message_user(
+                request, f'Only the first {limit} selected movies are refreshed at once.', messages.WARNING,
+            )
+            tmdb_ids = tmdb_ids[:limit]
+
+        refreshed, failed = movie_service.refresh_from_tmdb(tmdb_ids)
+        if refreshed:
+            self.message_user(request, f'Refreshed {len(refreshed)} movies from TMDb.', messages.SUCCESS)
+        if failed:
+            self.message_user(
+                request,
+                f'Could not fetch {len(failed)} movies (TMDb error or time budget): '
+                f'{", ".join(map(str, failed[:20]))}{"..." if len(failed) > 20 else ""}',
+                messages.ERROR,
+            )
+
 
 @admin.register(UserFavorite)
 class UserFavoriteAdmin(admin.ModelAdmin):
     list_display = ['user', 'movie', 'created_at']
+    list_select_related = ['user', 'movie']
     list_filter = ['created_at']
     search_fields = ['user__username', 'movie__title']
-    raw_id_fields = ['user', 'movie']
\ No newline at end of file
+    search_help_text = 'Exact username or movie title'
+    raw_id_fields = ['user', 'movie']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        # Semi-joins on indexed lookups (unique username, trigram title) rather
+        # than ILIKE over the joined user and movie rows
+        return queryset.filter(
+            Q(user__in=User.objects.filter(username=search_term).values('pk'))
+            | Q(movie__in=Movie.objects.filter(title__icontains=search_term).values('pk'))
+        ), False
@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.core import checks
 
 
 class MoviesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'movies'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from movie_backend.db import install_fork_handler
+        from movie_backend.query_budget import check_view_budgets
+
+        checks.register(check_view_budgets, checks.Tags.urls)
+        install_fork_handler()
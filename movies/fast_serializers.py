@@ -0,0 +1,184 @@
+"""
+Read-only movie serialization without DRF field machinery.
+
+``FastMovieSerializer`` is compiled once from an existing ModelSerializer
+(its field list, order and field types) into one accessor per output key.
+Rows are fetched with ``values()`` and genres with a single query on the
+through table, so the output is identical to the ModelSerializer's:
+
+    movie_list_serializer.serialize(Movie.objects.filter(...))
+
+Properties the serializers expose (``poster_url``, ``backdrop_url``,
+``year``) are computed from the row by the functions in ``DERIVED_FIELDS``
+and must be kept in step with the model.
+"""
+import copy
+from operator import itemgetter
+from typing import Callable, Dict, List, Optional
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from movie_backend.metrics import measure
+from .models import Movie
+from .serializers import GenreSerializer, MovieDetailSerializer, MovieListSerializer
+
+# Field types whose to_representation is a no-op for values the database returns
+PASSTHROUGH_FIELDS = (
+    serializers.IntegerField,
+    serializers.FloatField,
+    serializers.CharField,
+    serializers.BooleanField,
+)
+
+
+def _image_url(prefix: str, column: str) -> Callable:
+    def get(row):
+        path = row[column]
+        return f"{prefix}{path}" if path else None
+    return get
+
+
+def _year(row):
+    release_date = row["release_date"]
+    return release_date.year if release_date else None
+
+
+# Model properties exposed by the serializers: name -> (columns needed, accessor)
+DERIVED_FIELDS = {
+    "poster_url": (["poster_path"], _image_url(Movie.POSTER_URL_PREFIX, "poster_path")),
+    "backdrop_url": (["backdrop_path"], _image_url(Movie.BACKDROP_URL_PREFIX, "backdrop_path")),
+    "year": (["release_date"], _year),
+}
+
+
+def _converted(column: str, to_representation: Callable) -> Callable:
+    def get(row):
+        value = row[column]
+        return None if value is None else to_representation(value)
+    return get
+
+
+class FastMovieSerializer:
+    """Serialize movies to the output of ``serializer_class``
+
+    ``select()`` returns a copy limited to some fields (``?fields=``) or
+    extended with fields of ``expandable_class`` (``?expand=``). Only the
+    columns those fields need are fetched, and genres are not queried
+    unless requested. Output keys keep the serializers' order.
+    """
+
+    # Distinct field selections kept compiled per serializer
+    max_selections = 128
+
+    def __init__(self, serializer_class, expandable_class=None):
+        self.serializer_class = serializer_class
+        self.compiled = self._compile(serializer_class)
+        self.default_fields = list(self.compiled)
+        if expandable_class is not None:
+            for name, entry in self._compile(expandable_class).items():
+                self.compiled.setdefault(name, entry)
+        self.genre_fields = list(GenreSerializer.Meta.fields)
+        self._selections = {}
+        self._use_fields(self.default_fields)
+
+    @staticmethod
+    def _compile(serializer_class) -> Dict[str, tuple]:
+        """name -> (columns, accessor); the accessor is None for genres"""
+        compiled = {}
+        for name, field in serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if name == "genres":
+                compiled[name] = ([], None)
+            elif name in DERIVED_FIELDS:
+                compiled[name] = DERIVED_FIELDS[name]
+            elif isinstance(field, PASSTHROUGH_FIELDS):
+                compiled[name] = ([field.source], itemgetter(field.source))
+            else:
+                compiled[name] = ([field.source], _converted(field.source, field.to_representation))
+        return compiled
+
+    def _use_fields(self, names):
+        self.columns = ["id"]
+        self.accessors = []
+        self.genres_key = None
+        for name in names:
+            columns, accessor = self.compiled[name]
+            if accessor is None:
+                self.genres_key = name
+            for column in columns:
+                if column not in self.columns:
+                    self.columns.append(column)
+            self.accessors.append((name, accessor))
+
+    @staticmethod
+    def _parse(value: Optional[str]) -> List[str]:
+        return [name.strip() for name in (value or "").split(",") if name.strip()]
+
+    def select(self, fields: Optional[str] = None, expand: Optional[str] = None) -> "FastMovieSerializer":
+        """Copy serializing only ``fields`` (default: the serializer's) plus ``expand``
+
+        Both are comma-separated field names; unknown names raise a
+        ``ValidationError``.
+        """
+        requested = self._parse(fields) or self.default_fields
+        extra = self._parse(expand)
+        unknown = [name for name in requested + extra if name not in self.compiled]
+        if unknown:
+            raise ValidationError({
+                "fields": f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(self.compiled)}"
+            })
+
+        wanted = set(requested) | set(extra)
+        names = tuple(name for name in self.compiled if name in wanted)
+        if list(names) == self.default_fields:
+            return self
+
+        selection = self._selections.get(names)
+        if selection is None:
+            selection = copy.copy(self)
+            selection._use_fields(names)
+            if len(self._selections) < self.max_selections:
+                self._selections[names] = selection
+        return selection
+
+    def values(self, queryset):
+        """Queryset of the row dicts ``serialize_rows`` expects"""
+        return queryset.prefetch_related(None).values(*self.columns)
+
+    def genre_map(self, movie_ids) -> Dict[int, List[dict]]:
+        """Genres of each movie, ordered by name like ``Genre.Meta.ordering``"""
+        through = Movie.genres.through
+        genre_columns = [f"genre__{name}" for name in self.genre_fields]
+        rows = (
+            through.objects.filter(movie_id__in=movie_ids)
+            .order_by("genre__name", "genre__id")
+            .values_list("movie_id", *genre_columns)
+        )
+        genres = {}
+        for movie_id, *values in rows:
+            genres.setdefault(movie_id, []).append(dict(zip(self.genre_fields, values)))
+        return genres
+
+    def serialize_rows(self, rows) -> List[dict]:
+        """Output dicts for rows from ``values()``"""
+        with measure("serializer"):
+            rows = list(rows)
+            genres = self.genre_map([row["id"] for row in rows]) if self.genres_key and rows else {}
+            results = []
+            for row in rows:
+                data = {}
+                for name, accessor in self.accessors:
+                    data[name] = (genres.get(row["id"]) or []) if accessor is None else accessor(row)
+                results.append(data)
+            return results
+
+    def project(self, payload: dict) -> dict:
+        """Limit a payload serialized with every field to this selection"""
+        return {name: payload[name] for name, _ in self.accessors}
+
+    def serialize(self, queryset) -> List[dict]:
+        return self.serialize_rows(self.values(queryset))
+
+
+movie_list_serializer = FastMovieSerializer(MovieListSerializer, expandable_class=MovieDetailSerializer)
+movie_detail_serializer = FastMovieSerializer(MovieDetailSerializer)
@@ -0,0 +1,229 @@
+"""
+Turn TMDb movie payloads into ``Movie`` rows.
+
+``ingest_movies`` upserts many payloads in a handful of queries, whatever
+their number: one upsert for the movies, one for missing genres and one
+rewrite of the genre links. List payloads (``genre_ids``) only link genres
+that already exist; detail payloads (``genres``) also create missing ones.
+Bulk writes skip model signals, so the movie payload cache is invalidated
+here.
+
+The units of ingestion work (a TMDb list page, a chunk of movie details,
+the genre list) are plain functions as well. ``movies.tasks`` runs them on
+Celery, and management commands call them directly without loading Celery.
+"""
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+import hashlib
+import logging
+
+from .models import Genre, Movie
+from .services.cache_service import cache_service
+from .services.tmdb_service import tmdb_service
+
+logger = logging.getLogger(__name__)
+
+CATEGORY_FETCHERS = {
+    'popular': lambda page: tmdb_service.get_popular_movies(page),
+    'top_rated': lambda page: tmdb_service.get_top_rated_movies(page),
+    'trending': lambda page: tmdb_service.get_trending_movies('week', page),
+    'now_playing': lambda page: tmdb_service.get_now_playing_movies(page),
+    'upcoming': lambda page: tmdb_service.get_upcoming_movies(page),
+}
+
+
+
+class FetchFailed(Exception):
+    """TMDb returned nothing for a unit of work; the task is retried"""
+
+
+STATUS_MAPPING = {
+    'Released': 'released',
+    'Post Production': 'post_production',
+    'In Production': 'in_production',
+    'Planned': 'planned',
+    'Rumored': 'rumored',
+    'Canceled': 'canceled',
+}
+
+LIST_FIELDS = [
+    'title', 'original_title', 'overview', 'release_date', 'poster_path', 'backdrop_path',
+    'vote_average', 'vote_count', 'popularity', 'original_language',
+]
+DETAIL_FIELDS = LIST_FIELDS + ['imdb_id', 'tagline', 'runtime', 'budget', 'revenue', 'status']
+
+
+def map_status(tmdb_status: str) -> str:
+    """Map TMDb status to our model choices"""
+    return STATUS_MAPPING.get(tmdb_status, 'released')
+
+
+def parse_release_date(value: Optional[str]) -> Optional[date]:
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+
+def build_movie(movie_data: dict, details: bool = False) -> Movie:
+    """Unsaved Movie from a TMDb list or detail payload"""
+    movie = Movie(
+        tmdb_id=movie_data['id'],
+        title=movie_data.get('title') or '',
+        original_title=movie_data.get('original_title') or '',
+        overview=movie_data.get('overview') or '',
+        release_date=parse_release_date(movie_data.get('release_date')),
+        poster_path=movie_data.get('poster_path') or '',
+        backdrop_path=movie_data.get('backdrop_path') or '',
+        vote_average=movie_data.get('vote_average') or 0.0,
+        vote_count=movie_data.get('vote_count') or 0,
+        popularity=movie_data.get('popularity') or 0.0,
+        original_language=movie_data.get('original_language') or 'en',
+    )
+    if details:
+        movie.imdb_id = movie_data.get('imdb_id') or ''
+        movie.tagline = movie_data.get('tagline') or ''
+        movie.runtime = movie_data.get('runtime')
+        movie.budget = movie_data.get('budget') or None
+        movie.revenue = movie_data.get('revenue') or None
+        movie.status = map_status(movie_data.get('status', ''))
+    return movie
+
+
+def _genre_ids(movie_data: dict) -> List[int]:
+    if 'genres' in movie_data:
+        return [genre['id'] for genre in movie_data['genres'] if genre.get('id')]
+    return list(movie_data.get('genre_ids') or [])
+
+
+def _ensure_genres(payloads: List[dict]) -> Dict[int, int]:
+    """Genre tmdb_id -> pk, creating genres named in detail payloads"""
+    names = {}
+    for movie_data in payloads:
+        for genre in movie_data.get('genres') or []:
+            if genre.get('id') and genre.get('name'):
+                names[genre['id']] = genre['name']
+    if names:
+        Genre.objects.bulk_create(
+            [Genre(tmdb_id=tmdb_id, name=name) for tmdb_id, name in names.items()],
+            ignore_conflicts=True,
+        )
+    wanted = {genre_id for movie_data in payloads for genre_id in _genre_ids(movie_data)}
+    return dict(Genre.objects.filter(tmdb_id__in=wanted).order_by().values_list('tmdb_id', 'id'))
+
+
+@transaction.atomic
+def ingest_movies(payloads: Iterable[dict], details: bool = False) -> Tuple[Dict[int, int], Set[int]]:
+    """Upsert TMDb movie payloads and their genre links
+
+    Returns ({tmdb_id: movie pk}, tmdb ids of movies that were created).
+    ``details`` payloads also set the detail-only fields.
+    """
+    payloads = list({movie_data['id']: movie_data for movie_data in payloads if movie_data.get('id')}.values())
+    if not payloads:
+        return {}, set()
+
+    tmdb_ids = [movie_data['id'] for movie_data in payloads]
+    existing = set(Movie.objects.filter(tmdb_id__in=tmdb_ids).order_by().values_list('tmdb_id', flat=True))
+    Movie.objects.bulk_create(
+        [build_movie(movie_data, details) for movie_data in payloads],
+        update_conflicts=True,
+        unique_fields=['tmdb_id'],
+        update_fields=(DETAIL_FIELDS if details else LIST_FIELDS) + ['updated_at'],
+    )
+    movie_ids = dict(Movie.objects.filter(tmdb_id__in=tmdb_ids).order_by().values_list('tmdb_id', 'id'))
+
+    genre_pks = _ensure_genres(payloads)
+    through = Movie.genres.through
+    links = [
+        through(movie_id=movie_ids[movie_data['id']], genre_id=genre_pks[genre_id])
+        for movie_data in payloads
+        for genre_id in dict.fromkeys(_genre_ids(movie_data))
+        if genre_id in genre_pks
+    ]
+    # List payloads without genre ids leave existing links alone
+    relinked = [
+        movie_ids[movie_data['id']] for movie_data in payloads
+        if 'genres' in movie_data or movie_data.get('genre_ids')
+    ]
+    through.objects.filter(movie_id__in=relinked).delete()
+    through.objects.bulk_create(links, ignore_conflicts=True)
+
+    transaction.on_commit(lambda: cache_service.invalidate_movie_payloads(tmdb_ids))
+    return movie_ids, set(tmdb_ids) - existing
+
+
+@contextmanager
+def single_flight(name: str, *args):
+    """Yield False when an identical unit is already running elsewhere"""
+    digest = hashlib.blake2b(repr(args).encode(), digest_size=8).hexdigest()
+    key = f"task_lock:{name}:{digest}"
+    try:
+        acquired = cache.add(key, 1, getattr(settings, 'INGESTION_TASKS', {}).get('LOCK_TIMEOUT', 300))
+    except Exception as e:
+        logger.error(f"Task lock error: {e}")
+        acquired = True  # fail open: running twice is safe, just wasteful
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            try:
+                cache.delete(key)
+            except Exception as e:
+                logger.error(f"Task lock release error: {e}")
+
+
+def fetch_genres() -> int:
+    """Create missing genres; returns how many were created"""
+    data = tmdb_service.get_genres()
+    if not data:
+        raise FetchFailed('genres')
+    genres = [Genre(tmdb_id=genre['id'], name=genre['name']) for genre in data.get('genres', [])]
+    before = Genre.objects.count()
+    Genre.objects.bulk_create(genres, ignore_conflicts=True)
+    return Genre.objects.count() - before
+
+
+def fetch_category_page(category: str, page: int) -> int:
+    """Upsert one TMDb list page; returns how many movies were created"""
+    if category not in CATEGORY_FETCHERS:
+        raise ValueError(f"Unknown category: {category}")
+    with single_flight('ingest_category_page', category, page) as acquired:
+        if not acquired:
+            logger.info(f"Skipping {category} page {page}: already running")
+            return 0
+        data = CATEGORY_FETCHERS[category](page)
+        if not data:
+            raise FetchFailed(f"{category} page {page}")
+        _, created = ingest_movies(data.get('results', []))
+        return len(created)
+
+
+def fetch_details_chunk(tmdb_ids: List[int]) -> int:
+    """Fetch details for a chunk of movies and upsert them together; returns how many were updated
+
+    The movies that were fetched are saved even when others failed, and
+    ``FetchFailed`` is then raised.
+    """
+    with single_flight('ingest_details_chunk', sorted(tmdb_ids)) as acquired:
+        if not acquired:
+            logger.info(f"Skipping details chunk of {len(tmdb_ids)} movies: already running")
+            return 0
+        payloads = []
+        failed = []
+        for tmdb_id in tmdb_ids:
+            details = tmdb_service.get_movie_details(tmdb_id)
+            if details:
+                payloads.append(details)
+            else:
+                failed.append(tmdb_id)
+        movie_ids, _ = ingest_movies(payloads, details=True)
+        if failed:
+            raise FetchFailed(f"details of {len(failed)} of {len(tmdb_ids)} movies: {failed[:10]}")
+        return len(movie_ids)
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from benchmarks import results
+
+
+class Command(BaseCommand):
+    help = 'Compare two benchmark result files and flag regressions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('baseline', help='Result file of the reference run')
+        parser.add_argument('candidate', help='Result file of the run to check')
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.1,
+            help='Relative change treated as a regression (default 0.1 = 10%%)'
+        )
+        parser.add_argument('--fail', action='store_true', help='Exit non-zero when a regression is found')
+
+    def handle(self, *args, **options):
+        baseline = results.load(options['baseline'])
+        candidate = results.load(options['candidate'])
+
+        for name, result in (('baseline', baseline), ('candidate', candidate)):
+            meta = result['meta']
+            self.stdout.write(f"{name:<10} {meta['scenario']} @ {meta['git_commit']} ({meta['timestamp']})")
+        if baseline['meta']['scenario'] != candidate['meta']['scenario']:
+            self.stdout.write(self.style.WARNING('Scenarios differ; comparison may be meaningless'))
+
+        rows = results.compare(baseline, candidate, options['threshold'])
+        self.stdout.write(f'{"endpoint":<32}{"metric":<8}{"baseline":>11}{"candidate":>11}{"change":>9}')
+        for row in rows:
+            line = (
+                f"{row['endpoint']:<32}{row['metric']:<8}{row['baseline']:>11.1f}"
+                f"{row['candidate']:>11.1f}{row['change']:>+9.1%}"
+            )
+            self.stdout.write(self.style.ERROR(line) if row['regression'] else line)
+
+        regressions = [row for row in rows if row['regression']]
+        if regressions:
+            message = f'{len(regressions)} metric(s) regressed by more than {options["threshold"]:.0%}'
+            if options['fail']:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS('No regressions'))
@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand, CommandError
+from movie_backend import compression
+from movie_backend.renderers import FastJSONRenderer
+from movies.fast_serializers import movie_detail_serializer, movie_list_serializer
+from movies.models import Movie
+from movies.services.export_service import export_service
+import hashlib
+import time
+
+DEFAULT_LEVELS = {'gzip': [1, 4, 6, 9], 'br': [1, 3, 4, 5, 6, 8, 11]}
+
+
+class Command(BaseCommand):
+    help = 'Report compressed size and CPU time per encoding and level on real API payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50, help='Compressions per payload and level')
+
+    def payloads(self):
+        render = FastJSONRenderer().render
+        movies = Movie.objects.all()
+        page = movie_list_serializer.serialize(movies[:20])
+        if not page:
+            raise CommandError('No movies found; run "manage.py bench_seed" or populate_movies first')
+        export = b''.join(export_service.ndjson([movie_detail_serializer.serialize(movies[:1000])]))
+        return [
+            ('list page (20)', render({'count': movies.count(), 'next': None, 'previous': None, 'results': page})),
+            ('search (50)', render({'count': 50, 'results': movie_list_serializer.serialize(movies[:50])})),
+            ('detail', render(movie_detail_serializer.serialize(movies[:1])[0])),
+            ('export (1000)', export),
+        ]
+
+    def time_call(self, func, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            result = func()
+        return (time.perf_counter() - start) / iterations * 1e6, result
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        if 'br' not in compression.CODECS:
+            self.stdout.write(self.style.WARNING('brotli is not installed; only gzip is measured'))
+
+        self.stdout.write(
+            f'{"payload":<16}{"encoding":<10}{"bytes":>9}{"ratio":>7}{"compress us":>13}{"MB/s":>8}{"decompress us":>15}'
+        )
+        for name, payload in self.payloads():
+            # Export chunks are large; keep the run short
+            runs = max(1, iterations // 10) if len(payload) > 100_000 else iterations
+            hash_us, _ = self.time_call(lambda: hashlib.blake2b(payload, digest_size=16).digest(), runs)
+            self.stdout.write(f'{name:<16}{"identity":<10}{len(payload):>9}{1:>7.2f}{hash_us:>13.1f}  (cache key hash)')
+            for encoding in compression.CODECS:
+                for level in DEFAULT_LEVELS[encoding]:
+                    compress_us, compressed = self.time_call(
+                        lambda: compression.compress(encoding, payload, level), runs
+                    )
+                    decompress_us, restored = self.time_call(
+                        lambda: compression.decompress(encoding, compressed), runs
+                    )
+                    if restored != payload:
+                        raise CommandError(f'{name}: {encoding} level {level} did not round-trip')
+                    self.stdout.write(
+                        f'{"":<16}{f"{encoding}-{level}":<10}{len(compressed):>9}'
+                        f'{len(payload) / len(compressed):>7.2f}{compress_us:>13.1f}'
+                        f'{len(payload) / compress_us:>8.1f}{decompress_us:>15.1f}'
+                    )
@@ -0,0 +1,157 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from benchmarks.driver import percentile
+from movies.models import Movie
+import threading
+import time
+
+
+class Strategy:
+    """One way of getting a connection for each simulated request"""
+
+    def __init__(self, params, pool_size):
+        self.params = params
+        self.pool_size = pool_size
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class PerRequest(Strategy):
+    """New connection (TCP + auth) per request, like CONN_MAX_AGE = 0"""
+
+    def run(self, sql):
+        import psycopg
+        with psycopg.connect(**self.params) as connection:
+            connection.execute(sql).fetchall()
+
+
+class Persistent(Strategy):
+    """One connection per thread, checked before each request (CONN_HEALTH_CHECKS)"""
+
+    def open(self):
+        self.local = threading.local()
+        self.opened = []
+
+    def run(self, sql):
+        import psycopg
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = self.local.connection = psycopg.connect(**self.params, autocommit=True)
+            self.opened.append(connection)
+        else:
+            connection.execute('SELECT 1')
+        connection.execute(sql).fetchall()
+
+    def close(self):
+        for connection in self.opened:
+            connection.close()
+
+
+class Pooled(Strategy):
+    """Shared psycopg_pool pool with connection checks, like the postgresql_pool backend"""
+
+    def open(self):
+        from psycopg_pool import ConnectionPool
+        self.pool = ConnectionPool(
+            kwargs=self.params, min_size=self.pool_size, max_size=self.pool_size,
+            check=ConnectionPool.check_connection, open=True,
+        )
+        self.pool.wait()
+
+    def run(self, sql):
+        with self.pool.connection() as connection:
+            connection.execute(sql).fetchall()
+
+    def close(self):
+        self.pool.close()
+
+
+STRATEGIES = {'per_request': PerRequest, 'persistent': Persistent, 'pool': Pooled}
+
+
+class Command(BaseCommand):
+    help = 'Compare per-request, persistent and pooled Postgres connections: overhead and throughput'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--strategies', nargs='+', default=list(STRATEGIES), choices=list(STRATEGIES))
+        parser.add_argument('--requests', type=int, default=200, help='Sequential requests for the overhead table')
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32], help='Thread counts')
+        parser.add_argument('--duration', type=float, default=5.0, help='Seconds per throughput run')
+        parser.add_argument('--pool-size', type=int, default=10, help='Pool size (pool strategy)')
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'postgresql':
+            raise CommandError('This benchmark needs a PostgreSQL database')
+        params = connection.get_connection_params()
+        table = connection.ops.quote_name(Movie._meta.db_table)
+        sql = f'SELECT id, title FROM {table} ORDER BY popularity DESC LIMIT 20'
+
+        self.stdout.write('Per-request latency (sequential)')
+        self.stdout.write(f'{"strategy":<14}{"mean ms":>9}{"p50 ms":>9}{"p99 ms":>9}')
+        for name in options['strategies']:
+            strategy = STRATEGIES[name](params, options['pool_size'])
+            strategy.open()
+            try:
+                strategy.run(sql)  # first connection is not per-request overhead
+                latencies = []
+                for _ in range(options['requests']):
+                    start = time.perf_counter()
+                    strategy.run(sql)
+                    latencies.append((time.perf_counter() - start) * 1000)
+            finally:
+                strategy.close()
+            self.stdout.write(
+                f'{name:<14}{sum(latencies) / len(latencies):>9.2f}'
+                f'{percentile(latencies, 50):>9.2f}{percentile(latencies, 99):>9.2f}'
+            )
+
+        self.stdout.write('')
+        self.stdout.write(f'Throughput ({options["duration"]:g}s per run)')
+        self.stdout.write(f'{"strategy":<14}{"threads":>8}{"req/s":>9}{"p50 ms":>9}{"p99 ms":>9}{"errors":>8}')
+        for name in options['strategies']:
+            for threads in options['concurrency']:
+                result = self.throughput(STRATEGIES[name](params, options['pool_size']), sql, threads,
+                                         options['duration'])
+                self.stdout.write(
+                    f'{name:<14}{threads:>8}{result["rps"]:>9.0f}{result["p50"]:>9.2f}'
+                    f'{result["p99"]:>9.2f}{result["errors"]:>8}'
+                )
+
+    def throughput(self, strategy, sql, threads, duration):
+        strategy.open()
+        latencies, errors = [], []
+        deadline = time.monotonic() + duration
+
+        def worker():
+            local_latencies, local_errors = [], 0
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                try:
+                    strategy.run(sql)
+                except Exception:
+                    local_errors += 1
+                    continue
+                local_latencies.append((time.perf_counter() - start) * 1000)
+            latencies.extend(local_latencies)
+            errors.append(local_errors)
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        started = time.monotonic()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.monotonic() - started
+        strategy.close()
+        return {
+            'rps': len(latencies) / elapsed,
+            'p50': percentile(latencies, 50),
+            'p99': percentile(latencies, 99),
+            'errors': sum(errors),
+        }
@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from movie_backend.parsers import FastJSONParser
+from movie_backend.renderers import FastJSONRenderer, orjson
+from movies.models import Movie
+from movies.serializers import MovieDetailSerializer, MovieListSerializer
+import io
+import time
+
+
+class Command(BaseCommand):
+    help = 'Benchmark JSON rendering and parsing of real movie payloads (stdlib vs orjson)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000, help='Renders per payload and renderer')
+
+    def payloads(self):
+        movies = Movie.objects.prefetch_related('genres')
+        page = list(movies[:20])
+        if not page:
+            raise CommandError('No movies found; run "manage.py bench_seed" or populate_movies first')
+        search = list(movies[:50])
+        return [
+            ('list page (20)', {
+                'count': Movie.objects.count(),
+                'next': 'http://testserver/api/movies/?page=2',
+                'previous': None,
+                'results': MovieListSerializer(page, many=True).data,
+            }),
+            ('search (50)', {'count': len(search), 'results': MovieListSerializer(search, many=True).data}),
+            ('detail', MovieDetailSerializer(page[0]).data),
+        ]
+
+    def time_call(self, func, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        return (time.perf_counter() - start) / iterations * 1e6
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed; FastJSONRenderer falls back to stdlib'))
+
+        stdlib_renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+        stdlib_parser, fast_parser = JSONParser(), FastJSONParser()
+
+        self.stdout.write(
+            f'{"payload":<16}{"bytes":>8}{"render us":>11}{"fast us":>9}{"speedup":>9}'
+            f'{"parse us":>10}{"fast us":>9}{"speedup":>9}'
+        )
+        for name, data in self.payloads():
+            expected = stdlib_renderer.render(data)
+            if fast_renderer.render(data) != expected:
+                raise CommandError(f'{name}: FastJSONRenderer output differs from JSONRenderer')
+
+            render = self.time_call(lambda: stdlib_renderer.render(data), iterations)
+            fast_render = self.time_call(lambda: fast_renderer.render(data), iterations)
+            parse = self.time_call(lambda: stdlib_parser.parse(io.BytesIO(expected)), iterations)
+            fast_parse = self.time_call(lambda: fast_parser.parse(io.BytesIO(expected)), iterations)
+            self.stdout.write(
+                f'{name:<16}{len(expected):>8}{render:>11.1f}{fast_render:>9.1f}{render / fast_render:>8.1f}x'
+                f'{parse:>10.1f}{fast_parse:>9.1f}{parse / fast_parse:>8.1f}x'
+            )
@@ -0,0 +1,136 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler, get_internal_wsgi_application
+from django.test.utils import override_settings
+from django.utils.functional import empty
+import threading
+
+from benchmarks import results
+from benchmarks.driver import LoadDriver
+from benchmarks.scenarios import SCENARIOS, ScenarioContext
+from benchmarks.tmdb_stub import start_stub
+from movies.services.tmdb_service import tmdb_service
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = 'Run a load scenario and save throughput and latency percentiles as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('scenario', choices=sorted(SCENARIOS), help='Request mix to run')
+        parser.add_argument(
+            '--base-url',
+            help='Target a running server instead of an in-process one (e.g. http://127.0.0.1:8000)'
+        )
+        parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients')
+        parser.add_argument('--duration', type=float, default=10.0, help='Measured seconds')
+        parser.add_argument('--warmup', type=float, default=1.0, help='Unmeasured seconds before recording')
+        parser.add_argument('--seed', type=int, default=42, help='Seed for request sequences')
+        parser.add_argument(
+            '--tmdb-stub',
+            action='store_true',
+            help='Point TMDb calls at a local stub server (in-process server only)'
+        )
+        parser.add_argument('--tmdb-latency', type=float, default=0.05, help='Stub response delay in seconds')
+        parser.add_argument('--tmdb-error-rate', type=float, default=0.0, help='Stub 503 rate')
+        parser.add_argument(
+            '--throttle',
+            action='store_true',
+            help='Keep the catalog rate limit on (in-process server only; all clients share one IP budget)'
+        )
+        parser.add_argument('--out', help='Result file path (default: benchmarks/results/...)')
+
+    def handle(self, *args, **options):
+        scenario = SCENARIOS[options['scenario']]
+        context = ScenarioContext.load(with_tokens=scenario.needs_tokens)
+        if not context.tmdb_ids:
+            raise CommandError('No movies found; run "manage.py bench_seed" first')
+        if scenario.needs_users and not context.usernames:
+            raise CommandError('No benchmark users found; run "manage.py bench_seed" first')
+
+        stub = server = stub_override = None
+        if options['tmdb_stub']:
+            if options['base_url']:
+                raise CommandError('--tmdb-stub only applies to the in-process server')
+            stub = start_stub(latency=options['tmdb_latency'], error_rate=options['tmdb_error_rate'])
+            # The stub needs no API key; the client is built lazily, so drop
+            # any instance built with the real settings
+            stub_override = override_settings(
+                TMDB_API_KEY=settings.TMDB_API_KEY or 'stub', TMDB_BASE_URL=stub.base_url,
+            )
+            stub_override.enable()
+            tmdb_service._wrapped = empty
+
+        base_url = options['base_url']
+        throttle_override = None
+        if not base_url:
+            if not options['throttle']:
+                throttle_override = override_settings(
+                    CATALOG_THROTTLE={**getattr(settings, 'CATALOG_THROTTLE', {}), 'ENABLED': False}
+                )
+                throttle_override.enable()
+            server = ThreadedWSGIServer(('127.0.0.1', 0), QuietRequestHandler)
+            server.set_app(get_internal_wsgi_application())
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            base_url = f'http://127.0.0.1:{server.server_address[1]}'
+
+        if scenario.setup:
+            scenario.setup()
+
+        self.stdout.write(
+            f"Running '{scenario.name}' against {base_url} with {options['concurrency']} clients "
+            f"for {options['duration']:.0f}s..."
+        )
+        try:
+            report = LoadDriver(
+                base_url,
+                scenario.build_picker(),
+                context,
+                concurrency=options['concurrency'],
+                duration=options['duration'],
+                seed=options['seed'],
+                warmup=options['warmup'],
+            ).run()
+        finally:
+            if server:
+                server.shutdown()
+            if throttle_override:
+                throttle_override.disable()
+            if stub:
+                stub_override.disable()
+                tmdb_service._wrapped = empty
+                stub.shutdown()
+
+        run_options = {
+            key: options[key]
+            for key in ('concurrency', 'duration', 'warmup', 'seed', 'tmdb_stub', 'tmdb_latency', 'tmdb_error_rate', 'throttle')
+        }
+        run_options['base_url'] = options['base_url'] or 'in-process'
+        dataset = {
+            'movies_sampled': len(context.tmdb_ids),
+            'users': len(context.usernames),
+            'tmdb_stub_requests': stub.request_count if stub else 0,
+        }
+        report['meta'] = results.build_meta(scenario.name, run_options, dataset)
+
+        self.print_report(report)
+        path = results.save(report, options['out'])
+        self.stdout.write(self.style.SUCCESS(f'Results saved to {path}'))
+
+    def print_report(self, report):
+        self.stdout.write(
+            f'{"endpoint":<32}{"requests":>9}{"rps":>9}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}  statuses'
+        )
+        rows = list(report['endpoints'].items()) + [('overall', report['overall'])]
+        for label, stats in rows:
+            statuses = ', '.join(f'{code}: {count}' for code, count in stats['statuses'].items())
+            if stats['errors']:
+                statuses += f", errors: {stats['errors']}"
+            self.stdout.write(
+                f"{label:<32}{stats['requests']:>9}{stats['rps']:>9.1f}{stats['p50_ms']:>9.1f}"
+                f"{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}  {statuses}"
+            )
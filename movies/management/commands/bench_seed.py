@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from benchmarks import datagen
+
+
+class Command(BaseCommand):
+    help = 'Create a reproducible synthetic dataset for benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--movies', type=int, default=1000, help='Number of synthetic movies')
+        parser.add_argument('--users', type=int, default=50, help='Number of synthetic users')
+        parser.add_argument('--favorites-per-user', type=int, default=20, help='Favorites per user')
+        parser.add_argument('--seed', type=int, default=42, help='Seed for favorite sampling')
+        parser.add_argument('--clear', action='store_true', help='Delete the synthetic data instead')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            deleted = datagen.clear()
+            self.stdout.write(self.style.SUCCESS(
+                f"Deleted {deleted['movies']} movie rows and {deleted['users']} user rows"
+            ))
+            return
+
+        counts = datagen.generate(
+            movies=options['movies'],
+            users=options['users'],
+            favorites_per_user=options['favorites_per_user'],
+            seed=options['seed'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            'Benchmark dataset ready: ' + ', '.join(f'{count} {name}' for name, count in counts.items())
+        ))
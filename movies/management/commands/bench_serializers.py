@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+from movie_backend.renderers import FastJSONRenderer
+from movies.fast_serializers import movie_detail_serializer, movie_list_serializer
+from movies.models import Movie
+from movies.serializers import MovieDetailSerializer, MovieListSerializer
+import time
+
+
+class Command(BaseCommand):
+    help = 'Benchmark ModelSerializer against the fast read-only serializers (rows/sec, including queries)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[20, 100, 1000],
+            help='Rows per response'
+        )
+        parser.add_argument('--iterations', type=int, default=20, help='Runs per size and serializer')
+
+    def time_rows(self, func, rows, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        return rows * iterations / (time.perf_counter() - start)
+
+    def handle(self, *args, **options):
+        available = Movie.objects.count()
+        if not available:
+            raise CommandError('No movies found; run "manage.py bench_seed" or populate_movies first')
+
+        renderer = FastJSONRenderer()
+        self.stdout.write(f'{"serializer":<12}{"rows":>6}{"drf rows/s":>13}{"fast rows/s":>13}{"speedup":>9}')
+        for name, drf_class, fast in [
+            ('list', MovieListSerializer, movie_list_serializer),
+            ('detail', MovieDetailSerializer, movie_detail_serializer),
+        ]:
+            for size in options['sizes']:
+                queryset = Movie.objects.all()[:size]
+                rows = min(size, available)
+
+                def drf():
+                    return drf_class(queryset.prefetch_related('genres'), many=True).data
+
+                def fast_serialize():
+                    return fast.serialize(queryset)
+
+                if renderer.render(drf()) != renderer.render(fast_serialize()):
+                    raise CommandError(f'{name} x {size}: fast serializer output differs from {drf_class.__name__}')
+
+                drf_rate = self.time_rows(drf, rows, options['iterations'])
+                fast_rate = self.time_rows(fast_serialize, rows, options['iterations'])
+                self.stdout.write(
+                    f'{name:<12}{rows:>6}{drf_rate:>13,.0f}{fast_rate:>13,.0f}{fast_rate / drf_rate:>8.1f}x'
+                )
+        self.stdout.write(self.style.SUCCESS('Fast serializer output matches the ModelSerializers'))
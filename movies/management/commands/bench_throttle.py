@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from rest_framework.test import APIRequestFactory
+from benchmarks.driver import percentile
+from movie_backend.redis_client import get_redis_client
+from movie_backend.throttling import CatalogRateThrottle, limiter
+from movies.views import GenreListView
+import time
+import uuid
+
+
+class Command(BaseCommand):
+    help = "Measure the catalog throttle's own overhead per request"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=5000)
+        parser.add_argument('--clients', type=int, default=1000, help='Distinct client identities to rotate through')
+
+    def time_calls(self, func, iterations):
+        latencies = []
+        for i in range(iterations):
+            start = time.perf_counter()
+            func(i)
+            latencies.append((time.perf_counter() - start) * 1e6)
+        return latencies
+
+    def report(self, name, latencies):
+        self.stdout.write(
+            f'{name:<34}{sum(latencies) / len(latencies):>9.1f}'
+            f'{percentile(latencies, 50):>9.1f}{percentile(latencies, 99):>9.1f}'
+        )
+
+    def handle(self, *args, **options):
+        iterations, clients = options['iterations'], options['clients']
+        client = get_redis_client()
+        run = uuid.uuid4().hex[:8]
+        self.stdout.write(f'Backend: {"Redis (Lua GCRA)" if client is not None else "per-process (no Redis)"}')
+        self.stdout.write(f'{"check":<34}{"mean us":>9}{"p50 us":>9}{"p99 us":>9}')
+
+        if client is not None:
+            self.report('redis PING (round trip floor)', self.time_calls(lambda i: client.ping(), iterations))
+
+        # High limit, so every check is an allowed request that updates state
+        self.report('limiter.check', self.time_calls(
+            lambda i: limiter.check(f'bench:{run}:{i % clients}', 10 ** 9, 60, 1), iterations
+        ))
+        self.report('limiter.check (denied)', self.time_calls(
+            lambda i: limiter.check(f'bench:{run}:denied', 1, 3600, 2), iterations
+        ))
+
+        factory = APIRequestFactory()
+        view = GenreListView.as_view()
+        throttle_settings = {'ENABLED': True, 'RATES': {'anon': f'{10 ** 9}/min'}, 'COSTS': {'default': 1}}
+        requests = [factory.get('/api/movies/genres/', REMOTE_ADDR=f'198.18.{i // 256 % 256}.{i % 256}')
+                    for i in range(min(clients, iterations))]
+
+        def throttle_only(i):
+            request = view.cls().initialize_request(requests[i % len(requests)])
+            CatalogRateThrottle().allow_request(request, None)
+
+        with override_settings(CATALOG_THROTTLE=throttle_settings):
+            self.report('CatalogRateThrottle.allow_request', self.time_calls(throttle_only, iterations))
+
+        if client is not None:
+            try:
+                keys = list(client.scan_iter(match=limiter.key(f'bench:{run}:*'), count=1000))
+                keys += list(client.scan_iter(match=limiter.key('anon:198.18.*'), count=1000))
+                if keys:
+                    client.delete(*keys)
+            except Exception as e:
+                self.stderr.write(f'Could not clean up benchmark keys: {e}')
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+from movie_backend import schema
+import time
+
+
+class Command(BaseCommand):
+    help = "Generate the OpenAPI and Swagger schemas into API_SCHEMA_DIR, to be served as files"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "schemas",
+            nargs="*",
+            help=f"Schemas to build: {', '.join(sorted(schema.SCHEMA_FILES))} (default: all)",
+        )
+
+    def handle(self, *args, **options):
+        unknown = set(options["schemas"]) - set(schema.SCHEMA_FILES)
+        if unknown:
+            raise CommandError(f"Unknown schema: {', '.join(sorted(unknown))}")
+        for name in options["schemas"] or sorted(schema.SCHEMA_FILES):
+            start = time.perf_counter()
+            path = schema.build(name)
+            self.stdout.write(
+                self.style.SUCCESS(f"Wrote {path} in {(time.perf_counter() - start) * 1000:.0f} ms")
+            )
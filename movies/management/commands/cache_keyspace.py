@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+from movie_backend.keyspace import cache_analytics
+import time
+
+
+class Command(BaseCommand):
+    help = "Scan the cache keyspace in bounded steps and report memory, hit ratios and hot keys per prefix"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--max-keys", type=int, help="Keys scanned per step")
+        parser.add_argument("--budget-ms", type=float, help="Milliseconds per step")
+        parser.add_argument("--pause", type=float, default=0.05, help="Seconds to sleep between steps")
+        parser.add_argument("--top", type=int, default=20, help="Hot keys to list")
+        parser.add_argument(
+            "--report-only",
+            action="store_true",
+            help="Report the last complete pass without scanning",
+        )
+
+    def handle(self, *args, **options):
+        if not options["report_only"]:
+            steps = scanned = 0
+            while True:
+                step = cache_analytics.sample(options["max_keys"], options["budget_ms"])
+                if step is None:
+                    raise CommandError("Keyspace sampling needs the Redis cache backend")
+                steps += 1
+                scanned += step.get("scanned", 0)
+                if step.get("pass_complete"):
+                    break
+                time.sleep(options["pause"])
+            self.stdout.write(f"Pass complete: {scanned} keys in {steps} steps")
+
+        memory = cache_analytics.memory()
+        access = cache_analytics.access()
+        self.stdout.write(f'{"prefix":<28}{"keys":>10}{"avg B":>9}{"est. MB":>10}{"hits":>10}{"misses":>10}{"hit %":>8}')
+        for prefix in dict.fromkeys([*(memory or {}).get("prefixes", {}), *access]):
+            sizes = (memory or {}).get("prefixes", {}).get(prefix, {})
+            counts = access.get(prefix, {})
+            estimated = sizes.get("estimated_bytes")
+            ratio = counts.get("hit_ratio")
+            self.stdout.write(
+                f'{prefix:<28}{sizes.get("keys", "-"):>10}{sizes.get("avg_bytes") or "-":>9}'
+                f'{f"{estimated / 2 ** 20:.2f}" if estimated is not None else "-":>10}'
+                f'{counts.get("hits", "-"):>10}{counts.get("misses", "-"):>10}'
+                f'{f"{ratio * 100:.1f}" if ratio is not None else "-":>8}'
+            )
+
+        if options["top"]:
+            self.stdout.write("\nHot keys (decayed access counts):")
+            for key, score in cache_analytics.hottest(options["top"]):
+                self.stdout.write(f"{score:>10.1f}  {key}")
@@ -1,17 +1,52 @@
 from django.core.management.base import BaseCommand
 from movies.services.cache_service import cache_service
+from movies.services.warming_service import warming_service
 
 
 class Command(BaseCommand):
-    help = "Warm up the cache with popular movie data"
+    help = "Warm up the cache with the most frequently accessed data"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, help="Number of hottest lookups to rebuild")
+        parser.add_argument("--concurrency", type=int, help="Lookups rebuilt at the same time")
+        parser.add_argument("--budget", type=float, help="Seconds to spend before giving up on the rest")
+        parser.add_argument(
+            "--show",
+            action="store_true",
+            help="List the hottest lookups and their decayed access counts without warming",
+        )
+        parser.add_argument(
+            "--async",
+            action="store_true",
+            dest="run_async",
+            help="Queue the warm-up as a Celery task",
+        )
 
     def handle(self, *args, **options):
+        top, concurrency, budget = options["top"], options["concurrency"], options["budget"]
+
+        if options["show"]:
+            for spec, score in warming_service.hottest(top or warming_service.top_n):
+                self.stdout.write(f"{score:>10.1f}  {':'.join(map(str, spec))}")
+            return
+
+        if options["run_async"]:
+            # Loads Celery, which only this branch needs
+            from movies.tasks import warm_caches
+
+            warm_caches.delay(top, concurrency, budget)
+            self.stdout.write(self.style.SUCCESS("Cache warming queued"))
+            return
+
         self.stdout.write("Warming up cache...")
 
-        try:
-            cache_service.warm_popular_caches()
-            self.stdout.write(
-                self.style.SUCCESS("Cache warming completed successfully!")
+        stats = cache_service.warm_popular_caches(top, concurrency, budget)
+        if not stats:
+            self.stdout.write(self.style.ERROR("Cache warming failed"))
+            return
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Cache warming completed in {stats['seconds']}s: {stats['warmed']} warmed, "
+                f"{stats['failed']} failed, {stats['skipped']} skipped (budget) of {stats['units']}"
             )
-        except Exception as e:
-            self.stdout.write(self.style.ERROR(f"Cache warming failed: {e}"))
+        )
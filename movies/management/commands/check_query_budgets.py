@@ -0,0 +1,110 @@
+from contextlib import ExitStack
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory
+from movie_backend.query_budget import QueryCounter, get_view_budget, iter_budgeted_patterns
+from movies.models import Movie
+from users.tokens import UserClaimsRefreshToken
+
+# Query strings exercised per URL name, besides the bare URL ({tmdb_id}: a sample movie)
+EXTRA_QUERIES = {
+    'movie-list': ['genre=drama', 'search=the', 'page=2'],
+    'movie-search': ['q=the', 'genre=drama', 'year=2020'],
+    'movie-batch': ['ids={tmdb_id}', 'ids={tmdb_id},1,2,3'],
+}
+# Endpoints that reject a bare GET
+SKIP_BARE = {'movie-search', 'movie-batch'}
+
+
+class Command(BaseCommand):
+    help = 'Run every budgeted GET endpoint against current data and compare query counts to budgets'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--username',
+            help='User to authenticate as (default: the first superuser)'
+        )
+
+    def handle(self, *args, **options):
+        user = self.get_user(options['username'])
+        token = str(UserClaimsRefreshToken.for_user(user).access_token) if user else None
+        sample_tmdb_id = Movie.objects.order_by('id').values_list('tmdb_id', flat=True).first()
+
+        # A private cache, so the first run is a cold miss and real caches are untouched
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'check-query-budgets',
+        }}):
+            failures = self.run_checks(token, sample_tmdb_id)
+
+        if failures:
+            raise CommandError(f'{failures} request(s) exceeded their query budget')
+        self.stdout.write(self.style.SUCCESS('All endpoints are within budget'))
+
+    def get_user(self, username):
+        if username:
+            try:
+                return User.objects.get(username=username)
+            except User.DoesNotExist:
+                raise CommandError(f'User "{username}" does not exist')
+        return User.objects.filter(is_superuser=True).order_by('id').first()
+
+    def iter_requests(self, sample_tmdb_id):
+        for _, route, pattern in iter_budgeted_patterns():
+            view_class = getattr(pattern.callback, 'view_class', None)
+            if view_class is None or not hasattr(view_class, 'get'):
+                continue
+            kwargs = {}
+            if 'tmdb_id' in pattern.pattern.converters:
+                if sample_tmdb_id is None:
+                    continue
+                kwargs['tmdb_id'] = sample_tmdb_id
+            if set(pattern.pattern.converters) - set(kwargs):
+                continue
+
+            path = reverse(pattern.name, kwargs=kwargs)
+            queries = EXTRA_QUERIES.get(pattern.name, [])
+            if pattern.name not in SKIP_BARE:
+                queries = [''] + queries
+            for query in queries:
+                if '{tmdb_id}' in query:
+                    if sample_tmdb_id is None:
+                        continue
+                    query = query.format(tmdb_id=sample_tmdb_id)
+                yield pattern, kwargs, f'{path}?{query}' if query else path
+
+    def run_checks(self, token, sample_tmdb_id):
+        factory = APIRequestFactory()
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+        failures = 0
+
+        self.stdout.write(f'{"request":<44}{"budget":>9}{"cold":>9}{"warm":>9}  result')
+        for pattern, kwargs, url in self.iter_requests(sample_tmdb_id):
+            budget = get_view_budget(pattern.callback)
+            counts = []
+            problems = []
+            status_code = None
+            for _ in range(2):
+                counter = QueryCounter()
+                with ExitStack() as stack:
+                    for connection in connections.all():
+                        stack.enter_context(connection.execute_wrapper(counter))
+                    response = pattern.callback(factory.get(url, **headers), **kwargs)
+                status_code = response.status_code
+                counts.append(f'{counter.queries}/{counter.duplicates}')
+                problems.extend(counter.violations(budget))
+
+            if problems:
+                failures += 1
+                result = self.style.ERROR('OVER: ' + problems[0])
+            elif status_code >= 400:
+                result = self.style.WARNING(f'HTTP {status_code}')
+            else:
+                result = 'ok'
+            self.stdout.write(
+                f'{url:<44}{budget.queries:>6}/{budget.duplicates:<2}{counts[0]:>9}{counts[1]:>9}  {result}'
+            )
+        return failures
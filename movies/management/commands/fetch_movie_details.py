@@ -1,6 +1,6 @@
 from django.core.management.base import BaseCommand
 from movies.models import Movie
-from movies.services.tmdb_service import tmdb_service
+from movies.ingestion import fetch_details_chunk
 import time
 
 
@@ -14,57 +14,54 @@ class Command(BaseCommand):
             default=50,
             help='Limit number of movies to update'
         )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=20,
+            help='Movies per ingestion unit (one Celery task each with --async)'
+        )
+        parser.add_argument(
+            '--async',
+            action='store_true',
+            dest='run_async',
+            help='Queue the chunks as Celery tasks instead of fetching here'
+        )
 
     def handle(self, *args, **options):
         limit = options['limit']
+        chunk_size = options['chunk_size']
+
+        if options['run_async']:
+            # Loads Celery, which only this branch needs
+            from movies.tasks import refresh_movie_details
+
+            refresh_movie_details.delay(limit, chunk_size)
+            self.stdout.write(self.style.SUCCESS(f'Queued detail updates for up to {limit} movies'))
+            return
         
         # Get movies that don't have detailed info (missing runtime, budget, etc.)
-        movies = Movie.objects.filter(runtime__isnull=True)[:limit]
+        tmdb_ids = list(Movie.objects.filter(runtime__isnull=True).values_list('tmdb_id', flat=True)[:limit])
         
-        self.stdout.write(f'Updating details for {len(movies)} movies...')
+        self.stdout.write(f'Updating details for {len(tmdb_ids)} movies...')
         
         updated_count = 0
         
-        for movie in movies:
+        for start in range(0, len(tmdb_ids), chunk_size):
+            chunk = tmdb_ids[start:start + chunk_size]
             try:
-                # Fetch detailed movie data
-                details = tmdb_service.get_movie_details(movie.tmdb_id)
-                
-                if details:
-                    # Update movie with detailed information
-                    movie.runtime = details.get('runtime')
-                    movie.budget = details.get('budget', 0) or None
-                    movie.revenue = details.get('revenue', 0) or None
-                    movie.imdb_id = details.get('imdb_id', '')
-                    movie.tagline = details.get('tagline', '')
-                    movie.status = self.map_status(details.get('status', ''))
-                    
-                    movie.save()
-                    updated_count += 1
-                    
-                    self.stdout.write(f'Updated: {movie.title}')
-                
+                # Fetch the chunk's details and upsert them together (and their genres)
+                updated_count += fetch_details_chunk(chunk)
+                self.stdout.write(f'Updated {updated_count}/{len(tmdb_ids)}')
+
                 # Be nice to the API - small delay
                 time.sleep(0.25)
-                
+
             except Exception as e:
                 self.stdout.write(
-                    self.style.ERROR(f'Error updating {movie.title}: {e}')
+                    self.style.ERROR(f'Error updating movies {chunk[0]}..{chunk[-1]}: {e}')
                 )
                 continue
         
         self.stdout.write(
             self.style.SUCCESS(f'Updated {updated_count} movies with detailed info')
         )
-    
-    def map_status(self, tmdb_status: str) -> str:
-        """Map TMDb status to our model choices"""
-        status_mapping = {
-            'Released': 'released',
-            'Post Production': 'post_production',
-            'In Production': 'in_production',
-            'Planned': 'planned',
-            'Rumored': 'rumored',
-            'Canceled': 'canceled',
-        }
-        return status_mapping.get(tmdb_status, 'released')
\ No newline at end of file
@@ -0,0 +1,96 @@
+from collections import Counter
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+import os
+import subprocess
+import sys
+
+# What each process imports before it can do any work
+SCENARIOS = {
+    'worker': (
+        "from django.core.wsgi import get_wsgi_application; get_wsgi_application(); "
+        "from django.urls import get_resolver; get_resolver().url_patterns"
+    ),
+    'manage': (
+        "import django; django.setup(); "
+        "from django.core.management import get_commands, load_command_class; "
+        "load_command_class(get_commands()[{command!r}], {command!r})"
+    ),
+    'celery': (
+        "import django; django.setup(); "
+        "from movie_backend.celery import app; app.loader.import_default_modules()"
+    ),
+}
+
+
+def parse_importtime(stderr: str):
+    """(module, self us, cumulative us, depth) rows from ``python -X importtime`` output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+class Command(BaseCommand):
+    help = "Measure import time of worker boot and management commands (python -X importtime) against budgets"
+
+    def add_arguments(self, parser):
+        parser.add_argument('scenarios', nargs='*', help=f"Any of: {', '.join(SCENARIOS)} (default: all)")
+        parser.add_argument('--runs', type=int, default=3, help='Runs per scenario; the median is reported')
+        parser.add_argument('--command', default='cache_warm', help='Management command loaded by "manage"')
+        parser.add_argument('--top', type=int, default=10, help='Packages and imports to list')
+        parser.add_argument('--fail', action='store_true', help='Exit with an error when over budget')
+
+    def measure(self, code: str):
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(settings.BASE_DIR), env.get('PYTHONPATH')]))
+        env.setdefault('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE)
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        rows = parse_importtime(result.stderr)
+        if result.returncode != 0:
+            errors = [line for line in result.stderr.splitlines() if not line.startswith('import time:')]
+            raise CommandError('\n'.join(errors[-10:]))
+        return sum(cumulative for _, _, cumulative, depth in rows if depth == 0) / 1000, rows
+
+    def handle(self, *args, **options):
+        unknown = set(options['scenarios']) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenario: {', '.join(sorted(unknown))}")
+        budgets = getattr(settings, 'IMPORT_BUDGET', {})
+        over = []
+
+        for name in options['scenarios'] or list(SCENARIOS):
+            code = SCENARIOS[name].format(command=options['command'])
+            runs = sorted((self.measure(code) for _ in range(max(1, options['runs']))), key=lambda run: run[0])
+            total_ms, rows = runs[len(runs) // 2]
+            budget = budgets.get(name)
+            verdict = ''
+            if budget:
+                verdict = f' / budget {budget} ms  ' + ('OK' if total_ms <= budget else 'OVER')
+                if total_ms > budget:
+                    over.append(f'{name}: {total_ms:.0f} ms > {budget} ms')
+            spread = f'{runs[0][0]:.0f}-{runs[-1][0]:.0f}'
+            self.stdout.write(f'\n{name}: {total_ms:.0f} ms (runs {spread} ms){verdict}')
+
+            if not options['top']:
+                continue
+            packages = Counter()
+            for module, self_us, _, _ in rows:
+                packages[module.split('.')[0]] += self_us
+            self.stdout.write('  packages (self time, ms):')
+            for package, self_us in packages.most_common(options['top']):
+                self.stdout.write(f'    {self_us / 1000:>8.1f}  {package}')
+            self.stdout.write('  top-level imports (cumulative, ms):')
+            top_level = sorted((row for row in rows if row[3] == 0), key=lambda row: -row[2])
+            for module, _, cumulative_us, _ in top_level[:options['top']]:
+                self.stdout.write(f'    {cumulative_us / 1000:>8.1f}  {module}')
+
+        if over and options['fail']:
+            raise CommandError('Import time over budget: ' + '; '.join(over))
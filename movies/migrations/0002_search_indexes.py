@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:26
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations
+import django.db.models.functions.text
+
+
+class AddIndexConcurrentlyOnPostgres(AddIndexConcurrently):
+    """Build the index without blocking writes; skipped on other databases (e.g. SQLite)"""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY can't run in a transaction
+    atomic = False
+
+    dependencies = [
+        ('movies', '0001_initial'),
+    ]
+
+    operations = [
+        # No-op on databases other than PostgreSQL
+        TrigramExtension(),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='movie',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('title'), name='gin_trgm_ops'), name='movie_title_trgm'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='movie',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('original_title'), name='gin_trgm_ops'), name='movie_orig_title_trgm'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='movie',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('overview', config='english'), name='movie_overview_fts'),
+        ),
+    ]
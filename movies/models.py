@@ -1,5 +1,12 @@
-from django.db import models
+from datetime import timezone as dt_timezone
+from typing import NamedTuple
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector
+from django.db import connections, models, router
+from django.db.models.functions import Upper
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 
 class Genre(models.Model):
@@ -15,6 +22,47 @@ class Genre(models.Model):
         return self.name
 
 
+class MovieManager(models.Manager):
+    """Manager with set-based genre-neighbour lookups"""
+
+    def genre_neighbours(self, movie_ids, limit, chunk_size=500):
+        """Top released movies sharing genres with each given movie.
+
+        Returns (movie id, neighbour id, shared genre count) rows, at most
+        ``limit`` per movie, ranked by shared genres, rating and popularity.
+        One query per ``chunk_size`` movies instead of one per movie.
+        """
+        connection = connections[router.db_for_read(self.model)]
+        qn = connection.ops.quote_name
+        through = qn(self.model.genres.through._meta.db_table)
+        movie = qn(self.model._meta.db_table)
+        movie_id = qn(self.model.genres.field.m2m_column_name())
+        genre_id = qn(self.model.genres.field.m2m_reverse_name())
+        pk = qn(self.model._meta.pk.column)
+
+        rows = []
+        movie_ids = list(dict.fromkeys(movie_ids))
+        for start in range(0, len(movie_ids), chunk_size):
+            chunk = movie_ids[start:start + chunk_size]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            sql = (
+                f"SELECT source_id, neighbour_id, shared FROM ("
+                f"SELECT f.{movie_id} AS source_id, n.{movie_id} AS neighbour_id, COUNT(*) AS shared, "
+                f"ROW_NUMBER() OVER (PARTITION BY f.{movie_id} ORDER BY COUNT(*) DESC, "
+                f"m.{qn('vote_average')} DESC, m.{qn('popularity')} DESC, n.{movie_id}) AS position "
+                f"FROM {through} f "
+                f"INNER JOIN {through} n ON n.{genre_id} = f.{genre_id} AND n.{movie_id} <> f.{movie_id} "
+                f"INNER JOIN {movie} m ON m.{pk} = n.{movie_id} "
+                f"WHERE f.{movie_id} IN ({placeholders}) AND m.{qn('status')} = %s "
+                f"GROUP BY f.{movie_id}, n.{movie_id}, m.{qn('vote_average')}, m.{qn('popularity')}"
+                f") ranked WHERE position <= %s"
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(sql, [*chunk, "released", limit])
+                rows.extend(cursor.fetchall())
+        return rows
+
+
 class Movie(models.Model):
     """Model for movies from TMDb API"""
 
@@ -58,6 +106,11 @@ class Movie(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = MovieManager()
+
+    POSTER_URL_PREFIX = "https://image.tmdb.org/t/p/w500"
+    BACKDROP_URL_PREFIX = "https://image.tmdb.org/t/p/w1280"
+
     class Meta:
         ordering = ["-popularity", "-release_date"]
         indexes = [
@@ -65,6 +118,11 @@ class Movie(models.Model):
             models.Index(fields=["release_date"]),
             models.Index(fields=["popularity"]),
             models.Index(fields=["vote_average"]),
+            # PostgreSQL only (see migration 0002): admin and search lookups
+            # on title (icontains = UPPER(...) LIKE) and overview (full text)
+            GinIndex(OpClass(Upper("title"), name="gin_trgm_ops"), name="movie_title_trgm"),
+            GinIndex(OpClass(Upper("original_title"), name="gin_trgm_ops"), name="movie_orig_title_trgm"),
+            GinIndex(SearchVector("overview", config="english"), name="movie_overview_fts"),
         ]
 
     def __str__(self):
@@ -74,14 +132,14 @@ class Movie(models.Model):
     def poster_url(self):
         """Return full poster URL"""
         if self.poster_path:
-            return f"https://image.tmdb.org/t/p/w500{self.poster_path}"
+            return f"{self.POSTER_URL_PREFIX}{self.poster_path}"
         return None
 
     @property
     def backdrop_url(self):
         """Return full backdrop URL"""
         if self.backdrop_path:
-            return f"https://image.tmdb.org/t/p/w1280{self.backdrop_path}"
+            return f"{self.BACKDROP_URL_PREFIX}{self.backdrop_path}"
         return None
 
     @property
@@ -90,6 +148,101 @@ class Movie(models.Model):
         return self.release_date.year if self.release_date else None
 
 
+class SavedFavorite(NamedTuple):
+    """A favorite as returned by ``UserFavorite.objects.add_favorites``"""
+
+    id: int
+    movie_id: int
+    tmdb_id: int
+    created_at: object
+    created: bool
+
+
+class UserFavoriteManager(models.Manager):
+    """Manager with single-statement, idempotent favorite writes"""
+
+    def _execute(self, sql, params):
+        connection = connections[router.db_for_write(self.model)]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def add_favorites(self, user_id, movie_ids):
+        """Upsert favorites for existing movies and return every saved one.
+
+        The movie FK is checked by the INSERT ... SELECT itself. Conflicting
+        rows get a no-op ``DO UPDATE`` so that RETURNING reports them too,
+        along with the movie's tmdb_id, all in one round trip with no race
+        against the unique constraint. Returns a ``SavedFavorite`` per saved
+        movie; ``created`` is False for favorites that already existed.
+
+        PostgreSQL reports that directly (``xmax = 0`` only for rows this
+        statement inserted); other backends look up the existing favorites
+        first, which costs a query and is not race free.
+        """
+        movie_ids = list(dict.fromkeys(movie_ids))
+        if not movie_ids:
+            return []
+
+        connection = connections[router.db_for_write(self.model)]
+        qn = connection.ops.quote_name
+        opts = self.model._meta
+        table = qn(opts.db_table)
+        user, movie = qn(opts.get_field('user').column), qn(opts.get_field('movie').column)
+        created_at = qn(opts.get_field('created_at').column)
+        movie_table, movie_pk = qn(Movie._meta.db_table), qn(Movie._meta.pk.column)
+        placeholders = ", ".join(["%s"] * len(movie_ids))
+        if connection.vendor == 'postgresql':
+            inserted, existing = "(xmax = 0)", None
+        else:
+            inserted = "NULL"
+            existing = set(
+                self.using(connection.alias)
+                .filter(user_id=user_id, movie_id__in=movie_ids)
+                .values_list('movie_id', flat=True)
+            )
+        sql = (
+            f"INSERT INTO {table} ({user}, {movie}, {created_at}) "
+            f"SELECT %s, m.{movie_pk}, %s FROM {movie_table} m "
+            f"WHERE m.{movie_pk} IN ({placeholders}) "
+            f"ON CONFLICT ({user}, {movie}) DO UPDATE SET {user} = EXCLUDED.{user} "
+            f"RETURNING {qn(opts.pk.column)}, {movie}, "
+            f"(SELECT t.{qn('tmdb_id')} FROM {movie_table} t WHERE t.{movie_pk} = {table}.{movie}), "
+            f"{created_at}, {inserted}"
+        )
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        rows = self._execute(sql, [user_id, now, *movie_ids])
+        saved = []
+        for favorite_id, movie_id, tmdb_id, saved_at, created in rows:
+            if isinstance(saved_at, str):
+                # SQLite returns text
+                saved_at = parse_datetime(saved_at)
+            if timezone.is_naive(saved_at):
+                saved_at = timezone.make_aware(saved_at, dt_timezone.utc)
+            if existing is not None:
+                created = movie_id not in existing
+            saved.append(SavedFavorite(favorite_id, movie_id, tmdb_id, saved_at, bool(created)))
+        return saved
+
+    def remove_favorites(self, user_id, movie_ids):
+        """Delete favorites in one statement and return the removed movie ids"""
+        movie_ids = list(dict.fromkeys(movie_ids))
+        if not movie_ids:
+            return []
+
+        connection = connections[router.db_for_write(self.model)]
+        qn = connection.ops.quote_name
+        opts = self.model._meta
+        placeholders = ", ".join(["%s"] * len(movie_ids))
+        sql = (
+            f"DELETE FROM {qn(opts.db_table)} "
+            f"WHERE {qn(opts.get_field('user').column)} = %s "
+            f"AND {qn(opts.get_field('movie').column)} IN ({placeholders}) "
+            f"RETURNING {qn(opts.get_field('movie').column)}"
+        )
+        return [row[0] for row in self._execute(sql, [user_id, *movie_ids])]
+
+
 class UserFavorite(models.Model):
     """Model for user's favorite movies"""
 
@@ -97,6 +250,8 @@ class UserFavorite(models.Model):
     movie = models.ForeignKey(Movie, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = UserFavoriteManager()
+
     class Meta:
         unique_together = ("user", "movie")
         ordering = ["-created_at"]
@@ -1,14 +1,23 @@
 from rest_framework import serializers
+from movie_backend.metrics import measure
 from .models import Movie, Genre, UserFavorite
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class TimedSerializerMixin:
+    """Count time spent serializing towards the request's serializer metric"""
+
+    def to_representation(self, instance):
+        with measure('serializer'):
+            return super().to_representation(instance)
+
+
+class GenreSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Genre
         fields = ['id', 'tmdb_id', 'name']
 
 
-class MovieListSerializer(serializers.ModelSerializer):
+class MovieListSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for movie list views (minimal data)"""
     genres = GenreSerializer(many=True, read_only=True)
     poster_url = serializers.ReadOnlyField()
@@ -32,7 +41,7 @@ class MovieListSerializer(serializers.ModelSerializer):
         ]
 
 
-class MovieDetailSerializer(serializers.ModelSerializer):
+class MovieDetailSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for movie detail view (complete data)"""
     genres = GenreSerializer(many=True, read_only=True)
     poster_url = serializers.ReadOnlyField()
@@ -69,7 +78,7 @@ class MovieDetailSerializer(serializers.ModelSerializer):
         ]
 
 
-class UserFavoriteSerializer(serializers.ModelSerializer):
+class UserFavoriteSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     movie = MovieListSerializer(read_only=True)
     movie_id = serializers.IntegerField(write_only=True)
     
@@ -80,4 +89,24 @@ class UserFavoriteSerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
-        return super().create(validated_data)
\ No newline at end of file
+        return super().create(validated_data)
+
+
+class UserFavoriteBulkSerializer(serializers.Serializer):
+    """Serializer for adding and removing many favorites in one request"""
+    add = serializers.ListField(
+        child=serializers.IntegerField(), required=False, default=list, max_length=500
+    )
+    remove = serializers.ListField(
+        child=serializers.IntegerField(), required=False, default=list, max_length=500
+    )
+
+    def validate(self, attrs):
+        if not attrs['add'] and not attrs['remove']:
+            raise serializers.ValidationError("Provide movie ids to add or remove")
+        return attrs
+
+class RecommendationsSerializer(serializers.Serializer):
+    """Shape of a recommendations response (documentation only)"""
+    count = serializers.IntegerField()
+    results = MovieListSerializer(many=True)
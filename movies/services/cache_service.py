@@ -1,10 +1,19 @@
 import json
 import hashlib
+import random
 from typing import Any, Optional
 from django.core.cache import cache
 from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+from movie_backend import metrics
+from movie_backend.metrics import record_cache_access
 import logging
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -13,6 +22,7 @@ class CacheService:
     
     def __init__(self):
         self.cache_ttl = getattr(settings, 'CACHE_TTL', {})
+        self.adaptive_ttl_options = getattr(settings, 'ADAPTIVE_TTL', {})
     
     def _generate_cache_key(self, prefix: str, **kwargs) -> str:
         """Generate a unique cache key based on prefix and parameters"""
@@ -24,7 +34,9 @@ class CacheService:
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache"""
         try:
-            return cache.get(key)
+            value = cache.get(key)
+            record_cache_access(key, value is not None)
+            return value
         except Exception as e:
             logger.error(f"Cache get error for key {key}: {e}")
             return None
@@ -38,6 +50,34 @@ class CacheService:
             logger.error(f"Cache set error for key {key}: {e}")
             return False
     
+    def add(self, key: str, value: Any, timeout: Optional[int] = None) -> bool:
+        """Set value only if the key is absent; returns whether it was set"""
+        try:
+            return bool(cache.add(key, value, timeout))
+        except Exception as e:
+            logger.error(f"Cache add error for key {key}: {e}")
+            return False
+    
+    def get_many(self, keys) -> dict:
+        """Get many values in one round trip; missing keys are left out"""
+        try:
+            values = cache.get_many(keys)
+        except Exception as e:
+            logger.error(f"Cache get_many error: {e}")
+            values = {}
+        for key in keys:
+            record_cache_access(key, key in values)
+        return values
+    
+    def set_many(self, values: dict, timeout: Optional[int] = None) -> bool:
+        """Set many values in one round trip"""
+        try:
+            cache.set_many(values, timeout)
+            return True
+        except Exception as e:
+            logger.error(f"Cache set_many error: {e}")
+            return False
+    
     def delete(self, key: str) -> bool:
         """Delete value from cache"""
         try:
@@ -52,6 +92,7 @@ class CacheService:
         try:
             # Try to get from cache first
             cached_value = cache.get(key)
+            record_cache_access(key, cached_value is not None)
             if cached_value is not None:
                 logger.info(f"Cache hit for key: {key}")
                 return cached_value
@@ -71,9 +112,66 @@ class CacheService:
             # If cache fails, just execute the function
             return func(*args, **kwargs)
     
+    @staticmethod
+    def content_hash(value: Any) -> str:
+        """Stable hash of a JSON-like payload"""
+        if orjson is not None:
+            data = orjson.dumps(value, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+        else:
+            data = json.dumps(value, sort_keys=True, default=str).encode()
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+    
+    def adaptive_ttl(self, key: str, value: Any, ttl_name: str, base_ttl: int) -> int:
+        """TTL for a refreshed payload, from how often this key's content changes
+        
+        Each key remembers the hash of its last payload and the TTL it got.
+        An unchanged payload gets a longer TTL (``GROWTH``), a changed one a
+        shorter one (``SHRINK``), bounded by ``MIN_FACTOR``/``MAX_FACTOR``
+        times the category's base TTL. Jitter spreads out the expirations of
+        keys refreshed together.
+        """
+        options = self.adaptive_ttl_options
+        if not options.get('ENABLED', True):
+            return self.jittered(base_ttl)
+        lower, upper = options.get('BOUNDS', {}).get(ttl_name) or (
+            base_ttl * options.get('MIN_FACTOR', 0.25), base_ttl * options.get('MAX_FACTOR', 8),
+        )
+        state_key = f"ttl_state:{key}"
+        digest = self.content_hash(value)
+        try:
+            state = cache.get(state_key)
+        except Exception as e:
+            logger.error(f"TTL state get error for key {key}: {e}")
+            state = None
+        
+        if state is None:
+            ttl, changed = base_ttl, None
+        elif state['hash'] == digest:
+            ttl, changed = state['ttl'] * options.get('GROWTH', 1.5), False
+        else:
+            ttl, changed = state['ttl'] * options.get('SHRINK', 0.5), True
+        ttl = min(max(ttl, lower), upper)
+        
+        try:
+            # Outlives the entry, so the next refresh can compare
+            cache.set(state_key, {'hash': digest, 'ttl': ttl}, options.get('STATE_TTL', 60 * 60 * 24 * 7))
+        except Exception as e:
+            logger.error(f"TTL state set error for key {key}: {e}")
+        if changed is not None:
+            metrics.registry.record(f"ttl:{ttl_name}", 'changed', int(changed))
+        metrics.registry.record(f"ttl:{ttl_name}", 'ttl_seconds', ttl)
+        return self.jittered(ttl)
+    
+    def jittered(self, ttl: float) -> int:
+        """Randomly shorten a TTL by up to ``ADAPTIVE_TTL['JITTER']`` (a fraction)"""
+        jitter = self.adaptive_ttl_options.get('JITTER', 0.1)
+        return max(1, int(ttl * (1 - random.random() * jitter)))
+    
     # Movie-specific cache methods
-    def get_trending_movies_key(self, page: int = 1) -> str:
+    def get_trending_movies_key(self, page: int = 1, time_window: str = 'week') -> str:
         """Generate cache key for trending movies"""
+        if time_window != 'week':
+            return self._generate_cache_key('trending_movies', page=page, time_window=time_window)
         return self._generate_cache_key('trending_movies', page=page)
     
     def get_popular_movies_key(self, page: int = 1) -> str:
@@ -88,6 +186,10 @@ class CacheService:
         """Generate cache key for movie details"""
         return self._generate_cache_key('movie_details', movie_id=movie_id)
     
+    def get_movie_payload_key(self, tmdb_id: int) -> str:
+        """Generate cache key for a movie's serialized detail payload"""
+        return f"movie_payload:{tmdb_id}"
+    
     def get_genres_key(self) -> str:
         """Generate cache key for genres"""
         return 'genres:all'
@@ -100,6 +202,14 @@ class CacheService:
         """Generate cache key for user favorites"""
         return f"user_favorites:{user_id}"
     
+    def get_user_favorite_ids_key(self, user_id: int) -> str:
+        """Generate cache key for the ids of a user's favorite movies"""
+        return f"user_favorite_ids:{user_id}"
+    
+    def get_user_recommendations_key(self, user_id: int) -> str:
+        """Generate cache key for a user's personalized recommendations"""
+        return f"user_recommendations:{user_id}"
+    
     def get_movie_recommendations_key(self, **filters) -> str:
         """Generate cache key for movie recommendations"""
         return self._generate_cache_key('recommendations', **filters)
@@ -124,44 +234,35 @@ class CacheService:
             except Exception as e:
                 logger.error(f"Error deleting cache pattern {pattern}: {e}")
     
+    def invalidate_movie_payloads(self, tmdb_ids):
+        """Drop the cached detail payloads of these movies"""
+        try:
+            cache.delete_many([self.get_movie_payload_key(tmdb_id) for tmdb_id in tmdb_ids])
+        except Exception as e:
+            logger.error(f"Error deleting movie payload cache: {e}")
+    
     def invalidate_user_cache(self, user_id: int):
         """Invalidate user-specific cache"""
         try:
-            cache.delete_pattern(f'user_favorites:{user_id}')
+            cache.delete_many([
+                self.get_user_favorites_key(user_id),
+                self.get_user_favorite_ids_key(user_id),
+                self.get_user_recommendations_key(user_id),
+            ])
         except Exception as e:
             logger.error(f"Error deleting user cache for {user_id}: {e}")
     
     # Cache warming methods
-    def warm_popular_caches(self):
-        """Pre-warm popular caches"""
-        from .tmdb_service import tmdb_service
+    def warm_popular_caches(self, top: Optional[int] = None, concurrency: Optional[int] = None,
+                            budget: Optional[float] = None) -> dict:
+        """Pre-warm the most accessed caches (see WarmingService)"""
+        from .warming_service import warming_service
         
         try:
-            # Warm trending movies cache
-            trending_key = self.get_trending_movies_key(1)
-            trending_timeout = self.cache_ttl.get('TRENDING_MOVIES', 900) 
-            
-            self.get_or_set(
-                trending_key,
-                tmdb_service.get_trending_movies,
-                trending_timeout,
-                'week', 1
-            )
-            
-            # Warm popular movies cache
-            popular_key = self.get_popular_movies_key(1)
-            popular_timeout = self.cache_ttl.get('POPULAR_MOVIES', 1800) 
-            
-            self.get_or_set(
-                popular_key,
-                tmdb_service.get_popular_movies,
-                popular_timeout,
-                1
-            )
-            
-            logger.info("Cache warming completed successfully")
-            
+            # Fetched through the cached clients, which also keep stale copies
+            return warming_service.warm(top, concurrency, budget)
         except Exception as e:
             logger.error(f"Cache warming error: {e}")
+            return {}
 
-cache_service = CacheService()
\ No newline at end of file
+cache_service = SimpleLazyObject(CacheService)
\ No newline at end of file
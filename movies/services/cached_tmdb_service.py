@@ -0,0 +1,169 @@
+from typing import Callable, Dict, Optional
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+from django.db.models import QuerySet
+import logging
+
+from movie_backend import metrics
+from ..models import Genre, Movie
+from .cache_service import cache_service
+from .tmdb_service import endpoint_template, tmdb_service
+from .warming_service import warming_service
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 20
+STATUS_NAMES = dict(Movie.STATUS_CHOICES)
+
+
+def render_movie(movie: Movie) -> Dict:
+    """A local movie in the shape of a TMDb list result"""
+    return {
+        'id': movie.tmdb_id,
+        'title': movie.title,
+        'original_title': movie.original_title,
+        'overview': movie.overview,
+        'release_date': movie.release_date.isoformat() if movie.release_date else '',
+        'poster_path': movie.poster_path or None,
+        'backdrop_path': movie.backdrop_path or None,
+        'vote_average': movie.vote_average,
+        'vote_count': movie.vote_count,
+        'popularity': movie.popularity,
+        'original_language': movie.original_language,
+        'genre_ids': [genre.tmdb_id for genre in movie.genres.all()],
+        'adult': False,
+        'video': False,
+    }
+
+
+def render_movie_details(movie: Movie) -> Dict:
+    """A local movie in the shape of TMDb's movie details"""
+    details = render_movie(movie)
+    details.pop('genre_ids')
+    details.update({
+        'genres': [{'id': genre.tmdb_id, 'name': genre.name} for genre in movie.genres.all()],
+        'imdb_id': movie.imdb_id,
+        'tagline': movie.tagline,
+        'runtime': movie.runtime,
+        'budget': movie.budget or 0,
+        'revenue': movie.revenue or 0,
+        'status': STATUS_NAMES.get(movie.status, movie.status),
+    })
+    return details
+
+
+def render_movie_page(queryset: QuerySet, page: int) -> Dict:
+    """A page of local movies in the shape of a TMDb list response"""
+    total = queryset.count()
+    offset = (max(page, 1) - 1) * PAGE_SIZE
+    movies = queryset.prefetch_related('genres')[offset:offset + PAGE_SIZE]
+    return {
+        'page': page,
+        'results': [render_movie(movie) for movie in movies],
+        'total_pages': (total + PAGE_SIZE - 1) // PAGE_SIZE,
+        'total_results': total,
+    }
+
+
+class CachedTMDbService:
+    """TMDb client that caches responses and falls back to stale copies
+
+    Every successful payload is cached twice: under the usual key for the
+    endpoint's TTL, and under a ``stale:`` key for much longer. When TMDb
+    fails, its circuit is open or the request's upstream budget runs out,
+    the stale copy is returned, or failing that the local ``Movie`` table
+    rendered in the TMDb response shape.
+    """
+
+    def __init__(self):
+        self.cache_ttl = getattr(settings, 'CACHE_TTL', {})
+
+    def get_stale_key(self, key: str) -> str:
+        return f"stale:{key}"
+
+    def _fetch(self, key: str, ttl_name: str, default_ttl: int, endpoint: str,
+               func: Callable, *args, fallback: Optional[Callable] = None) -> Optional[Dict]:
+        # The getter of this class has the same name and arguments as the TMDb one
+        warming_service.record(func.__name__, *args)
+        value = cache_service.get(key)
+        if value is not None:
+            return value
+
+        value = func(*args)
+        if value is not None:
+            ttl = cache_service.adaptive_ttl(key, value, ttl_name, self.cache_ttl.get(ttl_name, default_ttl))
+            cache_service.set(key, value, ttl)
+            cache_service.set(self.get_stale_key(key), value, self.cache_ttl.get('TMDB_STALE', 60 * 60 * 24 * 7))
+            return value
+
+        name = f"tmdb:{endpoint_template(endpoint)}"
+        stale = cache_service.get(self.get_stale_key(key))
+        if stale is not None:
+            logger.warning(f"Serving stale TMDb data for {key}")
+            metrics.registry.record(name, 'stale_served', 1)
+            return stale
+
+        if fallback is not None:
+            logger.warning(f"Serving local data for {key}")
+            metrics.registry.record(name, 'db_fallback_served', 1)
+            return fallback()
+        return None
+
+    def get_popular_movies(self, page: int = 1) -> Optional[Dict]:
+        """Get popular movies, cached"""
+        return self._fetch(
+            cache_service.get_popular_movies_key(page), 'POPULAR_MOVIES', 1800,
+            'movie/popular', tmdb_service.get_popular_movies, page,
+            fallback=lambda: render_movie_page(Movie.objects.order_by('-popularity'), page),
+        )
+
+    def get_trending_movies(self, time_window: str = 'week', page: int = 1) -> Optional[Dict]:
+        """Get trending movies, cached"""
+        return self._fetch(
+            cache_service.get_trending_movies_key(page, time_window), 'TRENDING_MOVIES', 900,
+            f'trending/movie/{time_window}', tmdb_service.get_trending_movies, time_window, page,
+            fallback=lambda: render_movie_page(
+                Movie.objects.filter(status='released').order_by('-popularity'), page
+            ),
+        )
+
+    def get_top_rated_movies(self, page: int = 1) -> Optional[Dict]:
+        """Get top rated movies, cached"""
+        return self._fetch(
+            cache_service.get_top_rated_movies_key(page), 'TOP_RATED_MOVIES', 3600,
+            'movie/top_rated', tmdb_service.get_top_rated_movies, page,
+            fallback=lambda: render_movie_page(
+                Movie.objects.filter(vote_count__gte=100).order_by('-vote_average', '-vote_count'), page
+            ),
+        )
+
+    def get_movie_details(self, movie_id: int) -> Optional[Dict]:
+        """Get movie details, cached"""
+        return self._fetch(
+            cache_service.get_movie_details_key(movie_id), 'MOVIE_DETAILS', 7200,
+            f'movie/{movie_id}', tmdb_service.get_movie_details, movie_id,
+            fallback=lambda: self._local_details(movie_id),
+        )
+
+    def get_genres(self) -> Optional[Dict]:
+        """Get the genre list, cached"""
+        return self._fetch(
+            cache_service.get_genres_key(), 'GENRES', 86400,
+            'genre/movie/list', tmdb_service.get_genres,
+            fallback=lambda: {'genres': [{'id': g.tmdb_id, 'name': g.name} for g in Genre.objects.all()]},
+        )
+
+    def search_movies(self, query: str, page: int = 1) -> Optional[Dict]:
+        """Search movies, cached"""
+        return self._fetch(
+            cache_service.get_search_key(query, page), 'SEARCH_RESULTS', 600,
+            'search/movie', tmdb_service.search_movies, query, page,
+            fallback=lambda: render_movie_page(Movie.objects.filter(title__icontains=query), page),
+        )
+
+    def _local_details(self, movie_id: int) -> Optional[Dict]:
+        movie = Movie.objects.filter(tmdb_id=movie_id).prefetch_related('genres').first()
+        return render_movie_details(movie) if movie else None
+
+
+cached_tmdb_service = SimpleLazyObject(CachedTMDbService)
@@ -0,0 +1,75 @@
+from typing import Iterable, Iterator, List
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+import csv
+import logging
+
+from movie_backend.renderers import FastJSONRenderer
+from ..fast_serializers import movie_detail_serializer
+
+logger = logging.getLogger(__name__)
+
+
+class _Echo:
+    """File-like object whose write returns the line, for streaming csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+class ExportService:
+    """Stream the movie catalog as NDJSON or CSV in constant memory
+
+    Rows are read through ``iterator(chunk_size=...)`` (a server-side cursor
+    on PostgreSQL) and serialized a chunk at a time with the detail fast
+    serializer, so genres cost one query per chunk.
+    """
+
+    FORMATS = {
+        'ndjson': 'application/x-ndjson',
+        'csv': 'text/csv; charset=utf-8',
+    }
+    # CSV separator between genre names
+    GENRE_SEPARATOR = '|'
+
+    def __init__(self):
+        self.chunk_size = getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+        self.renderer = FastJSONRenderer()
+
+    def iter_movies(self, queryset) -> Iterator[List[dict]]:
+        """Serialized movies, one list per chunk"""
+        rows = movie_detail_serializer.values(queryset.order_by('id')).iterator(chunk_size=self.chunk_size)
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                yield movie_detail_serializer.serialize_rows(chunk)
+                chunk = []
+        if chunk:
+            yield movie_detail_serializer.serialize_rows(chunk)
+
+    def ndjson(self, chunks: Iterable[List[dict]]) -> Iterator[bytes]:
+        render = self.renderer.render
+        for movies in chunks:
+            yield b''.join(render(movie) + b'\n' for movie in movies)
+
+    def csv(self, chunks: Iterable[List[dict]]) -> Iterator[str]:
+        writer = csv.writer(_Echo())
+        columns = [name for name, _ in movie_detail_serializer.accessors]
+        yield writer.writerow(columns)
+        for movies in chunks:
+            lines = []
+            for movie in movies:
+                movie['genres'] = self.GENRE_SEPARATOR.join(genre['name'] for genre in movie['genres'])
+                lines.append(writer.writerow(['' if movie[name] is None else movie[name] for name in columns]))
+            yield ''.join(lines)
+
+    def stream(self, fmt: str, queryset) -> Iterator:
+        """Response body for ``fmt`` ('ndjson' or 'csv')"""
+        chunks = self.iter_movies(queryset)
+        if fmt == 'csv':
+            return self.csv(chunks)
+        return self.ndjson(chunks)
+
+
+export_service = SimpleLazyObject(ExportService)
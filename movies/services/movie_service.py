@@ -0,0 +1,145 @@
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+from django.db import close_old_connections
+import contextvars
+import logging
+import os
+import threading
+
+from movie_backend import upstream
+from ..fast_serializers import movie_detail_serializer
+from ..ingestion import ingest_movies
+from ..models import Movie
+from .cache_service import cache_service
+from .cached_tmdb_service import cached_tmdb_service
+from .tmdb_service import tmdb_service
+from .warming_service import MOVIE_PAYLOAD, warming_service
+
+logger = logging.getLogger(__name__)
+
+
+class MovieService:
+    """Look up many movies' detail payloads by tmdb_id
+
+    Payloads come from the per-movie cache (one multi-get), then the
+    database (one query plus one for genres), then, optionally, TMDb:
+    missing ids are fetched concurrently on a small pool and ingested.
+    """
+
+    def __init__(self):
+        self.cache_ttl = getattr(settings, 'CACHE_TTL', {})
+        options = getattr(settings, 'MOVIE_BATCH', {})
+        self.max_ids = options.get('MAX_IDS', 100)
+        self.tmdb_fill = options.get('TMDB_FILL', True)
+        self.max_tmdb_fetches = options.get('MAX_TMDB_FETCHES', 10)
+        self.tmdb_workers = options.get('TMDB_WORKERS', 4)
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def payload_timeout(self) -> int:
+        return self.cache_ttl.get('MOVIE_PAYLOAD', 3600)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Pools don't survive fork; build one per worker process
+        if self._executor is None or self._executor_pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._executor_pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.tmdb_workers, thread_name_prefix='tmdb-batch'
+                    )
+                    self._executor_pid = os.getpid()
+        return self._executor
+
+    def get_many(self, tmdb_ids: List[int], fill_from_tmdb: bool = False) -> Tuple[Dict[int, dict], List[int]]:
+        """({tmdb_id: detail payload}, missing tmdb ids in request order)"""
+        tmdb_ids = list(dict.fromkeys(tmdb_ids))
+        for tmdb_id in tmdb_ids:
+            warming_service.record(MOVIE_PAYLOAD, tmdb_id)
+        keys = {cache_service.get_movie_payload_key(tmdb_id): tmdb_id for tmdb_id in tmdb_ids}
+        found = {keys[key]: payload for key, payload in cache_service.get_many(list(keys)).items()}
+
+        missing = [tmdb_id for tmdb_id in tmdb_ids if tmdb_id not in found]
+        if missing:
+            found.update(self._load(missing))
+            missing = [tmdb_id for tmdb_id in missing if tmdb_id not in found]
+
+        if missing and fill_from_tmdb and self.tmdb_fill:
+            fetched = self._fetch_from_tmdb(missing[:self.max_tmdb_fetches])
+            if fetched:
+                ingest_movies(fetched, details=True)
+                found.update(self._load([payload['id'] for payload in fetched]))
+                missing = [tmdb_id for tmdb_id in missing if tmdb_id not in found]
+        return found, missing
+
+    def get(self, tmdb_id: int) -> Optional[dict]:
+        return self.get_many([tmdb_id])[0].get(tmdb_id)
+
+    def _load(self, tmdb_ids: List[int]) -> Dict[int, dict]:
+        """Serialize from the database and cache the payloads"""
+        payloads = {
+            payload['tmdb_id']: payload
+            for payload in movie_detail_serializer.serialize(Movie.objects.filter(tmdb_id__in=tmdb_ids))
+        }
+        if payloads:
+            cache_service.set_many(
+                {cache_service.get_movie_payload_key(tmdb_id): payload for tmdb_id, payload in payloads.items()},
+                self.payload_timeout,
+            )
+        return payloads
+
+    def refresh_from_tmdb(self, tmdb_ids: List[int]) -> Tuple[List[int], List[int]]:
+        """Re-fetch movies from TMDb (bypassing its cache) and ingest them
+        
+        Returns (refreshed tmdb ids, tmdb ids that could not be fetched).
+        """
+        tmdb_ids = list(dict.fromkeys(tmdb_ids))
+        fetched = self._fetch_from_tmdb(tmdb_ids, fresh=True)
+        if fetched:
+            ingest_movies(fetched, details=True)
+            for payload in fetched:
+                cache_service.delete(cache_service.get_movie_details_key(payload['id']))
+        refreshed = {payload['id'] for payload in fetched}
+        return (
+            [tmdb_id for tmdb_id in tmdb_ids if tmdb_id in refreshed],
+            [tmdb_id for tmdb_id in tmdb_ids if tmdb_id not in refreshed],
+        )
+
+    @staticmethod
+    def _fetch_details(tmdb_id: int, fresh: bool = False) -> Optional[dict]:
+        try:
+            if fresh:
+                return tmdb_service.get_movie_details(tmdb_id)
+            return cached_tmdb_service.get_movie_details(tmdb_id)
+        finally:
+            # Pool threads hold their own DB connections
+            close_old_connections()
+
+    def _fetch_from_tmdb(self, tmdb_ids: List[int], fresh: bool = False) -> List[dict]:
+        """Fetch movie details concurrently, within the request's upstream budget"""
+        executor = self._get_executor()
+        # Each call runs in a copy of this context, so it sees the upstream budget
+        futures = [
+            executor.submit(contextvars.copy_context().run, self._fetch_details, tmdb_id, fresh)
+            for tmdb_id in tmdb_ids
+        ]
+        done, not_done = wait(futures, timeout=upstream.remaining())
+        for future in not_done:
+            future.cancel()
+
+        payloads = []
+        for future in done:
+            try:
+                payload = future.result()
+            except Exception as e:
+                logger.error(f"TMDb batch fetch error: {e}")
+                continue
+            if payload and payload.get('id') in tmdb_ids:
+                payloads.append(payload)
+        return payloads
+
+
+movie_service = SimpleLazyObject(MovieService)
@@ -0,0 +1,276 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+import logging
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.functional import SimpleLazyObject
+
+from ..models import Movie, SavedFavorite, UserFavorite
+from ..serializers import MovieListSerializer, UserFavoriteSerializer
+from .cache_service import cache_service
+
+logger = logging.getLogger(__name__)
+
+
+class PersonalizationService:
+    """Service for per-user favorites and recommendation caches
+
+    Recommendations are a score per candidate movie, built as the sum of
+    every favorite's "neighbour contribution" (movies sharing its genres).
+    Each contribution is cached alongside the scores, so adding a favorite
+    adds its contribution and removing one subtracts exactly what was added,
+    even after the catalog has changed. Updates to one user's caches are
+    serialized with a cache lock.
+    """
+
+    def __init__(self):
+        self.cache_ttl = getattr(settings, 'CACHE_TTL', {})
+        options = getattr(settings, 'PERSONAL_RECOMMENDATIONS', {})
+        self.neighbours_per_movie = options.get('NEIGHBOURS_PER_MOVIE', 50)
+        self.results_limit = options.get('RESULTS_LIMIT', 20)
+        self.incremental_updates = options.get('INCREMENTAL_UPDATES', True)
+        # Bulk syncs larger than this invalidate instead of updating per movie
+        self.incremental_batch_limit = options.get('INCREMENTAL_BATCH_LIMIT', 5)
+        self.lock_timeout = options.get('LOCK_TIMEOUT', 10)
+        self.lock_wait = options.get('LOCK_WAIT', 0.5)
+
+    @property
+    def favorites_timeout(self) -> int:
+        return self.cache_ttl.get('USER_FAVORITES', 300)
+
+    @property
+    def recommendations_timeout(self) -> int:
+        return self.cache_ttl.get('USER_RECOMMENDATIONS', 1800)
+
+    # Favorites
+    def get_favorite_ids(self, user_id: int) -> List[int]:
+        """Get the ids of a user's favorite movies"""
+        key = cache_service.get_user_favorite_ids_key(user_id)
+        favorite_ids = cache_service.get(key)
+        if favorite_ids is None:
+            favorite_ids = list(
+                UserFavorite.objects.filter(user_id=user_id).values_list('movie_id', flat=True)
+            )
+            cache_service.set(key, favorite_ids, self.favorites_timeout)
+        return favorite_ids
+
+    def get_favorites(self, user_id: int) -> List[dict]:
+        """Get a user's serialized favorites, newest first"""
+        key = cache_service.get_user_favorites_key(user_id)
+        favorites = cache_service.get(key)
+        if favorites is None:
+            queryset = (
+                UserFavorite.objects.filter(user_id=user_id)
+                .select_related('movie')
+                .prefetch_related('movie__genres')
+            )
+            favorites = list(UserFavoriteSerializer(queryset, many=True).data)
+            cache_service.set(key, favorites, self.favorites_timeout)
+        return favorites
+
+    # Favorite writes
+    def add_favorite(self, user_id: int, movie_id: int) -> Optional[SavedFavorite]:
+        """Idempotently add a favorite; None when the movie does not exist"""
+        saved = UserFavorite.objects.add_favorites(user_id, [movie_id])
+        if not saved:
+            return None
+        if saved[0].created:
+            transaction.on_commit(lambda: self.favorite_added(user_id, movie_id))
+        return saved[0]
+
+    def remove_favorite(self, user_id: int, movie_id: int) -> bool:
+        """Remove a favorite; returns whether it existed"""
+        removed = UserFavorite.objects.remove_favorites(user_id, [movie_id])
+        if removed:
+            transaction.on_commit(lambda: self.favorite_removed(user_id, movie_id))
+        return bool(removed)
+
+    def sync_favorites(self, user_id: int, add: Iterable[int], remove: Iterable[int]) -> dict:
+        """Add and remove many favorites at once (removals are applied last)"""
+        add, remove = list(add), list(remove)
+        with transaction.atomic():
+            saved = UserFavorite.objects.add_favorites(user_id, add)
+            removed = UserFavorite.objects.remove_favorites(user_id, remove)
+
+        # The upsert returns every saved favorite, so ids it skipped are unknown movies
+        added = [favorite.movie_id for favorite in saved if favorite.created]
+        known = {favorite.movie_id for favorite in saved}
+        missing = [movie_id for movie_id in dict.fromkeys(add) if movie_id not in known]
+
+        if added or removed:
+            transaction.on_commit(lambda: self._favorites_synced(user_id, added, removed))
+
+        return {'added': added, 'removed': removed, 'missing': missing}
+
+    def _favorites_synced(self, user_id: int, added: List[int], removed: List[int]):
+        if len(added) + len(removed) > self.incremental_batch_limit:
+            cache_service.invalidate_user_cache(user_id)
+            return
+        self.favorites_changed(user_id, added, removed)
+
+    # Recommendations
+    def _neighbour_scores(self, genre_map: Dict[int, List[int]]) -> Dict[int, Dict[int, float]]:
+        """Score the movies sharing genres with each movie (its contribution)"""
+        contributions = defaultdict(dict)
+        rows = Movie.objects.genre_neighbours(
+            [movie_id for movie_id, genre_ids in genre_map.items() if genre_ids],
+            self.neighbours_per_movie,
+        )
+        for movie_id, neighbour_id, shared in rows:
+            contributions[movie_id][neighbour_id] = shared / len(genre_map[movie_id])
+        return contributions
+
+    def _genre_map(self, movie_ids: List[int]) -> Dict[int, List[int]]:
+        """Map movie ids to their genre ids in a single query"""
+        genre_map = defaultdict(list)
+        rows = Movie.genres.through.objects.filter(movie_id__in=movie_ids).values_list(
+            'movie_id', 'genre_id'
+        )
+        for movie_id, genre_id in rows:
+            genre_map[movie_id].append(genre_id)
+        return genre_map
+
+    def _compute_state(self, favorite_ids: List[int]) -> dict:
+        """Compute every favorite's contribution and the summed scores from scratch"""
+        neighbours = self._neighbour_scores(self._genre_map(favorite_ids))
+        contributions = {movie_id: neighbours.get(movie_id, {}) for movie_id in favorite_ids}
+        scores = defaultdict(float)
+        for contribution in contributions.values():
+            for neighbour_id, score in contribution.items():
+                scores[neighbour_id] += score
+        return {'contributions': contributions, 'scores': dict(scores)}
+
+    def _render(self, scores: Dict[int, float], favorite_ids: List[int]) -> List[dict]:
+        """Serialize the top scored movies that are not already favorites"""
+        excluded = set(favorite_ids)
+        ranked = sorted(
+            (movie_id for movie_id in scores if movie_id not in excluded),
+            key=lambda movie_id: (-scores[movie_id], movie_id),
+        )[:self.results_limit]
+
+        if ranked:
+            movies = Movie.objects.filter(id__in=ranked).prefetch_related('genres')
+            by_id = {movie.id: movie for movie in movies}
+            movies = [by_id[movie_id] for movie_id in ranked if movie_id in by_id]
+        else:
+            # Nothing to personalize from yet - fall back to highly rated movies
+            movies = Movie.objects.filter(
+                status='released', vote_average__gte=7.0, vote_count__gte=100
+            ).exclude(id__in=excluded).order_by('-vote_average', '-popularity').prefetch_related(
+                'genres'
+            )[:self.results_limit]
+
+        return list(MovieListSerializer(movies, many=True).data)
+
+    def get_recommendations(self, user_id: int) -> List[dict]:
+        """Get a user's serialized recommendations"""
+        key = cache_service.get_user_recommendations_key(user_id)
+        state = cache_service.get(key)
+        if state is not None and state.get('results') is not None:
+            return state['results']
+
+        favorite_ids = self.get_favorite_ids(user_id)
+        if state is None:
+            state = self._compute_state(favorite_ids)
+
+        state['results'] = self._render(state['scores'], favorite_ids)
+        cache_service.set(key, state, self.recommendations_timeout)
+        return state['results']
+
+    # Event handlers
+    @contextmanager
+    def _user_lock(self, user_id: int):
+        """Serialize cache updates for one user; yields False if the lock wasn't acquired in time"""
+        key = f"user_cache_lock:{user_id}"
+        deadline = time.monotonic() + self.lock_wait
+        acquired = cache_service.add(key, 1, self.lock_timeout)
+        while not acquired and time.monotonic() < deadline:
+            time.sleep(0.01)
+            acquired = cache_service.add(key, 1, self.lock_timeout)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                cache_service.delete(key)
+
+    def _contributions(self, user_id: int, movie_ids: List[int]) -> Optional[Dict[int, Dict[int, float]]]:
+        """New favorites' contributions, if the user has cached scores to add them to"""
+        if not movie_ids or not self.incremental_updates:
+            return None
+        if cache_service.get(cache_service.get_user_recommendations_key(user_id)) is None:
+            return None
+        neighbours = self._neighbour_scores(self._genre_map(movie_ids))
+        return {movie_id: neighbours.get(movie_id, {}) for movie_id in movie_ids}
+
+    def _apply_contributions(self, user_id: int, added: List[int], removed: List[int],
+                             contributions: Optional[Dict[int, Dict[int, float]]]):
+        """Add new favorites' contributions and subtract removed ones' (call with the user lock held)"""
+        key = cache_service.get_user_recommendations_key(user_id)
+        state = cache_service.get(key)
+        if state is None:
+            return
+
+        cached = state.get('contributions')
+        if not self.incremental_updates or cached is None or (added and contributions is None):
+            cache_service.delete(key)
+            return
+
+        affected = set()
+        for movie_id in added:
+            if movie_id not in cached:
+                cached[movie_id] = contributions[movie_id]
+                affected.update(cached[movie_id])
+        for movie_id in removed:
+            affected.update(cached.pop(movie_id, {}))
+
+        # Re-sum the affected scores from the stored contributions, so nothing drifts
+        scores = state['scores']
+        for neighbour_id in affected:
+            score = sum(contribution.get(neighbour_id, 0.0) for contribution in cached.values())
+            if score:
+                scores[neighbour_id] = score
+            else:
+                scores.pop(neighbour_id, None)
+
+        # Rendered results are rebuilt from the updated scores on next read
+        state['results'] = None
+        cache_service.set(key, state, self.recommendations_timeout)
+
+    def favorites_changed(self, user_id: int, added: List[int], removed: List[int]):
+        """Update a user's caches after favorites were added and removed"""
+        try:
+            contributions = self._contributions(user_id, added)
+            with self._user_lock(user_id) as locked:
+                if not locked:
+                    cache_service.invalidate_user_cache(user_id)
+                    return
+                key = cache_service.get_user_favorite_ids_key(user_id)
+                favorite_ids = cache_service.get(key)
+                if favorite_ids is not None:
+                    gone = set(removed)
+                    new = [movie_id for movie_id in added if movie_id not in favorite_ids]
+                    cache_service.set(
+                        key,
+                        [movie_id for movie_id in new[::-1] + favorite_ids if movie_id not in gone],
+                        self.favorites_timeout,
+                    )
+
+                cache_service.delete(cache_service.get_user_favorites_key(user_id))
+                self._apply_contributions(user_id, added, removed, contributions)
+        except Exception as e:
+            logger.error(f"Error updating caches for user {user_id}: {e}")
+            cache_service.invalidate_user_cache(user_id)
+
+    def favorite_added(self, user_id: int, movie_id: int):
+        """Update a user's caches after a favorite was added"""
+        self.favorites_changed(user_id, [movie_id], [])
+
+    def favorite_removed(self, user_id: int, movie_id: int):
+        """Update a user's caches after a favorite was removed"""
+        self.favorites_changed(user_id, [], [movie_id])
+
+
+personalization_service = SimpleLazyObject(PersonalizationService)
@@ -1,10 +1,42 @@
 import requests
+from requests.adapters import HTTPAdapter
 from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+from email.utils import parsedate_to_datetime
 from typing import Dict, List, Optional
+from movie_backend import metrics, upstream
+from movie_backend.circuit_breaker import CircuitBreaker
+from movie_backend.metrics import record_tmdb_call
 import logging
+import os
+import re
+import time
 
 logger = logging.getLogger(__name__)
 
+ID_SEGMENT = re.compile(r'(?<=/)\d+(?=/|$)')
+
+
+def endpoint_template(endpoint: str) -> str:
+    """Endpoint name with ids replaced, e.g. ``movie/{id}/similar``"""
+    return ID_SEGMENT.sub('{id}', endpoint.strip('/'))
+
+
+def build_breaker() -> CircuitBreaker:
+    """The TMDb circuit, configured by ``TMDB_CLIENT['CIRCUIT_BREAKER']``"""
+    options = getattr(settings, 'TMDB_CLIENT', {}).get('CIRCUIT_BREAKER', {})
+    return CircuitBreaker(
+        'tmdb',
+        failure_threshold=options.get('FAILURE_THRESHOLD', 5),
+        failure_window=options.get('FAILURE_WINDOW', 30),
+        reset_timeout=options.get('RESET_TIMEOUT', 30),
+        probe_timeout=options.get('PROBE_TIMEOUT', 15),
+    )
+
+
+# Its state lives in the cache under its name, so reading it needs no TMDb client
+tmdb_breaker = SimpleLazyObject(build_breaker)
+
 
 class TMDbService:
     """Service class for interacting with The Movie Database (TMDb) API"""
@@ -16,22 +48,130 @@ class TMDbService:
         
         if not self.api_key:
             raise ValueError("TMDb API key not found in settings")
-    
+
+        options = getattr(settings, 'TMDB_CLIENT', {})
+        self.connect_timeout = options.get('CONNECT_TIMEOUT', 3.05)
+        self.read_timeout = options.get('READ_TIMEOUT', 10.0)
+        self.max_retries = options.get('MAX_RETRIES', 2)
+        self.retry_backoff = options.get('RETRY_BACKOFF', 0.25)
+        self.max_retry_after = options.get('MAX_RETRY_AFTER', 5.0)
+        self.pool_size = options.get('POOL_SIZE', 10)
+        self.breaker = tmdb_breaker
+        self._session = None
+        self._session_pid = None
+
+    @property
+    def session(self) -> requests.Session:
+        """Keep-alive session, one per worker process"""
+        if self._session is None or self._session_pid != os.getpid():
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            self._session, self._session_pid = session, os.getpid()
+        return self._session
+
+    def _timeout(self) -> Optional[tuple]:
+        """(connect, read) timeouts within the request budget; None when it is spent"""
+        remaining = upstream.remaining()
+        if remaining is None:
+            return self.connect_timeout, self.read_timeout
+        if remaining < 0.05:
+            return None
+        return min(self.connect_timeout, remaining), min(self.read_timeout, remaining)
+
+    def _retry_wait(self, response: Optional[requests.Response], attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying, or None when the retry isn't worth it"""
+        if attempt >= self.max_retries:
+            return None
+        if response is not None and response.status_code == 429:
+            wait = self._parse_retry_after(response.headers.get('Retry-After'))
+            if wait is None or wait > self.max_retry_after:
+                return None
+        else:
+            wait = self.retry_backoff * (2 ** attempt)
+
+        remaining = upstream.remaining()
+        if remaining is not None and wait >= remaining - 0.05:
+            return None
+        return wait
+
+    def _parse_retry_after(self, value: Optional[str]) -> Optional[float]:
+        if not value:
+            return self.retry_backoff
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
     def _make_request(self, endpoint: str, params: Dict = None) -> Optional[Dict]:
-        """Make a request to TMDb API with error handling"""
+        """Make a request to TMDb API with retries, timeouts and metrics"""
         if params is None:
             params = {}
         
         params['api_key'] = self.api_key
         url = f"{self.base_url}/{endpoint}"
+        name = f"tmdb:{endpoint_template(endpoint)}"
         
+        # While TMDb is failing, callers get None at once and use their fallbacks
+        if not self.breaker.allow():
+            metrics.registry.record(name, 'circuit_open', 1)
+            return None
+
+        start = time.perf_counter()
+        attempt = 0
         try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            while True:
+                timeout = self._timeout()
+                if timeout is None:
+                    logger.warning(f"TMDb request budget spent; skipping {endpoint}")
+                    metrics.registry.record(name, 'budget_exhausted', 1)
+                    if attempt:
+                        self.breaker.record_failure()
+                    return None
+
+                attempt_start = time.perf_counter()
+                response = None
+                try:
+                    response = self.session.get(url, params=params, timeout=timeout)
+                except requests.exceptions.RequestException as e:
+                    error = e
+                    metrics.registry.record(name, 'status_error', 1)
+                else:
+                    metrics.registry.record(name, f'status_{response.status_code}', 1)
+                    metrics.registry.record(name, 'bytes', len(response.content))
+                    if response.status_code != 429 and response.status_code < 500:
+                        # TMDb answered; a 4xx is our mistake, not an outage
+                        self.breaker.record_success()
+                        response.raise_for_status()
+                        return response.json()
+                    error = requests.exceptions.HTTPError(
+                        f"{response.status_code} Error for url: {endpoint}", response=response
+                    )
+                finally:
+                    metrics.registry.record(name, 'latency_ms', (time.perf_counter() - attempt_start) * 1000)
+
+                wait = self._retry_wait(response, attempt)
+                if wait is None:
+                    self.breaker.record_failure()
+                    raise error
+                if response is not None and response.status_code == 429:
+                    metrics.registry.record(name, 'rate_limit_wait_ms', wait * 1000)
+                time.sleep(wait)
+                attempt += 1
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.error(f"TMDb API request failed: {e}")
             return None
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            record_tmdb_call(elapsed_ms)
+            metrics.registry.record(name, 'total_ms', elapsed_ms)
+            metrics.registry.record(name, 'retries', attempt)
+            metrics.registry.maybe_flush()
     
     def get_popular_movies(self, page: int = 1) -> Optional[Dict]:
         """Get popular movies from TMDb"""
@@ -104,4 +244,5 @@ class TMDbService:
         return f"{self.image_base_url}{size}{backdrop_path}"
 
 
-tmdb_service = TMDbService()
\ No newline at end of file
+# Built on first use, so importing this module (schema builds, migrations) needs no API key
+tmdb_service = SimpleLazyObject(TMDbService)
\ No newline at end of file
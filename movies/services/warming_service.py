@@ -0,0 +1,212 @@
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextvars import ContextVar, copy_context
+from typing import Callable, Dict, List, Optional, Tuple
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+from django.db import close_old_connections
+import json
+import logging
+import threading
+import time
+
+from movie_backend import upstream
+from movie_backend.hotkeys import DecayedTopK
+
+logger = logging.getLogger(__name__)
+
+# CachedTMDbService getters whose calls are tracked and replayed to warm them
+TMDB_GETTERS = {
+    'get_popular_movies', 'get_trending_movies', 'get_top_rated_movies',
+    'get_movie_details', 'get_genres', 'search_movies',
+}
+MOVIE_PAYLOAD = 'movie_payload'
+PAYLOAD_CHUNK_SIZE = 50
+# Cacheable GET responses of the catalog views, by full path
+RESPONSE = 'response'
+
+# Always warmed, even before any access has been recorded
+SEED = [('get_trending_movies', 'week', 1), ('get_popular_movies', 1)]
+
+_warming: ContextVar[bool] = ContextVar('cache_warming', default=False)
+
+
+def _tmdb_getter(name: str) -> Callable:
+    def rebuild(*args):
+        from .cached_tmdb_service import cached_tmdb_service
+
+        getattr(cached_tmdb_service, name)(*args)
+    return rebuild
+
+
+def _rebuild_payloads(tmdb_ids: List[int]):
+    from .movie_service import movie_service
+
+    movie_service.get_many(tmdb_ids)
+
+
+def _rebuild_response(path: str):
+    """Run the view for a GET path and cache its compressed bodies
+
+    The resolved view is called directly, not through the middleware stack,
+    and the request is marked ``warm_up`` so the catalog throttle lets it
+    through: replays neither get throttled nor spend a client's budget. The
+    body is then compressed (and cached, see ``CompressionMiddleware``) in
+    every enabled encoding.
+    """
+    from django.test import RequestFactory
+    from django.urls import resolve
+    from movie_backend.middleware.compression import CompressionMiddleware
+
+    # No Accept-Encoding: the body comes back uncompressed, once
+    request = RequestFactory().get(path, SERVER_NAME='localhost')
+    request.warm_up = True
+    request.resolver_match = match = resolve(request.path_info)
+    response = match.func(request, *match.args, **match.kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    try:
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code}")
+        compression = CompressionMiddleware(lambda request: response)
+        if response.streaming or not compression.is_cacheable(request, response):
+            return
+        for encoding in compression.encodings:
+            compression.compressed_content(request, response, encoding, compression.levels[encoding])
+    finally:
+        response.close()
+
+
+# Spec prefix -> (rebuilder, batch size). A rebuilder is called with the
+# arguments of one spec, or with a list of first arguments when batched.
+_rebuilders: Dict[str, Tuple[Callable, Optional[int]]] = {
+    **{name: (_tmdb_getter(name), None) for name in TMDB_GETTERS},
+    MOVIE_PAYLOAD: (_rebuild_payloads, PAYLOAD_CHUNK_SIZE),
+    RESPONSE: (_rebuild_response, None),
+}
+
+
+def register_rebuilder(prefix: str, rebuilder: Callable, batch_size: Optional[int] = None):
+    """Warm specs recorded under ``prefix`` with ``rebuilder``"""
+    _rebuilders[prefix] = (rebuilder, batch_size)
+
+
+class WarmingService:
+    """Rebuild the most frequently accessed cache entries
+
+    Cached lookups are recorded as specs (a prefix and arguments, e.g. a
+    getter name and its arguments) in a decayed access-frequency sketch
+    shared by all workers (see ``movie_backend.hotkeys``). ``warm`` hands
+    the hottest specs to the rebuilder registered for their prefix and runs
+    them concurrently within a time budget. Rebuilders go through the same
+    cached paths as the views, so entries that are still cached cost one
+    cache read.
+    """
+
+    def __init__(self):
+        options = getattr(settings, 'CACHE_WARMING', {})
+        self.enabled = options.get('ENABLED', True)
+        self.top_n = options.get('TOP', 200)
+        self.concurrency = options.get('CONCURRENCY', 8)
+        self.budget = options.get('BUDGET', 30)
+        self.sketch = DecayedTopK(
+            'cache',
+            half_life=options.get('HALF_LIFE', 3600),
+            max_keys=options.get('MAX_KEYS', 10000),
+            flush_interval=options.get('FLUSH_INTERVAL', 5),
+        )
+
+    def record(self, *spec):
+        """Count one access of a cached lookup, e.g. ``record('get_popular_movies', 2)``"""
+        if not self.enabled or _warming.get():
+            return
+        try:
+            self.sketch.record(json.dumps(spec, separators=(',', ':')))
+        except Exception as e:
+            logger.error(f"Cache access recording error: {e}")
+
+    def hottest(self, n: int) -> List[Tuple[tuple, float]]:
+        """The n most accessed specs with their decayed access counts"""
+        specs = []
+        for member, score in self.sketch.top(n):
+            try:
+                spec = tuple(json.loads(member))
+            except ValueError:
+                continue
+            if spec and spec[0] in _rebuilders:
+                specs.append((spec, score))
+        return specs
+
+    def units(self, specs: List[tuple]) -> List[Tuple[str, Callable]]:
+        """One callable per spec, and one per batch of a batched prefix"""
+        units, batches = [], {}
+        for spec in specs:
+            rebuilder, batch_size = _rebuilders[spec[0]]
+            if batch_size:
+                batches.setdefault(spec[0], []).append(spec[1])
+            else:
+                units.append((':'.join(map(str, spec)), lambda rebuilder=rebuilder, args=spec[1:]: rebuilder(*args)))
+        # Batches are local database reads: cheap, so they go first
+        batch_units = []
+        for prefix, values in batches.items():
+            rebuilder, batch_size = _rebuilders[prefix]
+            for start in range(0, len(values), batch_size):
+                chunk = values[start:start + batch_size]
+                batch_units.append((f'{prefix}:{len(chunk)} keys', lambda rebuilder=rebuilder, chunk=chunk: rebuilder(chunk)))
+        return batch_units + units
+
+    @staticmethod
+    def _run(func: Callable, deadline: float, stop: threading.Event) -> bool:
+        # Checked before each unit, so no unit starts once the budget is spent
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or stop.is_set():
+            return False
+        _warming.set(True)
+        try:
+            # TMDb calls give up when the warm-up budget runs out
+            with upstream.budget(remaining):
+                func()
+            return True
+        finally:
+            close_old_connections()
+
+    def warm(self, top: int = None, concurrency: int = None, budget: float = None) -> dict:
+        """Rebuild the ``top`` hottest entries; returns counts of warmed, failed and skipped units"""
+        top = self.top_n if top is None else top
+        concurrency = self.concurrency if concurrency is None else concurrency
+        budget = self.budget if budget is None else budget
+        start = time.monotonic()
+        deadline = start + budget
+
+        specs = [spec for spec, _ in self.hottest(top)]
+        specs += [spec for spec in SEED if spec not in specs]
+        units = self.units(specs)
+
+        stats = {'units': len(units), 'warmed': 0, 'failed': 0, 'skipped': 0}
+        stop = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix='cache-warm')
+        try:
+            futures = {
+                executor.submit(copy_context().run, self._run, func, deadline, stop): label
+                for label, func in units
+            }
+            wait(futures, timeout=budget)
+        finally:
+            # Queued units are dropped; running ones finish their current unit
+            # (TMDb calls are cut off by the upstream budget) before we return
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+        for future, label in futures.items():
+            if future.cancelled():
+                stats['skipped'] += 1
+                continue
+            try:
+                stats['warmed' if future.result() else 'skipped'] += 1
+            except Exception as e:
+                logger.error(f"Cache warming error for {label}: {e}")
+                stats['failed'] += 1
+        stats['seconds'] = round(time.monotonic() - start, 3)
+        logger.info(f"Cache warming: {stats}")
+        return stats
+
+
+warming_service = SimpleLazyObject(WarmingService)
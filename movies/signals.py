@@ -0,0 +1,46 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Movie, UserFavorite
+from .services.cache_service import cache_service
+from .services.personalization_service import personalization_service
+
+
+@receiver(post_save, sender=UserFavorite)
+def favorite_saved(sender, instance, created, **kwargs):
+    """Update the user's caches once a new favorite is committed"""
+    if created:
+        transaction.on_commit(
+            lambda: personalization_service.favorite_added(instance.user_id, instance.movie_id)
+        )
+
+
+@receiver(post_delete, sender=UserFavorite)
+def favorite_deleted(sender, instance, **kwargs):
+    """Update the user's caches once a favorite removal is committed"""
+    transaction.on_commit(
+        lambda: personalization_service.favorite_removed(instance.user_id, instance.movie_id)
+    )
+
+
+@receiver(post_save, sender=Movie)
+@receiver(post_delete, sender=Movie)
+def movie_changed(sender, instance, **kwargs):
+    """Drop the movie's cached detail payload once the change is committed"""
+    transaction.on_commit(lambda: cache_service.invalidate_movie_payloads([instance.tmdb_id]))
+
+
+@receiver(m2m_changed, sender=Movie.genres.through)
+def movie_genres_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Drop cached detail payloads whose genre list changed"""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        tmdb_ids = [instance.tmdb_id]
+    elif pk_set:
+        tmdb_ids = list(Movie.objects.filter(pk__in=pk_set).values_list('tmdb_id', flat=True))
+    else:
+        # A genre was cleared from every movie; payloads expire with their TTL
+        return
+    transaction.on_commit(lambda: cache_service.invalidate_movie_payloads(tmdb_ids))
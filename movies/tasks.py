@@ -0,0 +1,95 @@
+"""
+Celery tasks for catalog ingestion and cache warming.
+
+Ingestion is split into small units that workers run in parallel: one task
+per TMDb list page (``ingest_category_page``) and one per chunk of movie
+ids (``ingest_details_chunk``). ``refresh_catalog`` and
+``refresh_movie_details`` fan them out as groups. The units themselves are
+plain functions in ``movies.ingestion``. Every unit is an upsert, so
+running one twice, or redelivering it after a worker died, leaves the same
+rows; a short cache lock also skips a unit while an identical one is
+already running.
+"""
+from typing import List
+from celery import group, shared_task
+from django.conf import settings
+import logging
+
+# The project's Celery app isn't loaded on Django startup; tasks are queued through it
+from movie_backend.celery import app as celery_app
+from .ingestion import FetchFailed, fetch_category_page, fetch_details_chunk, fetch_genres
+from .models import Movie
+from .services.cache_service import cache_service
+
+logger = logging.getLogger(__name__)
+
+
+def _options() -> dict:
+    return getattr(settings, 'INGESTION_TASKS', {})
+
+
+@shared_task
+def ingest_genres() -> int:
+    """Create missing genres; returns how many were created"""
+    return fetch_genres()
+
+
+@shared_task(bind=True, autoretry_for=(FetchFailed,), retry_backoff=True, max_retries=3)
+def ingest_category_page(self, category: str, page: int) -> int:
+    """Upsert one TMDb list page; returns how many movies were created"""
+    return fetch_category_page(category, page)
+
+
+@shared_task(bind=True, autoretry_for=(FetchFailed,), retry_backoff=True, max_retries=3)
+def ingest_details_chunk(self, tmdb_ids: List[int]) -> int:
+    """Fetch details for a chunk of movies and upsert them together; returns how many were updated
+
+    The movies that were fetched are saved even when others failed; the
+    chunk is then retried, which upserts them again unchanged.
+    """
+    return fetch_details_chunk(tmdb_ids)
+
+
+@shared_task
+def refresh_catalog(categories: List[str] = None, pages: int = None) -> str:
+    """Refresh genres, then ingest every category page in parallel; returns the group id"""
+    options = _options()
+    if categories is None:
+        categories = options.get('CATEGORIES', ['popular', 'top_rated', 'trending'])
+    if pages is None:
+        pages = options.get('PAGES', 5)
+    try:
+        ingest_genres()
+    except FetchFailed:
+        logger.warning("Genre refresh failed; linking existing genres only")
+    result = group(
+        ingest_category_page.s(category, page)
+        for category in categories
+        for page in range(1, pages + 1)
+    ).apply_async()
+    return result.id
+
+
+@shared_task
+def refresh_movie_details(limit: int = None, chunk_size: int = None, missing_only: bool = True) -> str:
+    """Ingest details for up to ``limit`` movies in parallel chunks; returns the group id"""
+    options = _options()
+    if limit is None:
+        limit = options.get('DETAILS_LIMIT', 200)
+    if chunk_size is None:
+        chunk_size = options.get('DETAILS_CHUNK_SIZE', 20)
+    movies = Movie.objects.all()
+    if missing_only:
+        movies = movies.filter(runtime__isnull=True)
+    tmdb_ids = list(movies.order_by('-popularity').values_list('tmdb_id', flat=True)[:limit])
+    result = group(
+        ingest_details_chunk.s(tmdb_ids[start:start + chunk_size])
+        for start in range(0, len(tmdb_ids), chunk_size)
+    ).apply_async()
+    return result.id
+
+
+@shared_task
+def warm_caches(top: int = None, concurrency: int = None, budget: float = None) -> dict:
+    """Rebuild the most accessed cache entries; returns the warming counts"""
+    return cache_service.warm_popular_caches(top, concurrency, budget)
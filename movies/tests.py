@@ -1,3 +1,1784 @@
-from django.test import TestCase
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.functional import empty
+
+import fakeredis
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError, ValidationError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from benchmarks.tmdb_stub import start_stub
+from movie_backend import compression, keyspace, metrics, paginators, schema, upstream
+from movie_backend.circuit_breaker import CircuitBreaker
+from movie_backend.db import router as db_router
+from movie_backend.concurrency import AdaptiveLimit, concurrency_limiter
+from movie_backend.middleware.compression import CompressionMiddleware
+from movie_backend.middleware.concurrency import AdaptiveConcurrencyMiddleware
+from movie_backend.middleware.db_routing import ReplicaRoutingMiddleware
+from movie_backend.middleware.upstream import UpstreamBudgetMiddleware
+from movie_backend.parsers import FastJSONParser
+from movie_backend.renderers import FastJSONRenderer
+from movie_backend.query_budget import iter_budgeted_patterns
+from movie_backend.throttling import CatalogRateThrottle
+from users.tokens import UserClaimsRefreshToken
+from .fast_serializers import movie_detail_serializer, movie_list_serializer
+from .models import Genre, Movie, UserFavorite
+from .serializers import MovieDetailSerializer, MovieListSerializer
+# The module, not its lazy singletons: test discovery would build them (and
+# the TMDb client needs an API key)
+from .services import personalization_service as personalization_module, tmdb_service as tmdb_module
+from .services import cache_service as cache_module, cached_tmdb_service as cached_tmdb_module
+from .services import export_service as export_module, movie_service as movie_module
+from .services.cache_service import CacheService, cache_service
+from .services.warming_service import _rebuilders, register_rebuilder, warming_service
+from . import ingestion
+from .ingestion import single_flight
+from .tasks import (
+    FetchFailed, ingest_category_page, ingest_details_chunk, ingest_genres, refresh_catalog, refresh_movie_details,
+)
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class TMDbStubMixin:
+    """Point the TMDb client at the benchmarks' local TMDb stub"""
+
+    stub_error_rate = 0.0
+
+    def setUp(self):
+        super().setUp()
+        self.stub = start_stub(error_rate=self.stub_error_rate)
+        self.addCleanup(self.stub.server_close)
+        self.addCleanup(self.stub.shutdown)
+        settings_override = override_settings(
+            TMDB_API_KEY='test', TMDB_BASE_URL=self.stub.base_url, CACHES=LOCMEM_CACHE,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        # Circuit state and cached payloads live in the cache; start each test clean
+        cache.clear()
+        # The client and its circuit are built on first use; rebuild them with
+        # the stub's settings
+        for lazy in (tmdb_module.tmdb_service, tmdb_module.tmdb_breaker):
+            lazy._wrapped = empty
+            self.addCleanup(setattr, lazy, '_wrapped', empty)
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+class IngestionTasksTests(TMDbStubMixin, TestCase):
+    def snapshot(self):
+        return (
+            sorted(Movie.objects.values_list('tmdb_id', 'title', 'runtime', 'status')),
+            sorted(Movie.genres.through.objects.values_list('movie__tmdb_id', 'genre__tmdb_id')),
+            Genre.objects.count(),
+        )
+
+    def test_refresh_is_idempotent(self):
+        refresh_catalog.delay(['popular', 'top_rated'], 2)
+        refresh_movie_details.delay(limit=30, chunk_size=10)
+        first = self.snapshot()
+        self.assertGreater(len(first[0]), 0)
+        self.assertEqual(Movie.objects.filter(runtime__isnull=False).count(), 30)
+
+        refresh_catalog.delay(['popular', 'top_rated'], 2)
+        refresh_movie_details.delay(limit=30, chunk_size=10, missing_only=False)
+        self.assertEqual(self.snapshot(), first)
+
+    def test_units_are_idempotent(self):
+        self.assertGreater(ingest_genres(), 0)
+        self.assertEqual(ingest_genres(), 0)
+        self.assertEqual(ingest_category_page('popular', 1), 20)
+        first = self.snapshot()
+        # The page again: nothing created, nothing changed
+        self.assertEqual(ingest_category_page('popular', 1), 0)
+        self.assertEqual(self.snapshot(), first)
+
+        tmdb_ids = [tmdb_id for tmdb_id, *_ in first[0]][:5]
+        self.assertEqual(ingest_details_chunk(tmdb_ids), 5)
+        detailed = self.snapshot()
+        self.assertEqual(ingest_details_chunk(tmdb_ids), 5)
+        self.assertEqual(self.snapshot(), detailed)
+        # A list page doesn't undo what the details set
+        ingest_category_page('popular', 1)
+        self.assertEqual(self.snapshot(), detailed)
+
+    def test_identical_unit_running_elsewhere_is_skipped(self):
+        with single_flight('ingest_category_page', 'popular', 1) as acquired:
+            self.assertTrue(acquired)
+            requests_before = self.stub.request_count
+            self.assertEqual(ingest_category_page('popular', 1), 0)
+            self.assertEqual(self.stub.request_count, requests_before)
+        self.assertEqual(ingest_category_page('popular', 1), 20)
+
+    def test_unknown_category(self):
+        with self.assertRaises(ValueError):
+            ingest_category_page('classics', 1)
+
+
+# Eager retries only run when errors are not propagated. The circuit stays
+# closed, so every attempt reaches the stub.
+@override_settings(
+    CELERY_TASK_ALWAYS_EAGER=True,
+    CELERY_TASK_EAGER_PROPAGATES=False,
+    TMDB_CLIENT={'MAX_RETRIES': 0, 'CIRCUIT_BREAKER': {'FAILURE_THRESHOLD': 1000}},
+)
+class IngestionRetryTests(TMDbStubMixin, TestCase):
+    stub_error_rate = 1.0
+
+    def test_failed_page_is_retried_then_fails(self):
+        result = ingest_category_page.delay('popular', 1)
+        self.assertTrue(result.failed())
+        self.assertIsInstance(result.result, FetchFailed)
+        # The first attempt and 3 retries
+        self.assertEqual(self.stub.request_count, 4)
+        self.assertFalse(Movie.objects.exists())
+
+    def test_failed_chunk_is_retried_then_fails(self):
+        result = ingest_details_chunk.delay([1, 2])
+        self.assertTrue(result.failed())
+        self.assertIsInstance(result.result, FetchFailed)
+        self.assertEqual(self.stub.request_count, 4 * 2)
+
+    def test_page_succeeds_on_retry(self):
+        get_popular_movies = tmdb_module.TMDbService.get_popular_movies
+        calls = []
+
+        def flaky(service, page=1):
+            calls.append(page)
+            if len(calls) == 1:
+                return None
+            return get_popular_movies(service, page)
+
+        self.stub.error_rate = 0.0
+        with mock.patch.object(tmdb_module.TMDbService, 'get_popular_movies', flaky):
+            result = ingest_category_page.delay('popular', 1)
+        self.assertTrue(result.successful())
+        self.assertEqual(result.result, 20)
+        self.assertEqual(len(calls), 2)
+
+    def test_partial_chunk_saves_fetched_movies_and_retries(self):
+        ingest_movies = ingestion.ingest_movies
+        get_movie_details = tmdb_module.TMDbService.get_movie_details
+        saved = []
+
+        def first_attempt_misses_2(service, tmdb_id):
+            if tmdb_id == 2 and not saved:
+                return None
+            return get_movie_details(service, tmdb_id)
+
+        def record(payloads, details=False):
+            saved.append(sorted(payload['id'] for payload in payloads))
+            return ingest_movies(payloads, details)
+
+        self.stub.error_rate = 0.0
+        with mock.patch.object(tmdb_module.TMDbService, 'get_movie_details', first_attempt_misses_2), \
+                mock.patch.object(ingestion, 'ingest_movies', record):
+            result = ingest_details_chunk.delay([1, 2, 3])
+        self.assertTrue(result.successful())
+        # Movies 1 and 3 were saved before the retry, which saved all three
+        self.assertEqual(saved, [[1, 3], [1, 2, 3]])
+        self.assertEqual(Movie.objects.filter(runtime__isnull=False).count(), 3)
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True, QUERY_BUDGETS={**settings.QUERY_BUDGETS, 'MODE': 'raise'})
+class QueryBudgetTests(TMDbStubMixin, TransactionTestCase):
+    """Every named route of the budgeted URLconfs stays within its query budget
+
+    The middleware raises ``QueryBudgetExceeded`` on an overrun, which the
+    test client re-raises. Catalog requests run twice: cold and warm caches.
+    A TransactionTestCase, so ``atomic()`` blocks run as they do in a request
+    rather than as savepoints of the test's transaction.
+    """
+
+    def setUp(self):
+        super().setUp()
+        refresh_catalog(['popular', 'top_rated'], 1)
+        self.tmdb_ids = list(Movie.objects.order_by('tmdb_id').values_list('tmdb_id', flat=True)[:12])
+        self.user = User.objects.create_user('budget', 'budget@example.com', 'Old-pass-123')
+        self.admin = User.objects.create_superuser('budget-admin', 'admin@example.com', 'Admin-pass-123')
+        self.seen = set()
+
+    def request(self, name, method='get', user=None, kwargs=None, query='', data=None, status=None):
+        self.seen.add(name)
+        url = reverse(name, kwargs=kwargs) + (f'?{query}' if query else '')
+        client = APIClient()
+        if user is not None:
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {UserClaimsRefreshToken.for_user(user).access_token}')
+        response = getattr(client, method)(url, data, format='json')
+        if response.streaming:
+            b''.join(response.streaming_content)
+        if status is not None:
+            self.assertEqual(response.status_code, status, f'{method.upper()} {url}')
+        return response
+
+    def test_every_route_within_budget(self):
+        other_ids = list(Movie.objects.filter(tmdb_id__in=self.tmdb_ids[1:]).values_list('id', flat=True))
+        cold_movie_id = Movie.objects.exclude(tmdb_id__in=self.tmdb_ids).values_list('id', flat=True).first()
+
+        for _ in range(2):
+            self.request('movie-list', status=200)
+            self.request('movie-list', query='genre=drama&search=the', status=200)
+            self.request('movie-detail', kwargs={'tmdb_id': self.tmdb_ids[0]}, status=200)
+            self.request('movie-batch', query='ids=' + ','.join(map(str, self.tmdb_ids)), status=200)
+            self.request('trending-movies', status=200)
+            self.request('recommended-movies', status=200)
+            self.request('movie-search', query='q=the', status=200)
+            self.request('movie-search', query='genre=drama&year=2020', status=200)
+            self.request('genre-list', status=200)
+            self.request('movie-export', user=self.admin, kwargs={'fmt': 'ndjson'}, status=200)
+            self.request('cache-stats', user=self.admin)
+            self.request('cache-analytics', user=self.admin, status=200)
+            self.request('performance-metrics', user=self.admin, status=200)
+
+        # Favorites. Recommendations are built first, so later changes update
+        # them in place; the new favorite's movie payload is not cached yet.
+        self.request('bulk-favorites', 'post', self.user, data={'add': other_ids[:3], 'remove': []}, status=200)
+        self.request('personalized-recommendations', user=self.user, status=200)
+        self.request('user-favorites', 'post', self.user, data={'movie_id': cold_movie_id}, status=201)
+        self.request('user-favorites', 'post', self.user, data={'movie_id': cold_movie_id}, status=200)
+        self.request('bulk-favorites', 'post', self.user, data={'add': other_ids[3:5], 'remove': other_ids[:2]}, status=200)
+        for _ in range(2):
+            self.request('user-favorites', user=self.user, status=200)
+            self.request('personalized-recommendations', user=self.user, status=200)
+            self.request('user-stats', user=self.user, status=200)
+            self.request('user-profile', user=self.user, status=200)
+        self.request('delete-favorite', 'delete', self.user, kwargs={'movie_id': cold_movie_id}, status=204)
+        self.request('user-profile', 'patch', self.user, data={'first_name': 'Budget'}, status=200)
+
+        # Accounts
+        self.request('user-register', 'post', data={
+            'username': 'newcomer', 'email': 'newcomer@example.com',
+            'password': 'New-pass-123', 'password_confirm': 'New-pass-123',
+        }, status=201)
+        tokens = self.request('user-login', 'post', data={'username': 'budget', 'password': 'Old-pass-123'}, status=200).json()['tokens']
+        self.request('change-password', 'post', self.user, data={
+            'old_password': 'Old-pass-123', 'new_password': 'New-pass-456', 'new_password_confirm': 'New-pass-456',
+        }, status=200)
+        refreshed = self.request('token-refresh', 'post', data={'refresh': tokens['refresh']}, status=200).json()
+        self.request('user-logout', 'post', self.user, data={'refresh_token': refreshed.get('refresh', tokens['refresh'])}, status=200)
+
+        self.request('cache-analytics', 'delete', self.admin, status=200)
+        self.request('performance-metrics', 'delete', self.admin, status=200)
+        self.request('clear-cache', 'post', self.admin, status=200)
+
+        names = {pattern.name for _, _, pattern in iter_budgeted_patterns() if pattern.name}
+        self.assertEqual(names - self.seen, set())
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class FavoriteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('fan', 'fan@example.com', 'Fan-pass-123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.movies = [Movie.objects.create(tmdb_id=100 + i, title=f'Movie {i}') for i in range(3)]
+        self.unknown_id = max(movie.id for movie in self.movies) + 1
+
+    def favorite_ids(self):
+        return set(UserFavorite.objects.filter(user=self.user).values_list('movie_id', flat=True))
+
+    def test_add_favorites_reports_which_rows_it_created(self):
+        first, second = self.movies[:2]
+        saved = UserFavorite.objects.add_favorites(self.user.id, [first.id])
+        self.assertEqual([(f.movie_id, f.tmdb_id, f.created) for f in saved], [(first.id, 100, True)])
+
+        saved = UserFavorite.objects.add_favorites(self.user.id, [first.id, second.id, self.unknown_id])
+        self.assertEqual(
+            sorted((f.movie_id, f.created) for f in saved), [(first.id, False), (second.id, True)],
+        )
+
+    def test_adding_is_idempotent(self):
+        url = reverse('user-favorites')
+        created = self.client.post(url, {'movie_id': self.movies[0].id}, format='json')
+        self.assertEqual(created.status_code, 201)
+        self.assertEqual(created.json()['movie']['tmdb_id'], 100)
+
+        repeated = self.client.post(url, {'movie_id': self.movies[0].id}, format='json')
+        self.assertEqual(repeated.status_code, 200)
+        self.assertEqual(repeated.json()['id'], created.json()['id'])
+        self.assertEqual(repeated.json()['created_at'], created.json()['created_at'])
+        self.assertEqual(self.favorite_ids(), {self.movies[0].id})
+
+    def test_adding_an_unknown_movie(self):
+        response = self.client.post(reverse('user-favorites'), {'movie_id': self.unknown_id}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.favorite_ids(), set())
+
+    def test_movie_deleted_since_the_upsert(self):
+        with mock.patch('movies.views.movie_service') as movie_service:
+            movie_service.get.return_value = None
+            response = self.client.post(reverse('user-favorites'), {'movie_id': self.movies[0].id}, format='json')
+        self.assertEqual(response.status_code, 404)
+
+    def test_bulk_sync(self):
+        first, second, third = (movie.id for movie in self.movies)
+        url = reverse('bulk-favorites')
+        response = self.client.post(url, {'add': [first, second, self.unknown_id]}, format='json')
+        self.assertEqual(response.json(), {'added': [first, second], 'removed': [], 'missing': [self.unknown_id]})
+
+        response = self.client.post(url, {'add': [first, third], 'remove': [second, self.unknown_id]}, format='json')
+        self.assertEqual(response.json(), {'added': [third], 'removed': [second], 'missing': []})
+        self.assertEqual(self.favorite_ids(), {first, third})
+
+        self.assertEqual(self.client.post(url, {}, format='json').status_code, 400)
+
+    def test_removal(self):
+        first, second = (movie.id for movie in self.movies[:2])
+        UserFavorite.objects.add_favorites(self.user.id, [first])
+        self.assertEqual(UserFavorite.objects.remove_favorites(self.user.id, [first, second]), [first])
+
+        UserFavorite.objects.add_favorites(self.user.id, [first])
+        url = reverse('delete-favorite', kwargs={'movie_id': first})
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(self.client.delete(url).status_code, 404)
+        self.assertEqual(self.favorite_ids(), set())
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class IncrementalRecommendationTests(TestCase):
+    """Cached recommendations are updated in place as favorites change"""
+
+    def setUp(self):
+        cache.clear()
+        personalization_module.personalization_service._wrapped = empty
+        self.addCleanup(setattr, personalization_module.personalization_service, '_wrapped', empty)
+        self.service = personalization_module.personalization_service
+
+        genres = [Genre.objects.create(tmdb_id=i, name=f'Genre {i}') for i in range(4)]
+        self.movies = []
+        for i in range(16):
+            movie = Movie.objects.create(tmdb_id=200 + i, title=f'Movie {i}', popularity=i, vote_average=i % 7)
+            movie.genres.set(genres[j] for j in range(4) if (i >> j) & 1)
+            self.movies.append(movie)
+        self.user = User.objects.create_user('viewer', 'viewer@example.com', 'View-pass-123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def state(self):
+        return cache_service.get(cache_service.get_user_recommendations_key(self.user.id))
+
+    def assertMatchesFullRecompute(self):
+        favorite_ids = list(UserFavorite.objects.filter(user=self.user).values_list('movie_id', flat=True))
+        state = self.state()
+        self.assertIsNotNone(state, 'the update dropped the cached scores')
+        expected = self.service._compute_state(favorite_ids)
+        self.assertEqual(state['scores'].keys(), expected['scores'].keys())
+        for movie_id, score in expected['scores'].items():
+            self.assertAlmostEqual(state['scores'][movie_id], score)
+
+        results = self.service.get_recommendations(self.user.id)
+        cache.clear()
+        self.assertEqual(results, self.service.get_recommendations(self.user.id))
+
+    def change(self, method, url, data=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = getattr(self.client, method)(url, data, format='json')
+        self.assertLess(response.status_code, 300)
+
+    def test_repeat_reads_are_served_from_cache(self):
+        UserFavorite.objects.add_favorites(self.user.id, [self.movies[3].id])
+        self.service.get_recommendations(self.user.id)
+        with self.assertNumQueries(0):
+            self.service.get_recommendations(self.user.id)
+
+    def test_add_and_remove_match_a_full_recompute(self):
+        self.change('post', reverse('user-favorites'), {'movie_id': self.movies[3].id})
+        self.service.get_recommendations(self.user.id)
+
+        self.change('post', reverse('user-favorites'), {'movie_id': self.movies[12].id})
+        self.assertMatchesFullRecompute()
+
+        self.change('post', reverse('bulk-favorites'), {'add': [self.movies[5].id], 'remove': [self.movies[3].id]})
+        self.assertMatchesFullRecompute()
+
+        self.change('delete', reverse('delete-favorite', kwargs={'movie_id': self.movies[12].id}))
+        self.assertMatchesFullRecompute()
+        with self.assertNumQueries(0):
+            self.service.get_recommendations(self.user.id)
+
+    def test_large_syncs_invalidate(self):
+        self.service.get_recommendations(self.user.id)
+        limit = self.service.incremental_batch_limit
+        self.change('post', reverse('bulk-favorites'), {'add': [movie.id for movie in self.movies[:limit + 1]]})
+        self.assertIsNone(self.state())
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+class CacheWarmingTests(TMDbStubMixin, TransactionTestCase):
+    # Warming runs on other threads, which must see committed rows
+    def setUp(self):
+        super().setUp()
+        refresh_catalog(['popular'], 1)
+        warming_service.sketch.reset()
+        self.addCleanup(warming_service.sketch.reset)
+
+    def compressed_keys(self):
+        return [key for key in cache._cache if ':compressed:' in key]
+
+    def test_catalog_responses_are_warmed(self):
+        APIClient().get(reverse('movie-list'), HTTP_ACCEPT_ENCODING='gzip')
+        APIClient().get(reverse('movie-search'), {'q': 'the'})
+        hottest = dict(warming_service.hottest(10))
+        self.assertIn(('response', reverse('movie-list')), hottest)
+        self.assertIn(('response', reverse('movie-search') + '?q=the'), hottest)
+
+        cache.clear()
+        stats = warming_service.warm(budget=10)
+        self.assertEqual(stats['failed'], 0)
+        self.assertTrue(self.compressed_keys())
+        # Requests made while warming are not counted
+        after = dict(warming_service.hottest(10))
+        for spec, score in hottest.items():
+            self.assertAlmostEqual(after[spec], score, places=2)
+
+    def test_replays_are_not_throttled(self):
+        throttle = {**settings.CATALOG_THROTTLE, 'ENABLED': True, 'RATES': {'anon': '30/min', 'user': '30/min'}}
+        with self.settings(CATALOG_THROTTLE=throttle):
+            for page in range(60):
+                warming_service.record('response', f"{reverse('movie-search')}?q=the&page={page}")
+            stats = warming_service.warm(top=100, budget=20)
+            self.assertEqual(stats['failed'], 0)
+            self.assertGreaterEqual(stats['warmed'], 60)
+            # Nor did they spend the anonymous budget of localhost
+            response = APIClient().get(reverse('movie-search'), {'q': 'the'}, REMOTE_ADDR='127.0.0.1')
+            self.assertEqual(response.status_code, 200)
+
+    def test_warming_stops_at_the_budget(self):
+        started = []
+
+        def slow(key):
+            started.append(key)
+            time.sleep(0.2)
+
+        register_rebuilder('slow', slow)
+        self.addCleanup(_rebuilders.pop, 'slow')
+        for key in range(20):
+            warming_service.record('slow', key)
+        stats = warming_service.warm(concurrency=2, budget=0.3)
+        finished = len(started)
+        time.sleep(0.3)
+        # Nothing runs after warm() returns, and nothing started past the budget
+        self.assertEqual(len(started), finished)
+        self.assertLessEqual(finished, 4)
+        self.assertGreaterEqual(stats['skipped'], 20 - finished)
+
+
+class ThrottleIdentTests(TestCase):
+    def ident(self):
+        request = RequestFactory().get('/', HTTP_X_FORWARDED_FOR='10.0.0.1, 203.0.113.7', REMOTE_ADDR='10.1.1.1')
+        return CatalogRateThrottle().get_ident(request)
+
+    def test_client_ip_is_the_proxys_last_hop(self):
+        with self.settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1}):
+            # The client controls everything before the hop the proxy appended
+            self.assertEqual(self.ident(), '203.0.113.7')
+
+    def test_forwarded_header_is_ignored_without_a_proxy(self):
+        with self.settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'NUM_PROXIES': 0}):
+            self.assertEqual(self.ident(), '10.1.1.1')
+
+    def test_no_proxy_by_default_off_render(self):
+        self.assertEqual(settings.REST_FRAMEWORK['NUM_PROXIES'], 1 if settings.RENDER else 0)
+
+
+class AdaptiveLimitTests(SimpleTestCase):
+    def limit(self, **kwargs):
+        # Every release closes a window, and the limit moves straight to its target
+        return AdaptiveLimit('test', **{'window_seconds': 0, 'min_samples': 1, 'smoothing': 1.0, **kwargs})
+
+    def run_window(self, limit, inflight, latency_ms):
+        for _ in range(inflight):
+            self.assertTrue(limit.try_acquire())
+        for _ in range(inflight):
+            limit.release(latency_ms)
+
+    def test_grows_while_latency_holds_and_the_limit_is_used(self):
+        limit = self.limit(initial_limit=9, min_samples=9)
+        self.run_window(limit, 9, 10)
+        self.assertEqual(limit.baseline_ms, 10)
+        self.assertAlmostEqual(limit.limit, 9 + 3)
+
+    def test_does_not_grow_while_underused(self):
+        limit = self.limit(initial_limit=10)
+        self.run_window(limit, 1, 10)
+        self.assertEqual(limit.limit, 10)
+
+    def test_shrinks_when_latency_rises_past_tolerance(self):
+        limit = self.limit(initial_limit=16, tolerance=2.0)
+        self.run_window(limit, 16, 10)
+        grown = limit.limit
+        limit.try_acquire()
+        limit.release(1000)
+        # Cut by at most half per window, plus the usual square root
+        self.assertAlmostEqual(limit.limit, grown * 0.5 + grown ** 0.5)
+        self.assertTrue(limit.congested())
+
+    def test_server_errors_back_off_multiplicatively(self):
+        limit = self.limit(initial_limit=10, min_limit=8, backoff=0.9)
+        for expected in (9, 8.1, 8):
+            limit.try_acquire()
+            limit.release(10, failed=True)
+            self.assertAlmostEqual(limit.limit, expected)
+
+    def test_bounds(self):
+        limit = self.limit(initial_limit=10, max_limit=11)
+        self.run_window(limit, 10, 10)
+        self.assertEqual(limit.limit, 11)
+
+    def test_sheds_at_the_limit(self):
+        limit = self.limit(initial_limit=2, congestion_seconds=60)
+        self.assertTrue(limit.try_acquire())
+        self.assertTrue(limit.try_acquire())
+        self.assertFalse(limit.try_acquire())
+        self.assertEqual((limit.inflight, limit.shed), (2, 1))
+        self.assertTrue(limit.congested())
+
+
+CONCURRENCY = {
+    'ENABLED': True,
+    'CLASSES': {
+        'read': {'PRIORITY': 0, 'INITIAL_LIMIT': 1, 'MIN_LIMIT': 1},
+        'search': {'PRIORITY': 1, 'INITIAL_LIMIT': 4, 'MIN_LIMIT': 1},
+    },
+    'VIEWS': {'probe': 'read', 'probe:q': 'search'},
+    'CONGESTION_SECONDS': 60,
+    'RETRY_AFTER': 1,
+}
+
+
+@override_settings(ADAPTIVE_CONCURRENCY=CONCURRENCY)
+class ConcurrencyMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(concurrency_limiter, 'options', CONCURRENCY)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Rebuild the class limits from CONCURRENCY, and back afterwards
+        concurrency_limiter._pid = None
+        self.addCleanup(setattr, concurrency_limiter, '_pid', None)
+        self.limits = concurrency_limiter.limits()
+
+    def call(self, response, query=''):
+        request = RequestFactory().get('/probe/' + query)
+        request.resolver_match = SimpleNamespace(url_name='probe')
+
+        def get_response(request):
+            return middleware.process_view(request, None, (), {}) or response
+
+        middleware = AdaptiveConcurrencyMiddleware(get_response)
+        return middleware(request)
+
+    def test_slot_is_released_after_a_response(self):
+        self.assertEqual(self.call(HttpResponse('ok')).status_code, 200)
+        self.assertEqual(self.call(HttpResponse('ok')).status_code, 200)
+        self.assertEqual(self.limits['read'].inflight, 0)
+
+    def test_query_parameter_selects_the_class(self):
+        self.call(StreamingHttpResponse(iter([b'a'])), '?q=x')
+        self.assertEqual((self.limits['read'].inflight, self.limits['search'].inflight), (0, 1))
+
+    def test_streaming_response_holds_its_slot_until_consumed(self):
+        response = self.call(StreamingHttpResponse(iter([b'a', b'b'])))
+        self.assertEqual(self.limits['read'].inflight, 1)
+
+        shed = self.call(HttpResponse('ok'))
+        self.assertEqual(shed.status_code, 503)
+        self.assertEqual(shed['Retry-After'], '1')
+
+        self.assertEqual(b''.join(response.streaming_content), b'ab')
+        self.assertEqual(self.limits['read'].inflight, 0)
+        response.close()
+        self.assertEqual(self.limits['read'].inflight, 0)
+
+    def test_unread_streaming_response_releases_on_close(self):
+        response = self.call(StreamingHttpResponse(iter([b'a'])))
+        response.close()
+        self.assertEqual(self.limits['read'].inflight, 0)
+        self.assertEqual(self.call(HttpResponse('ok')).status_code, 200)
+
+    def test_congested_class_holds_lower_priorities_to_their_minimum(self):
+        self.call(StreamingHttpResponse(iter([b'a'])))
+        self.assertEqual(self.call(HttpResponse('ok')).status_code, 503)
+        self.assertTrue(self.limits['read'].congested())
+
+        self.call(StreamingHttpResponse(iter([b'a'])), '?q=x')
+        self.assertEqual(self.call(HttpResponse('ok'), '?q=x').status_code, 503)
+
+
+class SchemaFileTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.content = {}
+        for name, filename in schema.SCHEMA_FILES.items():
+            self.content[name] = f'{{"schema": "{name}"}}'.encode()
+            with open(os.path.join(directory.name, filename), 'wb') as f:
+                f.write(self.content[name])
+        settings_override = override_settings(API_SCHEMA_DIR=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        schema._loaded.clear()
+        self.addCleanup(schema._loaded.clear)
+
+    def test_prebuilt_files_are_served_with_an_etag(self):
+        for name in ('schema', 'schema-json'):
+            response = self.client.get(reverse(name), HTTP_ACCEPT_ENCODING='identity')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content, self.content['openapi' if name == 'schema' else 'swagger'])
+            self.assertTrue(response.has_header('ETag'))
+
+            cached = self.client.get(reverse(name), HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(cached.status_code, 304)
+
+    def test_urlconf_does_not_import_the_schema_generators(self):
+        code = (
+            "import sys, django; django.setup();"
+            "from django.urls import resolve; resolve('/api/docs/'); resolve('/swagger/');"
+            "loaded = [m for m in ('drf_spectacular.views', 'drf_spectacular.generators', 'drf_yasg') if m in sys.modules];"
+            "print(loaded); sys.exit(1 if loaded else 0)"
+        )
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, env=os.environ)
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+
+
+ADAPTIVE_TTL = {
+    'GROWTH': 1.5, 'SHRINK': 0.5, 'MIN_FACTOR': 0.25, 'MAX_FACTOR': 8,
+    'BOUNDS': {'SEARCH_RESULTS': (300, 3600)}, 'JITTER': 0,
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHE, ADAPTIVE_TTL=ADAPTIVE_TTL)
+class AdaptiveTTLTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.service = CacheService()
+
+    def refresh(self, value, ttl_name='MOVIE_DETAILS', base_ttl=100):
+        return self.service.adaptive_ttl('key', value, ttl_name, base_ttl)
+
+    def test_unchanged_payloads_grow_up_to_the_upper_bound(self):
+        ttls = [self.refresh({'a': 1}) for _ in range(8)]
+        self.assertEqual(ttls, [100, 150, 225, 337, 506, 759, 800, 800])
+
+    def test_changed_payloads_shrink_down_to_the_lower_bound(self):
+        for _ in range(3):
+            self.refresh({'a': 1})
+        ttls = [self.refresh({'a': version}) for version in range(2, 7)]
+        self.assertEqual(ttls, [112, 56, 28, 25, 25])
+
+    def test_category_bounds_in_seconds(self):
+        self.assertEqual(self.refresh([1], 'SEARCH_RESULTS', 100), 300)
+        self.assertEqual(self.refresh([2], 'SEARCH_RESULTS', 100), 300)
+        for _ in range(10):
+            ttl = self.refresh([2], 'SEARCH_RESULTS', 100)
+        self.assertEqual(ttl, 3600)
+
+    def test_key_order_does_not_count_as_a_change(self):
+        self.refresh({'a': 1, 'b': [1, 2]})
+        self.assertEqual(self.refresh({'b': [1, 2], 'a': 1}), 150)
+        with mock.patch.object(cache_module, 'orjson', None):
+            self.assertEqual(
+                CacheService.content_hash({'a': 1, 'b': 2}), CacheService.content_hash({'b': 2, 'a': 1}),
+            )
+
+    def test_jitter_only_shortens(self):
+        with self.settings(ADAPTIVE_TTL={**ADAPTIVE_TTL, 'JITTER': 0.1}):
+            service = CacheService()
+            ttls = {service.jittered(1000) for _ in range(200)}
+        self.assertGreater(len(ttls), 1)
+        self.assertTrue(all(900 <= ttl <= 1000 for ttl in ttls), ttls)
+
+    def test_disabled(self):
+        with self.settings(ADAPTIVE_TTL={**ADAPTIVE_TTL, 'ENABLED': False}):
+            service = CacheService()
+            self.assertEqual([service.adaptive_ttl('key', {'a': 1}, 'MOVIE_DETAILS', 100) for _ in range(3)], [100] * 3)
+
+
+class HistogramTests(SimpleTestCase):
+    def test_buckets_bound_the_relative_error(self):
+        for value in [0.001, 0.02, 0.5, 1, 3.7, 12.5, 99, 250, 1234.5, 60000]:
+            midpoint = metrics._bucket_midpoint(metrics._bucket_index(value))
+            self.assertLessEqual(abs(midpoint - value) / value, 1 / metrics.SUB_BUCKETS, value)
+
+    def test_small_values_are_exact(self):
+        for n in range(2 * metrics.SUB_BUCKETS):
+            self.assertEqual(metrics._bucket_midpoint(metrics._bucket_index(n / metrics.SCALE)), n / metrics.SCALE)
+
+    def test_buckets_are_ordered(self):
+        indexes = [metrics._bucket_index(n / 10) for n in range(100000)]
+        self.assertEqual(indexes, sorted(indexes))
+
+    def test_percentiles(self):
+        histogram = metrics.Histogram()
+        for value in range(1, 1001):
+            histogram.record(value)
+        summary = histogram.summary()
+        self.assertEqual((summary['count'], summary['mean']), (1000, 500.5))
+        for q in (50, 95, 99):
+            self.assertAlmostEqual(summary[f'p{q}'], q * 10, delta=q * 10 / metrics.SUB_BUCKETS)
+        self.assertEqual(metrics.Histogram().percentile(50), 0.0)
+
+
+class MetricsFlushTests(SimpleTestCase):
+    def setUp(self):
+        self.redis = fakeredis.FakeRedis()
+        patcher = mock.patch.object(metrics, 'get_redis_client', return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_workers_add_up_in_redis(self):
+        workers = [metrics.MetricsRegistry() for _ in range(2)]
+        for worker, values in zip(workers, ([1, 2, 3], [100, 200])):
+            for value in values:
+                worker.record('movie-list', 'wall_ms', value)
+            worker.record('movie-detail', 'db_queries', 2)
+            worker.flush()
+        # Flushing again sends nothing twice
+        workers[0].flush()
+
+        merged = metrics.MetricsRegistry().histograms()
+        self.assertEqual(set(merged), {('movie-list', 'wall_ms'), ('movie-detail', 'db_queries')})
+        wall = merged[('movie-list', 'wall_ms')]
+        self.assertEqual((wall.count, wall.total), (5, 306))
+        self.assertAlmostEqual(wall.percentile(100), 200, delta=200 / metrics.SUB_BUCKETS)
+        self.assertEqual(metrics.MetricsRegistry().snapshot('movie-detail')['movie-detail']['db_queries']['count'], 2)
+
+    def test_flush_is_rate_limited(self):
+        registry = metrics.MetricsRegistry()
+        registry.flush_interval = 60
+        registry.record('movie-list', 'wall_ms', 1)
+        registry.maybe_flush()
+        self.assertEqual(metrics.MetricsRegistry().histograms(), {})
+        registry.flush_interval = 0
+        registry.maybe_flush()
+        self.assertEqual(metrics.MetricsRegistry().histograms()[('movie-list', 'wall_ms')].count, 1)
+
+    def test_reset(self):
+        registry = metrics.MetricsRegistry()
+        registry.record('movie-list', 'wall_ms', 1)
+        registry.flush()
+        registry.reset()
+        self.assertEqual(registry.histograms(), {})
+        self.assertEqual(self.redis.keys('*'), [])
+
+    def test_without_redis_histograms_stay_in_process(self):
+        registry = metrics.MetricsRegistry()
+        with mock.patch.object(metrics, 'get_redis_client', return_value=None):
+            registry.record('movie-list', 'wall_ms', 5)
+            registry.flush()
+            self.assertEqual(registry.histograms()[('movie-list', 'wall_ms')].count, 1)
+        self.assertEqual(self.redis.keys('*'), [])
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.registry = metrics.MetricsRegistry()
+        self.registry.flush_interval = 3600
+        patcher = mock.patch.object(metrics, 'registry', self.registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_api_requests_are_recorded_per_endpoint(self):
+        Genre.objects.create(tmdb_id=1, name='Drama')
+        self.client.get(reverse('genre-list'))
+        self.client.get(reverse('genre-list'))
+        pending = self.registry._pending
+        self.assertEqual(pending[('genre-list', 'wall_ms')].count, 2)
+        self.assertGreaterEqual(pending[('genre-list', 'db_queries')].total, 1)
+        self.assertIn(('genre-list', 'db_ms'), pending)
+
+    def test_other_paths_are_not_recorded(self):
+        self.client.get('/admin/login/')
+        self.assertEqual(dict(self.registry._pending), {})
+
+
+@override_settings(TMDB_CLIENT={
+    **settings.TMDB_CLIENT, 'MAX_RETRIES': 2, 'RETRY_BACKOFF': 0, 'CIRCUIT_BREAKER': {'FAILURE_THRESHOLD': 1000},
+})
+class TMDbClientTests(TMDbStubMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.registry = metrics.MetricsRegistry()
+        patcher = mock.patch.object(metrics, 'registry', self.registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.service = tmdb_module.tmdb_service
+
+    def recorded(self, name, metric):
+        return self.registry._pending[(f'tmdb:{name}', metric)]
+
+    def test_endpoint_template(self):
+        self.assertEqual(tmdb_module.endpoint_template('/movie/603/similar'), 'movie/{id}/similar')
+        self.assertEqual(tmdb_module.endpoint_template('trending/movie/week'), 'trending/movie/week')
+
+    def test_calls_are_recorded_per_endpoint_and_request(self):
+        collector = metrics.RequestMetrics()
+        token = metrics.current_request.set(collector)
+        try:
+            self.assertEqual(self.service.get_movie_details(603)['id'], 603)
+            self.service.get_movie_details(604)
+        finally:
+            metrics.current_request.reset(token)
+        self.assertEqual(self.recorded('movie/{id}', 'status_200').count, 2)
+        self.assertEqual(self.recorded('movie/{id}', 'retries').total, 0)
+        self.assertEqual(self.recorded('movie/{id}', 'latency_ms').count, 2)
+        self.assertEqual(collector.tmdb_calls, 2)
+        self.assertGreater(collector.tmdb_ms, 0)
+
+    def test_server_errors_are_retried(self):
+        self.stub.error_rate = 1.0
+        self.assertIsNone(self.service.get_genres())
+        self.assertEqual(self.stub.request_count, 3)
+        self.assertEqual(self.recorded('genre/movie/list', 'status_503').count, 3)
+        self.assertEqual(self.recorded('genre/movie/list', 'retries').total, 2)
+
+    def test_spent_budget_skips_the_call(self):
+        with upstream.budget(0.01):
+            self.assertIsNone(self.service.get_genres())
+        self.assertEqual(self.stub.request_count, 0)
+        self.assertEqual(self.recorded('genre/movie/list', 'budget_exhausted').count, 1)
+
+    def test_budget_cuts_slow_calls_short(self):
+        self.stub.latency = 1.0
+        start = time.monotonic()
+        with upstream.budget(0.2):
+            self.assertIsNone(self.service.get_genres())
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_retry_waits(self):
+        self.service.retry_backoff = 0.25
+        self.assertEqual(self.service._retry_wait(None, 0), 0.25)
+        self.assertEqual(self.service._retry_wait(None, 1), 0.5)
+        self.assertIsNone(self.service._retry_wait(None, 2))
+        with upstream.budget(0.2):
+            # Not worth waiting past the end of the budget
+            self.assertIsNone(self.service._retry_wait(None, 0))
+
+        too_long = mock.Mock(status_code=429, headers={'Retry-After': '60'})
+        self.assertIsNone(self.service._retry_wait(too_long, 0))
+        self.assertEqual(self.service._parse_retry_after('2'), 2.0)
+        self.assertEqual(self.service._parse_retry_after('Thu, 01 Jan 1970 00:00:00 GMT'), 0.0)
+        self.assertIsNone(self.service._parse_retry_after('soon'))
+
+    def test_budget_middleware(self):
+        with self.settings(TMDB_CLIENT={**settings.TMDB_CLIENT, 'REQUEST_BUDGET': 3.0}):
+            remaining = UpstreamBudgetMiddleware(lambda request: upstream.remaining())(None)
+        self.assertTrue(2.9 < remaining <= 3.0)
+        self.assertIsNone(upstream.remaining())
+        with upstream.budget(1.0), upstream.budget(5.0):
+            # Nested budgets never extend the outer one
+            self.assertLessEqual(upstream.remaining(), 1.0)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.breaker = CircuitBreaker('test', failure_threshold=3)
+
+    def fail(self, times=1):
+        for _ in range(times):
+            self.assertTrue(self.breaker.allow())
+            self.breaker.record_failure()
+
+    def reset_timeout_passes(self):
+        cache.delete(self.breaker._key('open'))
+
+    def test_opens_after_the_failure_threshold(self):
+        self.fail(2)
+        self.assertEqual(self.breaker.state(), CircuitBreaker.CLOSED)
+        self.fail()
+        self.assertEqual(self.breaker.state(), CircuitBreaker.OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    def test_successes_do_not_reset_the_window(self):
+        self.fail(2)
+        self.breaker.allow()
+        self.breaker.record_success()
+        self.fail()
+        self.assertEqual(self.breaker.state(), CircuitBreaker.OPEN)
+
+    def test_half_open_admits_one_probe_across_workers(self):
+        self.fail(3)
+        self.reset_timeout_passes()
+        self.assertEqual(self.breaker.state(), CircuitBreaker.HALF_OPEN)
+        self.assertTrue(self.breaker.allow())
+        # Another worker's breaker (same name, same cache)
+        self.assertFalse(CircuitBreaker('test').allow())
+
+    def test_successful_probe_closes(self):
+        self.fail(3)
+        self.reset_timeout_passes()
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state(), CircuitBreaker.CLOSED)
+        # The failure count started over
+        self.fail(2)
+        self.assertEqual(self.breaker.state(), CircuitBreaker.CLOSED)
+
+    def test_failed_probe_opens_again(self):
+        self.fail(3)
+        self.reset_timeout_passes()
+        self.fail()
+        self.assertEqual(self.breaker.state(), CircuitBreaker.OPEN)
+
+    def test_cache_errors_fail_open(self):
+        with mock.patch.object(cache, 'get_many', side_effect=ConnectionError):
+            self.assertEqual(self.breaker.state(), CircuitBreaker.CLOSED)
+            self.assertTrue(self.breaker.allow())
+
+
+@override_settings(TMDB_CLIENT={**settings.TMDB_CLIENT, 'MAX_RETRIES': 0})
+class TMDbFallbackTests(TMDbStubMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.service = cached_tmdb_module.cached_tmdb_service
+        drama = Genre.objects.create(tmdb_id=18, name='Drama')
+        for i in range(3):
+            Movie.objects.create(tmdb_id=900 + i, title=f'Local {i}', popularity=i).genres.add(drama)
+
+    def test_stale_copy_is_served_when_tmdb_fails(self):
+        fresh = self.service.get_popular_movies(1)
+        self.assertEqual(len(fresh['results']), 20)
+        cache.delete(cache_service.get_popular_movies_key(1))
+
+        self.stub.error_rate = 1.0
+        self.assertEqual(self.service.get_popular_movies(1), fresh)
+
+    def test_local_movies_are_served_without_a_stale_copy(self):
+        self.stub.error_rate = 1.0
+        page = self.service.get_popular_movies(1)
+        self.assertEqual([movie['id'] for movie in page['results']], [902, 901, 900])
+        self.assertEqual(page['results'][0]['genre_ids'], [18])
+        self.assertEqual((page['total_results'], page['total_pages']), (3, 1))
+
+        details = self.service.get_movie_details(901)
+        self.assertEqual((details['title'], details['genres']), ('Local 1', [{'id': 18, 'name': 'Drama'}]))
+        self.assertIsNone(self.service.get_movie_details(1))
+
+    def test_open_circuit_skips_tmdb(self):
+        tmdb_module.tmdb_breaker.trip()
+        self.assertEqual(self.service.get_genres(), {'genres': [{'id': 18, 'name': 'Drama'}]})
+        self.assertEqual(self.stub.request_count, 0)
+        self.assertEqual(tmdb_module.tmdb_breaker.state(), CircuitBreaker.OPEN)
+
+    def test_failures_open_the_circuit(self):
+        self.stub.error_rate = 1.0
+        threshold = settings.TMDB_CLIENT['CIRCUIT_BREAKER']['FAILURE_THRESHOLD']
+        for page in range(1, threshold + 3):
+            self.service.get_top_rated_movies(page)
+        self.assertEqual(self.stub.request_count, threshold)
+        self.assertEqual(tmdb_module.tmdb_breaker.state(), CircuitBreaker.OPEN)
+
+
+class FastJSONTests(SimpleTestCase):
+    PAYLOADS = [
+        {'count': 2, 'results': [{'id': 1, 'title': 'Amélie', 'vote_average': 7.9, 'genres': []}], 'next': None},
+        {'when': datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=dt_timezone.utc), 'day': date(2024, 5, 1)},
+        {'naive': datetime(2024, 5, 1, 12, 30), 'delta': timedelta(minutes=90)},
+        {'price': Decimal('12.50'), 'id': uuid.UUID(int=1), 'lazy': gettext_lazy('Not found.')},
+        {'separators': 'line\u2028paragraph\u2029end', 'emoji': '\U0001f3ac', 'quote': '"\\'},
+        {1: 'integer keys', 'big': 2 ** 70, 'small': -2 ** 63, 'floats': [0.1, 1.5, -0.0, 123456789.123]},
+        [('tuple', 1), {'nested': {'deep': [None, True, False]}}],
+    ]
+
+    def test_matches_drfs_renderer(self):
+        for payload in self.PAYLOADS:
+            self.assertEqual(FastJSONRenderer().render(payload), JSONRenderer().render(payload), payload)
+
+    def test_documented_differences(self):
+        self.assertEqual(FastJSONRenderer().render({'n': 1e16}), b'{"n":1e16}')
+        self.assertEqual(FastJSONRenderer().render({'n': float('nan')}), b'{"n":null}')
+
+    def test_falls_back_for_indented_output_and_without_orjson(self):
+        payload = self.PAYLOADS[0]
+        context = {'indent': 2}
+        self.assertEqual(
+            FastJSONRenderer().render(payload, renderer_context=context),
+            JSONRenderer().render(payload, renderer_context=context),
+        )
+        with mock.patch('movie_backend.renderers.orjson', None):
+            self.assertEqual(FastJSONRenderer().render({'n': 1e16}), b'{"n":1e+16}')
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def parse(self, body, parser=FastJSONParser, encoding='utf-8'):
+        return parser().parse(BytesIO(body), parser_context={'encoding': encoding})
+
+    def test_parser_matches_drfs_parser(self):
+        body = '{"movie_id": 5, "add": [1, 2], "name": "Amélie", "score": 1.5e3, "x": null}'.encode()
+        self.assertEqual(self.parse(body), self.parse(body, JSONParser))
+        self.assertEqual(self.parse('{"name": "Amélie"}'.encode('latin-1'), encoding='latin-1'), {'name': 'Amélie'})
+
+    def test_parser_rejects_invalid_json(self):
+        for body in (b'{"a": ', b'{"a": NaN}', b'\xff'):
+            with self.assertRaises(ParseError):
+                self.parse(body)
+
+
+class CatalogFixtureMixin:
+    """A few movies covering empty, null and multi-genre values"""
+
+    def setUp(self):
+        super().setUp()
+        drama = Genre.objects.create(tmdb_id=18, name='Drama')
+        action = Genre.objects.create(tmdb_id=28, name='Action')
+        comedy = Genre.objects.create(tmdb_id=35, name='Comedy')
+        full = Movie.objects.create(
+            tmdb_id=603, imdb_id='tt0133093', title='The Matrix', original_title='The Matrix',
+            overview='Neo ✓', tagline='Free your mind', release_date=date(1999, 3, 30),
+            poster_path='/matrix.jpg', backdrop_path='/matrix_bd.jpg', vote_average=8.2, vote_count=25000,
+            popularity=85.5, runtime=136, budget=63000000, revenue=463517383,
+        )
+        full.genres.set([drama, action, comedy])
+        bare = Movie.objects.create(tmdb_id=604, title='Untitled', status='planned', vote_average=0)
+        Movie.objects.create(tmdb_id=605, title='One genre', popularity=3.25).genres.add(comedy)
+        self.catalog = [full, bare]
+
+
+class FastSerializerTests(CatalogFixtureMixin, TestCase):
+    def assertSameBytes(self, fast, drf):
+        self.assertEqual(JSONRenderer().render(fast), JSONRenderer().render(drf))
+
+    def test_list_output_matches_the_model_serializer(self):
+        queryset = Movie.objects.order_by('tmdb_id')
+        self.assertSameBytes(
+            movie_list_serializer.serialize(queryset), MovieListSerializer(queryset, many=True).data,
+        )
+
+    def test_detail_output_matches_the_model_serializer(self):
+        queryset = Movie.objects.order_by('tmdb_id')
+        self.assertSameBytes(
+            movie_detail_serializer.serialize(queryset), MovieDetailSerializer(queryset, many=True).data,
+        )
+
+    def test_two_queries_for_any_number_of_movies(self):
+        with self.assertNumQueries(2):
+            self.assertEqual(len(movie_detail_serializer.serialize(Movie.objects.all())), 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(movie_list_serializer.serialize(Movie.objects.none()), [])
+
+    def test_project(self):
+        payload = movie_detail_serializer.serialize(Movie.objects.filter(tmdb_id=603))[0]
+        listed = MovieListSerializer(Movie.objects.get(tmdb_id=603)).data
+        self.assertSameBytes(movie_list_serializer.project(payload), listed)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ExportTests(CatalogFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('exporter', 'exporter@example.com', 'Export-123'))
+
+    def export(self, fmt, query=''):
+        response = self.client.get(reverse('movie-export', kwargs={'fmt': fmt}) + query)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_ndjson_lines_are_detail_payloads(self):
+        response, body = self.export('ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertRegex(response['Content-Disposition'], r'^attachment; filename="movies-\d{8}T\d{6}Z\.ndjson"$')
+        expected = json.loads(JSONRenderer().render(movie_detail_serializer.serialize(Movie.objects.order_by('id'))))
+        self.assertEqual([json.loads(line) for line in body.splitlines()], expected)
+
+    def test_csv(self):
+        _, body = self.export('csv')
+        rows = list(csv.DictReader(body.splitlines()))
+        self.assertEqual(list(rows[0]), [name for name, _ in movie_detail_serializer.accessors])
+        self.assertEqual([row['tmdb_id'] for row in rows], ['603', '604', '605'])
+        self.assertEqual(rows[0]['genres'], 'Action|Comedy|Drama')
+        self.assertEqual(rows[0]['overview'], 'Neo ✓')
+        self.assertEqual((rows[1]['genres'], rows[1]['runtime'], rows[1]['poster_url']), ('', '', ''))
+
+    def test_genres_cost_one_query_per_chunk(self):
+        Movie.objects.bulk_create(Movie(tmdb_id=1000 + i, title=f'Bulk {i}') for i in range(7))
+        with mock.patch.object(export_module.export_service, 'chunk_size', 4):
+            chunks = list(export_module.export_service.iter_movies(Movie.objects.all()))
+            self.assertEqual([len(chunk) for chunk in chunks], [4, 4, 2])
+            with self.assertNumQueries(1 + 3):
+                list(export_module.export_service.iter_movies(Movie.objects.all()))
+
+    def test_incremental_export(self):
+        cutoff = timezone.now()
+        Movie.objects.filter(tmdb_id=604).update(updated_at=cutoff + timedelta(seconds=1))
+        response, body = self.export('ndjson', '?updated_since=' + cutoff.isoformat().replace('+', '%2B'))
+        self.assertEqual([json.loads(line)['tmdb_id'] for line in body.splitlines()], [604])
+        self.assertTrue(response['X-Export-Started-At'])
+
+        _, body = self.export('ndjson', f'?updated_before={cutoff.date().isoformat()}')
+        self.assertEqual(body, '')
+        bad = self.client.get(reverse('movie-export', kwargs={'fmt': 'csv'}) + '?updated_since=yesterday')
+        self.assertEqual(bad.status_code, 400)
+
+    def test_admin_only_and_known_formats(self):
+        self.assertEqual(self.client.get(reverse('movie-export', kwargs={'fmt': 'xml'})).status_code, 404)
+        self.client.force_authenticate(User.objects.create_user('member', 'member@example.com', 'Member-123'))
+        self.assertEqual(self.client.get(reverse('movie-export', kwargs={'fmt': 'csv'})).status_code, 403)
+
+
+class NegotiationTests(SimpleTestCase):
+    def test_server_preference_among_accepted_encodings(self):
+        cases = {
+            'gzip, deflate, br': 'br',
+            'gzip': 'gzip',
+            'GZIP;q=0.5': 'gzip',
+            'br;q=0, gzip': 'gzip',
+            'br;q=oops, gzip': 'gzip',
+            '*': 'br',
+            '*, br;q=0': 'gzip',
+            'identity': None,
+            '': None,
+        }
+        for header, expected in cases.items():
+            self.assertEqual(compression.negotiate(header, ['br', 'gzip']), expected, header)
+        self.assertEqual(compression.negotiate('br, gzip', ['gzip']), 'gzip')
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CompressionMiddlewareTests(SimpleTestCase):
+    BODY = json.dumps([{'id': i, 'title': f'Movie {i}'} for i in range(500)]).encode()
+
+    def setUp(self):
+        cache.clear()
+
+    def call(self, response, path='/api/movies/', accept='gzip, br', **options):
+        with self.settings(COMPRESSION={**settings.COMPRESSION, **options}):
+            middleware = CompressionMiddleware(lambda request: response)
+        return middleware(RequestFactory().get(path, HTTP_ACCEPT_ENCODING=accept))
+
+    def json_response(self, body=BODY, **headers):
+        response = HttpResponse(body, content_type='application/json')
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    def test_brotli_then_gzip(self):
+        for accept, encoding in (('gzip, br', 'br'), ('gzip', 'gzip')):
+            response = self.call(self.json_response(), accept=accept)
+            self.assertEqual(response['Content-Encoding'], encoding)
+            self.assertEqual(response['Vary'], 'Accept-Encoding')
+            self.assertEqual(int(response['Content-Length']), len(response.content))
+            self.assertLess(len(response.content), len(self.BODY))
+            self.assertEqual(compression.decompress(encoding, response.content), self.BODY)
+
+    def test_disabled_codec(self):
+        response = self.call(self.json_response(), BROTLI_LEVEL=0)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_uncompressed_responses_still_vary(self):
+        for response in (
+            self.call(self.json_response(b'{"small": true}')),
+            self.call(self.json_response(), accept='identity'),
+        ):
+            self.assertFalse(response.has_header('Content-Encoding'))
+            self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_other_paths_and_types_are_left_alone(self):
+        for response in (
+            self.call(self.json_response(), path='/admin/'),
+            self.call(HttpResponse(self.BODY, content_type='image/png')),
+        ):
+            self.assertFalse(response.has_header('Content-Encoding'))
+            self.assertFalse(response.has_header('Vary'))
+
+    def test_strong_etags_become_weak(self):
+        response = self.call(self.json_response(ETag='"abc"'))
+        self.assertEqual(response['ETag'], 'W/"abc"')
+        response = self.call(self.json_response(ETag='W/"abc"'))
+        self.assertEqual(response['ETag'], 'W/"abc"')
+
+    def test_streaming_bodies_are_compressed_per_chunk(self):
+        chunks = [self.BODY[i:i + 1000] for i in range(0, len(self.BODY), 1000)]
+        for encoding in ('br', 'gzip'):
+            response = self.call(
+                StreamingHttpResponse(iter(chunks), content_type='application/x-ndjson'), accept=encoding,
+            )
+            self.assertEqual(response['Content-Encoding'], encoding)
+            self.assertFalse(response.has_header('Content-Length'))
+            self.assertEqual(compression.decompress(encoding, b''.join(response.streaming_content)), self.BODY)
+
+    def test_cacheable_bodies_are_compressed_once(self):
+        with mock.patch.object(compression, 'compress', wraps=compression.compress) as compress:
+            first = self.call(self.json_response()).content
+            self.assertEqual(self.call(self.json_response()).content, first)
+            self.assertEqual(compress.call_count, 1)
+
+            for _ in range(2):
+                self.call(self.json_response(**{'Cache-Control': 'private'}))
+            self.assertEqual(compress.call_count, 3)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class FieldSelectionTests(CatalogFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def get(self, name, query, **kwargs):
+        return APIClient().get(reverse(name, kwargs=kwargs) + query)
+
+    def test_fields_keep_the_serializers_order(self):
+        selection = movie_list_serializer.select('title, tmdb_id')
+        self.assertEqual(selection.serialize(Movie.objects.filter(tmdb_id=603)), [{'tmdb_id': 603, 'title': 'The Matrix'}])
+        self.assertEqual(selection.columns, ['id', 'tmdb_id', 'title'])
+        self.assertIs(movie_list_serializer.select('tmdb_id,title'), selection)
+
+    def test_default_selection_is_the_serializer_itself(self):
+        self.assertIs(movie_list_serializer.select(), movie_list_serializer)
+        self.assertIs(movie_list_serializer.select('', ''), movie_list_serializer)
+
+    def test_expand_adds_detail_fields(self):
+        selection = movie_list_serializer.select(expand='runtime,tagline')
+        names = [name for name, _ in selection.accessors]
+        self.assertEqual(names, [name for name, _ in movie_list_serializer.accessors] + ['tagline', 'runtime'])
+
+    def test_genres_are_only_queried_when_selected(self):
+        with self.assertNumQueries(1):
+            movie_list_serializer.select('tmdb_id').serialize(Movie.objects.all())
+        with self.assertNumQueries(2):
+            movie_list_serializer.select('tmdb_id,genres').serialize(Movie.objects.all())
+
+    def test_unknown_fields(self):
+        with self.assertRaises(ValidationError) as raised:
+            movie_list_serializer.select('title,password', expand='secret')
+        self.assertIn('Unknown fields: password, secret', str(raised.exception.detail['fields']))
+
+        response = self.get('movie-list', '?fields=title,nope')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('nope', response.json()['fields'])
+        self.assertEqual(self.get('movie-detail', '?expand=nope', tmdb_id=603).status_code, 400)
+
+    def test_endpoints(self):
+        listed = self.get('movie-list', '?fields=tmdb_id,title&search=matrix').json()
+        self.assertEqual(listed['results'], [{'tmdb_id': 603, 'title': 'The Matrix'}])
+
+        detail = self.get('movie-detail', '?fields=title,runtime', tmdb_id=603).json()
+        self.assertEqual(detail, {'title': 'The Matrix', 'runtime': 136})
+        # The full payload cached by that request still serves other selections
+        self.assertEqual(self.get('movie-detail', '', tmdb_id=603).json()['revenue'], 463517383)
+
+        batch = self.get('movie-batch', '?ids=604,603&fields=tmdb_id').json()
+        self.assertEqual(batch['results'], [{'tmdb_id': 604}, {'tmdb_id': 603}])
+
+
+class MovieBatchTests(CatalogFixtureMixin, TMDbStubMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        movie_module.movie_service._wrapped = empty
+        self.addCleanup(setattr, movie_module.movie_service, '_wrapped', empty)
+
+    def batch(self, query, status=200):
+        response = APIClient().get(reverse('movie-batch') + query)
+        self.assertEqual(response.status_code, status, response.content)
+        return response.json()
+
+    def test_results_follow_request_order_and_report_missing_ids(self):
+        body = self.batch('?ids=605,1,603,605,2,604')
+        self.assertEqual([movie['tmdb_id'] for movie in body['results']], [605, 603, 604])
+        self.assertEqual((body['count'], body['missing']), (3, [1, 2]))
+        self.assertEqual(self.stub.request_count, 0)
+
+    def test_payloads_are_cached_per_movie(self):
+        self.batch('?ids=603,604')
+        with self.assertNumQueries(2):
+            # 605 is loaded with its genres; the others come from the cache
+            body = self.batch('?ids=604,605,603')
+        self.assertEqual([movie['tmdb_id'] for movie in body['results']], [604, 605, 603])
+        self.assertEqual(body['results'][2], movie_detail_serializer.serialize(Movie.objects.filter(tmdb_id=603))[0])
+
+    def test_missing_ids_can_be_filled_from_tmdb(self):
+        body = self.batch('?ids=603,7001,7002&fill_from_tmdb=true')
+        self.assertEqual([movie['tmdb_id'] for movie in body['results']], [603, 7001, 7002])
+        self.assertEqual(body['missing'], [])
+        self.assertTrue(Movie.objects.filter(tmdb_id=7002).exists())
+        self.assertEqual(self.stub.request_count, 2)
+
+    def test_tmdb_fill_is_bounded(self):
+        movie_module.movie_service.max_tmdb_fetches = 1
+        body = self.batch('?ids=7001,7002&fill_from_tmdb=1')
+        self.assertEqual((body['count'], body['missing']), (1, [7002]))
+
+        movie_module.movie_service.tmdb_fill = False
+        self.assertEqual(self.batch('?ids=7003&fill_from_tmdb=1')['missing'], [7003])
+        self.assertEqual(self.stub.request_count, 1)
+
+    def test_invalid_ids(self):
+        self.assertIn('ids', self.batch('?ids=1,x', status=400))
+        self.assertIn('ids', self.batch('?ids=,', status=400))
+        self.assertIn('ids', self.batch('', status=400))
+        movie_module.movie_service.max_ids = 2
+        self.assertIn('ids', self.batch('?ids=1,2,3', status=400))
+        self.assertEqual(self.batch('?ids=1,2,2,1')['missing'], [1, 2])
+
+
+class DatabaseConnectionTests(SimpleTestCase):
+    def database_settings(self, mode):
+        env = {**os.environ, 'DATABASE_URL': 'postgres://user:secret@db:5432/movies', 'DB_CONNECTION_MODE': mode}
+        env.pop('RENDER', None)
+        code = "import json; from movie_backend import settings; print(json.dumps(settings.DATABASES['default']))"
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, env=env)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return json.loads(result.stdout.splitlines()[-1])
+
+    def test_connection_modes(self):
+        pooled = self.database_settings('pool')
+        self.assertEqual(pooled['ENGINE'], 'movie_backend.db.backends.postgresql_pool')
+        self.assertEqual(pooled['CONN_MAX_AGE'], 0)
+        self.assertEqual(
+            pooled['OPTIONS']['pool'],
+            {'min_size': 2, 'max_size': 10, 'timeout': 10.0, 'max_idle': 300.0, 'max_lifetime': 3600.0, 'check': True},
+        )
+
+        persistent = self.database_settings('persistent')
+        self.assertEqual(persistent['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual((persistent['CONN_MAX_AGE'], persistent['CONN_HEALTH_CHECKS']), (600, True))
+
+        per_request = self.database_settings('per_request')
+        self.assertEqual((per_request['ENGINE'], per_request['CONN_MAX_AGE']), ('django.db.backends.postgresql', 0))
+
+    def test_fork_drops_inherited_connections_without_closing_them(self):
+        from movie_backend import db
+
+        inherited = mock.Mock()
+        connection = SimpleNamespace(connection=inherited)
+        with mock.patch.object(db.connections, 'all', return_value=[connection]) as all_connections:
+            db._forget_inherited_connections()
+        all_connections.assert_called_once_with(initialized_only=True)
+        self.assertIsNone(connection.connection)
+        inherited.close.assert_not_called()
+
+        with mock.patch.object(db, '_fork_handler_installed', False), \
+                mock.patch.object(db.os, 'register_at_fork') as register_at_fork:
+            db.install_fork_handler()
+            db.install_fork_handler()
+        register_at_fork.assert_called_once_with(after_in_child=db._forget_inherited_connections)
+
+
+class PooledBackendTests(SimpleTestCase):
+    def setUp(self):
+        from movie_backend.db.backends.postgresql_pool import base as pool_base
+
+        self.base = pool_base
+        self.pool_class = mock.patch.object(pool_base, 'ConnectionPool').start()
+        self.pool_class.side_effect = lambda **kwargs: mock.Mock()
+        self.addCleanup(mock.patch.stopall)
+        mock.patch.dict(pool_base.DatabaseWrapper._pools, clear=True).start()
+
+    def wrapper(self, alias='default', **overrides):
+        settings_dict = {
+            'ENGINE': 'movie_backend.db.backends.postgresql_pool', 'NAME': 'movies', 'USER': 'user',
+            'PASSWORD': 'secret', 'HOST': 'db', 'PORT': '5432', 'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False,
+            'AUTOCOMMIT': True, 'ATOMIC_REQUESTS': False, 'TIME_ZONE': None, 'TEST': {},
+            'OPTIONS': {'pool': {'min_size': 1, 'max_size': 4, 'check': False}},
+            **overrides,
+        }
+        return self.base.DatabaseWrapper(settings_dict, alias)
+
+    def test_persistent_connections_are_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            self.wrapper(CONN_MAX_AGE=600)
+
+    def test_pools_are_per_alias_and_process(self):
+        wrapper = self.wrapper()
+        pool = wrapper.pool
+        self.assertIs(pool, self.wrapper().pool)
+        self.pool_class.assert_called_once()
+        kwargs = self.pool_class.call_args.kwargs
+        self.assertEqual((kwargs['min_size'], kwargs['max_size'], kwargs['check']), (1, 4, None))
+        self.assertNotIn('pool', kwargs['kwargs'])
+        self.assertEqual(kwargs['kwargs']['dbname'], 'movies')
+
+        self.wrapper('replica_1').pool
+        with mock.patch.object(self.base.os, 'getpid', return_value=os.getpid() + 1):
+            # A forked worker gets its own pool
+            self.assertIsNot(wrapper.pool, pool)
+        self.assertEqual(self.pool_class.call_count, 3)
+
+    def test_connections_come_from_and_return_to_the_pool(self):
+        wrapper = self.wrapper()
+        raw = wrapper.get_new_connection(wrapper.get_connection_params())
+        self.assertIs(raw, wrapper.pool.getconn.return_value)
+
+        wrapper.connection = raw
+        wrapper._close()
+        raw._pool.putconn.assert_called_once_with(raw)
+        raw.close.assert_not_called()
+        self.assertIsNone(wrapper.connection)
+
+    def test_close_pools_closes_this_process_pools(self):
+        pools = [self.wrapper().pool, self.wrapper('replica_1').pool]
+        other = self.base.DatabaseWrapper._pools[('other', -1)] = mock.Mock()
+        self.assertEqual(set(self.base.DatabaseWrapper.pool_stats()), {'default', 'replica_1'})
+
+        self.base.DatabaseWrapper.close_pools()
+        for pool in pools:
+            pool.close.assert_called_once_with()
+        other.close.assert_not_called()
+        self.assertEqual(list(self.base.DatabaseWrapper._pools), [('other', -1)])
+
+
+DATABASE_REPLICAS = {
+    'ALIASES': ['replica_1', 'replica_2'], 'MODELS': ['movies.movie', 'movies.genre'],
+    'STICKY_SECONDS': 5, 'MAX_LAG_SECONDS': 10.0, 'LAG_CHECK_INTERVAL': 5.0,
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHE, DATABASE_REPLICAS=DATABASE_REPLICAS, DATABASE_ROUTERS=['movie_backend.db.router.ReplicaRouter'])
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.router = db_router.ReplicaRouter()
+        mock.patch.object(db_router.replica_health, 'healthy', return_value=['replica_2']).start()
+        self.addCleanup(mock.patch.stopall)
+        self.factory = RequestFactory()
+
+    def read_in_request(self, request, model=Movie, pinned=False):
+        token = db_router.begin(request, pinned=pinned)
+        try:
+            return self.router.db_for_read(model)
+        finally:
+            db_router.end(token)
+
+    def test_catalog_reads_of_safe_requests_use_a_healthy_replica(self):
+        self.assertEqual(self.read_in_request(self.factory.get('/')), 'replica_2')
+        self.assertEqual(self.read_in_request(self.factory.get('/'), model=Genre), 'replica_2')
+        # Other models, pinned requests and reads outside a request stay on the primary
+        self.assertEqual(self.read_in_request(self.factory.get('/'), model=UserFavorite), 'default')
+        self.assertEqual(self.read_in_request(self.factory.get('/'), model=User), 'default')
+        self.assertEqual(self.read_in_request(self.factory.post('/'), pinned=True), 'default')
+        self.assertEqual(self.router.db_for_read(Movie), 'default')
+
+        db_router.replica_health.healthy.return_value = []
+        self.assertEqual(self.read_in_request(self.factory.get('/')), 'default')
+
+    def test_reads_after_a_write_use_the_primary(self):
+        token = db_router.begin(self.factory.get('/'))
+        try:
+            self.assertEqual(self.router.db_for_read(Movie), 'replica_2')
+            self.assertEqual(self.router.db_for_write(Movie), 'default')
+            self.assertTrue(db_router.get_state().wrote)
+            self.assertEqual(self.router.db_for_read(Movie), 'default')
+        finally:
+            db_router.end(token)
+        self.assertIsNone(db_router.get_state())
+
+    def test_reads_inside_a_transaction_use_the_primary(self):
+        with mock.patch.object(connections['default'], 'in_atomic_block', True):
+            self.assertEqual(self.read_in_request(self.factory.get('/')), 'default')
+
+    def test_sticky_clients_read_from_the_primary(self):
+        request = self.factory.get('/')
+        request.COOKIES[db_router.STICKY_COOKIE] = str(time.time() + 5)
+        self.assertEqual(self.read_in_request(request), 'default')
+
+        request = self.factory.get('/')
+        request.COOKIES[db_router.STICKY_COOKIE] = str(time.time() - 1)
+        self.assertEqual(self.read_in_request(request), 'replica_2')
+
+        request = self.factory.get('/')
+        request.COOKIES[db_router.STICKY_COOKIE] = 'garbage'
+        request.user = SimpleNamespace(pk=7, is_authenticated=True)
+        self.assertEqual(self.read_in_request(request), 'replica_2')
+        cache.set(db_router.sticky_key(7), 1)
+        self.assertEqual(self.read_in_request(request), 'default')
+
+    def test_migrations_skip_replicas(self):
+        self.assertTrue(self.router.allow_migrate('default', 'movies'))
+        self.assertFalse(self.router.allow_migrate('replica_1', 'movies'))
+
+    def test_middleware_makes_writers_sticky(self):
+        def view(request):
+            self.assertEqual(self.router.db_for_read(Movie), 'replica_2')
+            if request.GET.get('write'):
+                self.router.db_for_write(Movie)
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(view)
+        request = self.factory.get('/')
+        self.assertNotIn(db_router.STICKY_COOKIE, middleware(request).cookies)
+
+        request = self.factory.get('/', {'write': 1})
+        request.user = SimpleNamespace(pk=7, is_authenticated=True)
+        cookie = middleware(request).cookies[db_router.STICKY_COOKIE]
+        self.assertEqual(cookie['max-age'], 5)
+        self.assertGreater(float(cookie.value), time.time())
+        self.assertEqual(cache.get(db_router.sticky_key(7)), 1)
+        self.assertIsNone(db_router.get_state())
+
+        pinned = ReplicaRoutingMiddleware(lambda request: HttpResponse(self.router.db_for_read(Movie)))
+        self.assertEqual(pinned(self.factory.post('/')).content, b'default')
+
+
+@override_settings(DATABASE_REPLICAS=DATABASE_REPLICAS)
+class ReplicaHealthTests(SimpleTestCase):
+    def setUp(self):
+        self.health = db_router.ReplicaHealth()
+        mock.patch.object(db_router.ReplicaHealth, 'aliases', ['replica_1', 'replica_2']).start()
+        mock.patch.object(self.health, '_ensure_thread').start()
+        self.measure = mock.patch.object(self.health, 'measure').start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_lagging_and_unreachable_replicas_are_drained_until_they_catch_up(self):
+        self.assertEqual(self.health.healthy(), [])
+
+        self.measure.side_effect = lambda alias: {'replica_1': 0.5, 'replica_2': 30.0}[alias]
+        self.health.check()
+        self.assertEqual(self.health.healthy(), ['replica_1'])
+        self.assertEqual(self.health.status()['replica_2'], {'lag_seconds': 30.0, 'healthy': False})
+
+        def measure(alias):
+            if alias == 'replica_1':
+                raise OSError('connection refused')
+            return 2.0
+
+        self.measure.side_effect = measure
+        with mock.patch.object(db_router, 'connections') as replica_connections:
+            self.health.check()
+        replica_connections.__getitem__.return_value.close.assert_called_once_with()
+        self.assertEqual(self.health.healthy(), ['replica_2'])
+        self.assertEqual(self.health.status()['replica_1'], {'lag_seconds': None, 'healthy': False})
+
+
+class AdminChangelistTests(CatalogFixtureMixin, TMDbStubMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'secret')
+        self.client.force_login(self.admin)
+        movie_module.movie_service._wrapped = empty
+        self.addCleanup(setattr, movie_module.movie_service, '_wrapped', empty)
+
+    def changelist(self, name, **params):
+        response = self.client.get(reverse(f'admin:movies_{name}_changelist'), params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def titles(self, **params):
+        return sorted(movie.title for movie in self.changelist('movie', **params).context['cl'].result_list)
+
+    def test_movie_filters(self):
+        self.assertEqual(self.titles(year='1999'), ['The Matrix'])
+        self.assertEqual(self.titles(year='1990 - 2000'), ['The Matrix'])
+        self.assertEqual(self.titles(year='2000'), [])
+        # Anything that isn't a year or a range is ignored
+        self.assertEqual(len(self.titles(year='late 90s')), 3)
+        self.assertEqual(self.titles(genre='comedy'), ['One genre', 'The Matrix'])
+        self.assertEqual(self.titles(genre='Comedy', year='1999'), ['The Matrix'])
+        self.assertEqual(len(self.titles(language=' EN ')), 3)
+        self.assertEqual(self.titles(language='fr'), [])
+        self.assertEqual(self.titles(q='matrix'), ['The Matrix'])
+
+    def test_genre_filter_suggests_genres_and_keeps_other_parameters(self):
+        response = self.changelist('movie', genre='Drama', status='released')
+        choices = {
+            spec.parameter_name: list(spec.choices(response.context['cl']))[0]
+            for spec in response.context['cl'].filter_specs if hasattr(spec, 'placeholder')
+        }
+        self.assertEqual(choices['genre']['value'], 'Drama')
+        self.assertEqual(sorted(choices['genre']['suggestions']), ['Action', 'Comedy', 'Drama'])
+        self.assertIn(('status', 'released'), choices['genre']['hidden'])
+        self.assertNotIn('genre', dict(choices['genre']['hidden']))
+        self.assertContains(response, 'placeholder="Genre name"')
+
+    def test_favorite_search_matches_exact_usernames_and_titles(self):
+        alice = User.objects.create_user('alice', password='x')
+        alicia = User.objects.create_user('alicia', password='x')
+        UserFavorite.objects.create(user=alice, movie=self.catalog[0])
+        UserFavorite.objects.create(user=alicia, movie=self.catalog[1])
+
+        def favorites(query):
+            return sorted(
+                (favorite.user.username, favorite.movie.tmdb_id)
+                for favorite in self.changelist('userfavorite', q=query).context['cl'].result_list
+            )
+
+        self.assertEqual(favorites('alice'), [('alice', 603)])
+        self.assertEqual(favorites('untit'), [('alicia', 604)])
+        self.assertEqual(len(favorites('')), 2)
+
+    def test_refresh_action_is_limited(self):
+        url = reverse('admin:movies_movie_changelist')
+        data = {'action': 'refresh_from_tmdb', '_selected_action': [movie.pk for movie in self.catalog]}
+        with override_settings(ADMIN_CHANGELISTS={'REFRESH_LIMIT': 1}):
+            response = self.client.post(url, data, follow=True)
+        messages = [str(message) for message in response.context['messages']]
+        self.assertEqual(messages[0], 'Only the first 1 selected movies are refreshed at once.')
+        self.assertEqual(messages[1], 'Refreshed 1 movies from TMDb.')
+        self.assertEqual(self.stub.request_count, 1)
+
+
+class FakePlannerCursor:
+    def __init__(self, row):
+        self.row = row
+        self.executed = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, sql, params=None):
+        if isinstance(self.row, Exception):
+            raise self.row
+        self.executed.append((sql, params))
+
+    def fetchone(self):
+        return self.row
+
+
+class EstimatedCountTests(CatalogFixtureMixin, TestCase):
+    def planner(self, row):
+        cursor = FakePlannerCursor(row)
+        connection = SimpleNamespace(vendor='postgresql', cursor=lambda: cursor)
+        patcher = mock.patch.object(paginators, 'connections', {'default': connection})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return cursor
+
+    def test_unfiltered_tables_use_reltuples(self):
+        cursor = self.planner((250000,))
+        paginator = paginators.EstimatedCountPaginator(Movie.objects.all(), 100)
+        self.assertEqual(paginator.count, 250000)
+        self.assertEqual(paginator.num_pages, 2500)
+        self.assertIn('reltuples', cursor.executed[0][0])
+        self.assertEqual(cursor.executed[0][1], ['movies_movie'])
+
+    def test_filtered_querysets_use_the_explain_estimate(self):
+        cursor = self.planner((json.dumps([{'Plan': {'Plan Rows': 150000}}]),))
+        queryset = Movie.objects.filter(status='released').order_by('title')
+        self.assertEqual(paginators.estimated_count(queryset, 100000), 150000)
+        sql = cursor.executed[0][0]
+        self.assertTrue(sql.startswith('EXPLAIN (FORMAT JSON) SELECT'))
+        self.assertNotIn('ORDER BY', sql)
+
+    def test_small_or_unknown_estimates_fall_back_to_an_exact_count(self):
+        self.planner((-1,))
+        with override_settings(ADMIN_CHANGELISTS={'ESTIMATED_COUNT_THRESHOLD': 10}):
+            paginator = paginators.EstimatedCountPaginator(Movie.objects.all(), 100)
+        self.assertEqual(paginator.threshold, 10)
+        self.assertEqual(paginator.count, 3)
+
+        self.planner(OSError('no planner'))
+        self.assertIsNone(paginators.estimated_count(Movie.objects.filter(status='released'), 0))
+        self.assertEqual(paginators.EstimatedCountPaginator(Movie.objects.all(), 100, threshold=0).count, 3)
+
+    def test_other_databases_and_sliced_querysets_are_counted(self):
+        self.assertIsNone(paginators.estimated_count(Movie.objects.all(), 0))
+        self.planner((250000,))
+        self.assertIsNone(paginators.estimated_count(Movie.objects.all()[:2], 0))
+        self.assertEqual(paginators.EstimatedCountPaginator([1, 2], 1, threshold=0).count, 2)
+
+
+class MemoryUsageFakeRedis(fakeredis.FakeRedis):
+    """fakeredis has no MEMORY USAGE; report the value's length instead"""
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        pipe = super().pipeline(transaction, shard_hint)
+        pipe.memory_usage = pipe.strlen
+        return pipe
+
+
+@override_settings(CACHES={'default': {**LOCMEM_CACHE['default'], 'KEY_PREFIX': 'mb'}})
+class KeyspaceSamplerTests(SimpleTestCase):
+    def setUp(self):
+        self.redis = MemoryUsageFakeRedis()
+        patcher = mock.patch.object(keyspace, 'get_redis_client', return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        for n in range(30):
+            self.redis.set(f'mb:1:movie_details:{n}', 'x' * 100)
+        for n in range(20):
+            self.redis.set(f'mb:1:search:{n}', 'x' * 10)
+        self.redis.set('mb:1:plain', 'x')
+        self.redis.set('celery-task-meta-1', 'x')
+        with override_settings(CACHE_ANALYTICS={'SCAN_COUNT': 5, 'STEP_MAX_KEYS': 10, 'MEMORY_SAMPLE_RATE': 1}):
+            self.analytics = keyspace.CacheAnalytics()
+
+    def test_prefix_of_raw_keys(self):
+        self.assertEqual(self.analytics.prefix_of('mb:1:search:abc'), 'search')
+        self.assertEqual(self.analytics.prefix_of('mb:keyspace:cursor'), 'keyspace')
+        self.assertEqual(self.analytics.prefix_of('mb:1:plain'), keyspace.UNPREFIXED)
+        self.assertEqual(self.analytics.prefix_of('celery-task-meta-1'), keyspace.OTHER)
+
+    def test_steps_are_bounded_and_continue_one_pass(self):
+        steps = []
+        while not steps or not steps[-1]['pass_complete']:
+            steps.append(self.analytics.sample(budget_ms=60000))
+            self.assertLess(len(steps), 20)
+            # A step stops at the first SCAN batch that reaches STEP_MAX_KEYS
+            self.assertLessEqual(steps[-1]['scanned'], 10 + 5)
+        self.assertGreater(len(steps), 3)
+        self.assertGreaterEqual(sum(step['scanned'] for step in steps), 52)
+        self.assertIsNone(self.redis.get('mb:keyspace:cursor'))
+        self.assertFalse(self.redis.exists('mb:keyspace:lock'))
+
+        memory = self.analytics.memory()
+        self.assertTrue(memory['complete'])
+        prefixes = memory['prefixes']
+        self.assertEqual(prefixes['movie_details'], {'keys': 30, 'avg_bytes': 100, 'estimated_bytes': 3000})
+        self.assertEqual(prefixes['search'], {'keys': 20, 'avg_bytes': 10, 'estimated_bytes': 200})
+        self.assertEqual(prefixes[keyspace.UNPREFIXED]['keys'], 1)
+        self.assertEqual(prefixes[keyspace.OTHER]['keys'], 1)
+        self.assertEqual(list(prefixes)[:2], ['movie_details', 'search'])
+
+    def test_time_budget_ends_a_step_after_one_scan_batch(self):
+        step = self.analytics.sample(max_keys=1000, budget_ms=0)
+        self.assertFalse(step['pass_complete'])
+        self.assertLessEqual(step['scanned'], 5)
+        self.assertEqual(int(self.redis.get('mb:keyspace:cursor')), self.redis.scan(0, count=5)[0])
+
+    def test_partial_pass_is_scaled_to_the_database_size(self):
+        self.analytics.sample(budget_ms=60000)
+        memory = self.analytics.memory()
+        self.assertFalse(memory['complete'])
+        self.assertEqual(memory['dbsize'], self.redis.dbsize())
+        self.assertAlmostEqual(
+            sum(stats['keys'] for stats in memory['prefixes'].values()), memory['dbsize'], delta=len(memory['prefixes']),
+        )
+
+    def test_concurrent_steps_are_skipped(self):
+        self.redis.set('mb:keyspace:lock', 1)
+        self.assertEqual(self.analytics.sample(), {'skipped': True})
+        self.assertIsNone(self.redis.get('mb:keyspace:cursor'))
+
+    def test_without_redis(self):
+        keyspace.get_redis_client.return_value = None
+        self.assertIsNone(self.analytics.sample())
+        self.assertIsNone(self.analytics.memory())
+
+    def test_unmeasured_keys_have_no_size_estimate(self):
+        keyspace.get_redis_client.return_value = self.redis = fakeredis.FakeRedis()
+        self.redis.set('mb:1:search:1', 'x')
+        while not self.analytics.sample(budget_ms=60000)['pass_complete']:
+            pass
+        self.assertEqual(
+            self.analytics.memory()['prefixes']['search'], {'keys': 1, 'avg_bytes': None, 'estimated_bytes': None},
+        )
@@ -5,16 +5,22 @@ urlpatterns = [
     # Movie endpoints
     path('', views.MovieListView.as_view(), name='movie-list'),
     path('<int:tmdb_id>/', views.MovieDetailView.as_view(), name='movie-detail'),
+    path('batch/', views.movie_batch, name='movie-batch'),
     
     # Special movie lists
     path('trending/', views.TrendingMoviesView.as_view(), name='trending-movies'),
     path('recommended/', views.RecommendedMoviesView.as_view(), name='recommended-movies'),
+    path('recommended/for-you/', views.PersonalizedRecommendationsView.as_view(), name='personalized-recommendations'),
     
     # Search
     path('search/', views.movie_search, name='movie-search'),
+
+    # Catalog export
+    path('export/<str:fmt>/', views.export_movies, name='movie-export'),
     
     # User favorites
     path('favorites/', views.UserFavoriteListCreateView.as_view(), name='user-favorites'),
+    path('favorites/bulk/', views.UserFavoriteBulkView.as_view(), name='bulk-favorites'),
     path('favorites/<int:movie_id>/delete/', views.UserFavoriteDeleteView.as_view(), name='delete-favorite'),
     
     # Genres
@@ -22,5 +28,9 @@ urlpatterns = [
 
     # Cache management
     path('cache/stats/', views.cache_stats, name='cache-stats'),
+    path('cache/analytics/', views.cache_analytics, name='cache-analytics'),
     path('cache/clear/', views.clear_cache, name='clear-cache'),
+
+    # Performance metrics
+    path('metrics/', views.performance_metrics, name='performance-metrics'),
 ]
\ No newline at end of file
@@ -1,9 +1,14 @@
-from rest_framework import generics, status, permissions
-from rest_framework.decorators import api_view, permission_classes
+from datetime import datetime, time
+from rest_framework import generics, status
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.exceptions import ValidationError
-from django.shortcuts import get_object_or_404
+from django.http import Http404, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.dateparse import parse_date, parse_datetime
+from django.db import connections
 from django.db.models import Q
 from django.core.cache import cache
 from .models import Movie, Genre, UserFavorite
@@ -11,20 +16,89 @@ from .serializers import (
     MovieListSerializer,
     MovieDetailSerializer,
     UserFavoriteSerializer,
+    UserFavoriteBulkSerializer,
     GenreSerializer,
+    RecommendationsSerializer,
 )
+from .fast_serializers import movie_detail_serializer, movie_list_serializer
 from .services.cache_service import cache_service
+from .services.export_service import export_service
+from .services.movie_service import movie_service
+from movie_backend.concurrency import concurrency_limiter
+from movie_backend.db.router import replica_health
+from movie_backend.keyspace import cache_analytics as keyspace_analytics
+from movie_backend.metrics import registry as metrics_registry
+from movie_backend.query_budget import QueryBudget, query_budget
+from movie_backend.throttling import CatalogRateThrottle
+from users.permissions import IsStaffUser
+from .services.personalization_service import personalization_service
+from .services.tmdb_service import tmdb_breaker
+from .services.warming_service import RESPONSE, warming_service
 
 
-class MovieListView(generics.ListAPIView):
+def select_fields(fast_serializer, request):
+    """Apply the ``?fields=`` / ``?expand=`` query parameters"""
+    return fast_serializer.select(
+        request.query_params.get("fields"), request.query_params.get("expand")
+    )
+
+
+class FastListMixin:
+    """Serve a read-only list through a ``FastMovieSerializer``"""
+
+    fast_serializer = movie_list_serializer
+
+    def list(self, request, *args, **kwargs):
+        fast_serializer = select_fields(self.fast_serializer, request)
+        rows = fast_serializer.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(fast_serializer.serialize_rows(page))
+        return Response(fast_serializer.serialize_rows(rows))
+
+
+def record_response(request, response):
+    """Count a catalog response in the cache warming sketch
+
+    Its compressed body is cached by ``CompressionMiddleware``; the hottest
+    paths are replayed by ``manage.py cache_warm``.
+    """
+    if request.method == "GET" and response.status_code == 200:
+        warming_service.record(RESPONSE, request.get_full_path())
+
+
+class WarmedResponseMixin:
+    """Record successful GET responses for cache warming (``record_response``)"""
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        record_response(request, response)
+        return response
+
+
+class PrivateResponseMixin:
+    """Mark per-user responses ``Cache-Control: private``
+
+    Shared caches, and the compressed response cache, then skip them.
+    """
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        patch_cache_control(response, private=True)
+        return response
+
+
+class MovieListView(WarmedResponseMixin, FastListMixin, generics.ListAPIView):
     """List all movies with pagination"""
 
     queryset = Movie.objects.all()
     serializer_class = MovieListSerializer
     permission_classes = [AllowAny]
+    throttle_classes = [CatalogRateThrottle]
+    query_budget = QueryBudget(queries=4)
 
     def get_queryset(self):
-        queryset = Movie.objects.all()
+        queryset = Movie.objects.prefetch_related("genres")
 
         # Filter by genre
         genre = self.request.query_params.get("genre")
@@ -54,24 +128,42 @@ class MovieDetailView(generics.RetrieveAPIView):
     queryset = Movie.objects.all()
     serializer_class = MovieDetailSerializer
     permission_classes = [AllowAny]
+    throttle_classes = [CatalogRateThrottle]
+    query_budget = QueryBudget(queries=3)
     lookup_field = "tmdb_id"
 
+    def retrieve(self, request, *args, **kwargs):
+        # Served from the per-movie payload cache shared with the batch endpoint
+        selection = select_fields(movie_detail_serializer, request)
+        payload = movie_service.get(self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+        if payload is None:
+            raise Http404
+        return Response(payload if selection is movie_detail_serializer else selection.project(payload))
+
 
-class TrendingMoviesView(generics.ListAPIView):
+class TrendingMoviesView(WarmedResponseMixin, FastListMixin, generics.ListAPIView):
     """Get trending movies (ordered by popularity)"""
 
     serializer_class = MovieListSerializer
     permission_classes = [AllowAny]
+    throttle_classes = [CatalogRateThrottle]
+    query_budget = QueryBudget(queries=4)
 
     def get_queryset(self):
-        return Movie.objects.filter(status="released").order_by("-popularity")[:20]
+        return (
+            Movie.objects.filter(status="released")
+            .order_by("-popularity")
+            .prefetch_related("genres")[:20]
+        )
 
 
-class RecommendedMoviesView(generics.ListAPIView):
+class RecommendedMoviesView(WarmedResponseMixin, FastListMixin, generics.ListAPIView):
     """Get recommended movies (highly rated recent movies)"""
 
     serializer_class = MovieListSerializer
     permission_classes = [AllowAny]
+    throttle_classes = [CatalogRateThrottle]
+    query_budget = QueryBudget(queries=4)
 
     def get_queryset(self):
         from datetime import date, timedelta
@@ -84,62 +176,195 @@ class RecommendedMoviesView(generics.ListAPIView):
             release_date__gte=two_years_ago,
             vote_average__gte=7.0,
             vote_count__gte=100,
-        ).order_by("-vote_average", "-popularity")[:20]
+        ).order_by("-vote_average", "-popularity").prefetch_related("genres")[:20]
+
+
+class PersonalizedRecommendationsView(PrivateResponseMixin, generics.GenericAPIView):
+    """Get recommendations built from the user's favorite movies"""
+
+    serializer_class = RecommendationsSerializer
+    permission_classes = [IsAuthenticated]
+    query_budget = QueryBudget(queries=6)
+
+    def get(self, request, *args, **kwargs):
+        results = personalization_service.get_recommendations(request.user.id)
+        return Response({"count": len(results), "results": results})
+
+
+@query_budget(queries=14, duplicates=2)
+@api_view(["GET"])
+@permission_classes([AllowAny])
+@throttle_classes([CatalogRateThrottle])
+def movie_batch(request):
+    """Get many movies by tmdb_id (``?ids=1,2,3``), in request order
 
+    Ids that are neither cached nor in the database are reported under
+    ``missing``; ``fill_from_tmdb=true`` fetches (some of) them from TMDb.
+    """
+    try:
+        tmdb_ids = [int(value) for value in request.GET.get("ids", "").split(",") if value.strip()]
+    except ValueError:
+        raise ValidationError({"ids": "Expected comma-separated TMDb ids"})
+    tmdb_ids = list(dict.fromkeys(tmdb_ids))
+    if not tmdb_ids:
+        raise ValidationError({"ids": "Provide at least one TMDb id"})
+    if len(tmdb_ids) > movie_service.max_ids:
+        raise ValidationError({"ids": f"At most {movie_service.max_ids} ids per request"})
+
+    selection = select_fields(movie_detail_serializer, request)
+    fill_from_tmdb = request.GET.get("fill_from_tmdb", "").lower() in ("1", "true", "yes")
+    movies, missing = movie_service.get_many(tmdb_ids, fill_from_tmdb=fill_from_tmdb)
+    results = [selection.project(movies[tmdb_id]) for tmdb_id in tmdb_ids if tmdb_id in movies]
+    return Response({"count": len(results), "results": results, "missing": missing})
+
+
+def _parse_timestamp(name, value):
+    """Datetime or date query parameter as an aware datetime"""
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            parsed_date = parse_date(value)
+            if parsed_date is not None:
+                parsed = datetime.combine(parsed_date, time.min)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({name: "Expected an ISO 8601 date or datetime"})
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+@query_budget(queries=1)
+@api_view(["GET"])
+@permission_classes([IsStaffUser])
+def export_movies(request, fmt):
+    """Stream the movie catalog as NDJSON or CSV (admin only)
 
-class UserFavoriteListCreateView(generics.ListCreateAPIView):
+    ``updated_since`` / ``updated_before`` select an incremental export; the
+    ``X-Export-Started-At`` header is the ``updated_since`` for the next one.
+    """
+    if fmt not in export_service.FORMATS:
+        raise Http404(f"Unknown export format: {fmt}")
+
+    started_at = timezone.now()
+    movies = Movie.objects.all()
+    updated_since = request.GET.get("updated_since")
+    if updated_since:
+        movies = movies.filter(updated_at__gte=_parse_timestamp("updated_since", updated_since))
+    updated_before = request.GET.get("updated_before")
+    if updated_before:
+        movies = movies.filter(updated_at__lt=_parse_timestamp("updated_before", updated_before))
+
+    response = StreamingHttpResponse(
+        export_service.stream(fmt, movies), content_type=export_service.FORMATS[fmt]
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="movies-{started_at:%Y%m%dT%H%M%SZ}.{fmt}"'
+    )
+    response["X-Export-Started-At"] = started_at.isoformat()
+    return response
+
+
+class UserFavoriteListCreateView(PrivateResponseMixin, generics.ListCreateAPIView):
     """List user's favorite movies and add new favorites"""
 
     serializer_class = UserFavoriteSerializer
     permission_classes = [IsAuthenticated]
+    # Adding: auth, the upsert (plus a look-up of existing favorites off
+    # PostgreSQL), two to update cached recommendations in place and two to
+    # load a movie payload that is not cached yet
+    query_budget = QueryBudget(queries=7)
 
     def get_queryset(self):
-        return UserFavorite.objects.filter(user=self.request.user).select_related(
-            "movie"
+        return (
+            UserFavorite.objects.filter(user_id=self.request.user.id)
+            .select_related("movie")
+            .prefetch_related("movie__genres")
         )
 
-    def perform_create(self, serializer):
-        # Check if movie exists
-        movie_id = serializer.validated_data.get("movie_id")
-        try:
-            movie = Movie.objects.get(id=movie_id)
-            serializer.save(user=self.request.user, movie=movie)
-        except Movie.DoesNotExist:
-            raise ValidationError({"movie_id": "Movie not found"})
+    def list(self, request, *args, **kwargs):
+        # Serialized favorites are cached per user and invalidated by signals
+        favorites = personalization_service.get_favorites(request.user.id)
+        page = self.paginate_queryset(favorites)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(favorites)
 
     def create(self, request, *args, **kwargs):
-        # Check if user already has this movie as favorite
-        movie_id = request.data.get("movie_id")
-        if UserFavorite.objects.filter(user=request.user, movie_id=movie_id).exists():
-            return Response(
-                {"error": "Movie is already in favorites"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-        return super().create(request, *args, **kwargs)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        # One upsert returning the favorite; re-adding is a no-op
+        favorite = personalization_service.add_favorite(
+            request.user.id, serializer.validated_data["movie_id"]
+        )
+        if favorite is None:
+            raise ValidationError({"movie_id": "Movie not found"})
+
+        # The movie comes from its cached detail payload rather than a re-read
+        payload = movie_service.get(favorite.tmdb_id)
+        if payload is None:
+            # The movie was deleted since the upsert, taking the favorite with it
+            raise Http404("Movie not found")
+        return Response(
+            {
+                "id": favorite.id,
+                "movie": movie_list_serializer.project(payload),
+                "created_at": serializer.fields["created_at"].to_representation(favorite.created_at),
+            },
+            status=status.HTTP_201_CREATED if favorite.created else status.HTTP_200_OK,
+        )
+
+
+class UserFavoriteBulkView(generics.GenericAPIView):
+    """Add and remove many favorites in one request (e.g. offline sync)"""
+
+    serializer_class = UserFavoriteBulkSerializer
+    permission_classes = [IsAuthenticated]
+    # Auth, the transaction's BEGIN and the look-up of existing favorites
+    # (both SQLite only), insert, delete and two to update cached
+    # recommendations in place
+    query_budget = QueryBudget(queries=7)
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        result = personalization_service.sync_favorites(
+            request.user.id,
+            serializer.validated_data["add"],
+            serializer.validated_data["remove"],
+        )
+        return Response(result)
 
 
 class UserFavoriteDeleteView(generics.DestroyAPIView):
     """Remove a movie from user's favorites"""
 
     permission_classes = [IsAuthenticated]
+    query_budget = QueryBudget(queries=4)
 
-    def get_object(self):
-        movie_id = self.kwargs.get("movie_id")
-        return get_object_or_404(
-            UserFavorite, user=self.request.user, movie_id=movie_id
-        )
+    def destroy(self, request, *args, **kwargs):
+        if not personalization_service.remove_favorite(request.user.id, self.kwargs.get("movie_id")):
+            raise Http404("No UserFavorite matches the given query.")
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class GenreListView(generics.ListAPIView):
+class GenreListView(WarmedResponseMixin, generics.ListAPIView):
     """List all available genres"""
 
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = [AllowAny]
+    throttle_classes = [CatalogRateThrottle]
+    query_budget = QueryBudget(queries=3)
 
 
+@query_budget(queries=4)
 @api_view(["GET"])
 @permission_classes([AllowAny])
+@throttle_classes([CatalogRateThrottle])
 def movie_search(request):
     """Search movies by title, genre, or year"""
     query = request.GET.get("q", "")
@@ -154,7 +379,7 @@ def movie_search(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    movies = Movie.objects.all()
+    movies = Movie.objects.prefetch_related("genres")
 
     if query:
         movies = movies.filter(
@@ -170,13 +395,16 @@ def movie_search(request):
         movies = movies.filter(release_date__year=year)
 
     movies = movies.distinct()[:50]  # Limit results
-    serializer = MovieListSerializer(movies, many=True)
+    results = select_fields(movie_list_serializer, request).serialize(movies)
 
-    return Response({"count": movies.count(), "results": serializer.data})
+    response = Response({"count": len(results), "results": results})
+    record_response(request, response)
+    return response
 
 
+@query_budget(queries=1)
 @api_view(["GET"])
-@permission_classes([permissions.IsAdminUser])
+@permission_classes([IsStaffUser])
 def cache_stats(request):
     """Get cache statistics (admin only)"""
     try:
@@ -212,8 +440,62 @@ def cache_stats(request):
         )
 
 
+@query_budget(queries=1)
+@api_view(["GET", "DELETE"])
+@permission_classes([IsStaffUser])
+def cache_analytics(request):
+    """Hit ratios, hot keys and estimated memory per cache key prefix (admin only)
+
+    Each GET advances the bounded keyspace scan by one step (``?sample=0``
+    skips it); DELETE resets the counters and the scan.
+    """
+    if request.method == "DELETE":
+        keyspace_analytics.reset()
+        return Response({"message": "Cache analytics reset"})
+
+    try:
+        top = min(max(int(request.GET.get("top", 20)), 0), 200)
+    except ValueError:
+        raise ValidationError({"top": "Must be an integer."})
+    sample = None
+    if request.GET.get("sample", "1").lower() not in ("0", "false", "no"):
+        sample = keyspace_analytics.sample()
+    return Response({
+        "access": keyspace_analytics.access(),
+        "hot_keys": [
+            {"key": key, "score": round(score, 2)} for key, score in keyspace_analytics.hottest(top)
+        ] if top else [],
+        "memory": keyspace_analytics.memory(),
+        "sample_step": sample,
+    })
+
+
+@query_budget(queries=1)
+@api_view(["GET", "DELETE"])
+@permission_classes([IsStaffUser])
+def performance_metrics(request):
+    """Per-endpoint p50/p95/p99 request metrics across all workers (admin only)"""
+    if request.method == "DELETE":
+        metrics_registry.reset()
+        return Response({"message": "Metrics reset"})
+
+    db_pools = {}
+    for connection in connections.all():
+        if hasattr(connection, "pool_stats"):
+            db_pools.update(connection.pool_stats())
+    return Response({
+        "endpoints": metrics_registry.snapshot(request.GET.get("endpoint")),
+        "circuits": {"tmdb": tmdb_breaker.state()},
+        # This worker process only
+        "db_pools": db_pools,
+        "concurrency": concurrency_limiter.status(),
+        "db_replicas": replica_health.status(),
+    })
+
+
+@query_budget(queries=1)
 @api_view(["POST"])
-@permission_classes([permissions.IsAdminUser])
+@permission_classes([IsStaffUser])
 def clear_cache(request):
     """Clear cache (admin only)"""
     pattern = request.data.get("pattern")
@@ -0,0 +1,102 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+def get_auth_user_key(user_id) -> str:
+    """Generate cache key for an authenticated user row"""
+    return f"auth_user:{user_id}"
+
+
+# Never cached; CHECK_REVOKE_TOKEN compares a digest of it instead
+EXCLUDED_FIELDS = ('password',)
+
+
+def get_cached_user(user_id):
+    """Load a user by id through a short-TTL cache
+
+    Only the row's field values are cached, without the password hash.
+    Cached users are unsaved copies marked ``_from_cache``; see
+    ``get_full_user`` before writing to one.
+    """
+    key = get_auth_user_key(user_id)
+    values = cache.get(key)
+    if values is not None:
+        revoke_digest = values.pop('_revoke_digest', None)
+        user = User(**values)
+        user._state.adding = False
+        user._from_cache = True
+        user._revoke_digest = revoke_digest
+        return user
+
+    user = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+    if user is not None:
+        values = {
+            field.attname: getattr(user, field.attname)
+            for field in User._meta.concrete_fields
+            if field.name not in EXCLUDED_FIELDS
+        }
+        if api_settings.CHECK_REVOKE_TOKEN:
+            values['_revoke_digest'] = get_md5_hash_password(user.password)
+        cache.set(key, values, getattr(settings, 'CACHE_TTL', {}).get('AUTH_USER', 60))
+    return user
+
+
+def get_full_user(request, fresh=False):
+    """Return the ``User`` row for ``request.user``
+
+    Token users built from JWT claims have no database representation, so
+    views that need the full row (profile, stats) load it here. Pass
+    ``fresh=True`` before writing to the row so stale cached values are
+    never saved back.
+    """
+    user = request.user
+    if isinstance(user, User) and not (fresh and getattr(user, '_from_cache', False)):
+        # Rows loaded by this request's authentication are already fresh
+        return user
+
+    user = User.objects.get(pk=user.pk) if fresh else get_cached_user(user.pk)
+    if user is None:
+        raise AuthenticationFailed(_("User not found"), code="user_not_found")
+    return user
+
+
+class ClaimsTokenUser(TokenUser):
+    """Token user with an integer id, usable directly in ORM filters"""
+
+    @cached_property
+    def id(self) -> int:
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+
+class CachedUserJWTAuthentication(JWTAuthentication):
+    """JWT authentication that loads the user row through a short-TTL cache"""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        user = get_cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            digest = getattr(user, '_revoke_digest', None) or get_md5_hash_password(user.password)
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != digest:
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2 hasher whose cost comes from AUTH_HASHING['PBKDF2_ITERATIONS']
+
+    Hashes store their iteration count, so existing passwords keep verifying
+    and are re-hashed at the new cost on the user's next login.
+    """
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'AUTH_HASHING', {}).get(
+            'PBKDF2_ITERATIONS', PBKDF2PasswordHasher.iterations
+        )
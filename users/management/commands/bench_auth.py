@@ -0,0 +1,74 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import (
+    JWTAuthentication,
+    JWTStatelessUserAuthentication,
+)
+from rest_framework_simplejwt.tokens import AccessToken
+from users.authentication import CachedUserJWTAuthentication
+from users.tokens import UserClaimsRefreshToken
+import time
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the per-request cost of each JWT authentication mode'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=2000,
+            help='Number of authenticated requests per mode'
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+
+        # Run against a throwaway user that is rolled back afterwards
+        try:
+            with transaction.atomic():
+                self.run_benchmarks(iterations)
+                raise Rollback()
+        except Rollback:
+            pass
+
+    def run_benchmarks(self, iterations):
+        user = User.objects.create_user(username='bench_auth_user', password=None)
+        token = str(UserClaimsRefreshToken.for_user(user).access_token)
+        factory = APIRequestFactory()
+
+        modes = [
+            ('signature only', None),
+            ('database', JWTAuthentication),
+            ('cached', CachedUserJWTAuthentication),
+            ('stateless', JWTStatelessUserAuthentication),
+        ]
+
+        self.stdout.write(f'{"mode":<16}{"us/request":>12}{"queries/request":>18}')
+        for name, authentication_class in modes:
+            requests = [
+                factory.get('/api/auth/stats/', HTTP_AUTHORIZATION=f'Bearer {token}')
+                for _ in range(iterations)
+            ]
+
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                for django_request in requests:
+                    if authentication_class is None:
+                        AccessToken(token)
+                        continue
+                    request = Request(django_request, authenticators=[authentication_class()])
+                    request.user
+                elapsed = time.perf_counter() - start
+
+            self.stdout.write(
+                f'{name:<16}{elapsed / iterations * 1e6:>12.1f}{len(queries) / iterations:>18.2f}'
+            )
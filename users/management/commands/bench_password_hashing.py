@@ -0,0 +1,85 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.management.base import BaseCommand
+from users.hashers import TunablePBKDF2PasswordHasher
+import time
+
+
+class Command(BaseCommand):
+    help = 'Benchmark PBKDF2 cost on this machine and suggest AUTH_HASHING settings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target-ms',
+            type=float,
+            default=250.0,
+            help='Desired time for one password hash in milliseconds'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.AUTH_HASHING.get('CONCURRENCY', 2),
+            help='Concurrent hashes per process, used for the throughput column'
+        )
+        parser.add_argument(
+            '--samples',
+            type=int,
+            default=3,
+            help='Hashes per measurement'
+        )
+
+    def time_hash(self, hasher, iterations, samples):
+        salt = hasher.salt()
+        start = time.perf_counter()
+        for _ in range(samples):
+            hasher.encode('benchmark-password', salt, iterations)
+        return (time.perf_counter() - start) / samples
+
+    def time_throughput(self, hasher, iterations, workers, samples):
+        salt = hasher.salt()
+        jobs = max(workers, 1) * samples
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            start = time.perf_counter()
+            list(executor.map(
+                lambda _: hasher.encode('benchmark-password', salt, iterations), range(jobs)
+            ))
+            return jobs / (time.perf_counter() - start)
+
+    def handle(self, *args, **options):
+        target_ms = options['target_ms']
+        workers = options['workers']
+        samples = options['samples']
+        hasher = TunablePBKDF2PasswordHasher()
+
+        self.stdout.write(
+            f'Current PBKDF2_ITERATIONS: {hasher.iterations} '
+            f'(Django default {PBKDF2PasswordHasher.iterations})'
+        )
+        self.stdout.write(
+            f'{"iterations":>12}{"ms/hash":>10}{f"hashes/s ({workers} workers)":>26}'
+        )
+
+        per_iteration = None
+        for iterations in [100000, 200000, 400000, 600000, 1000000]:
+            seconds = self.time_hash(hasher, iterations, samples)
+            throughput = self.time_throughput(hasher, iterations, workers, samples)
+            per_iteration = seconds / iterations
+            self.stdout.write(f'{iterations:>12}{seconds * 1000:>10.1f}{throughput:>26.1f}')
+
+        # Round down to 10k, but never to zero on a slow machine or a tiny target
+        suggested = max(int(target_ms / 1000 / per_iteration) // 10000 * 10000, 10000)
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f'Suggested AUTH_PBKDF2_ITERATIONS={suggested} for ~{target_ms:.0f}ms per hash'
+        ))
+        if suggested < PBKDF2PasswordHasher.iterations:
+            self.stdout.write(self.style.WARNING(
+                f'This is below Django\'s default of {PBKDF2PasswordHasher.iterations}; '
+                f'prefer a higher AUTH_HASHING_CONCURRENCY over fewer iterations.'
+            ))
+        capacity = max(workers, 1) / (suggested * per_iteration)
+        self.stdout.write(
+            f'Each process can then absorb ~{capacity:.1f} logins/s; size '
+            f'AUTH_HASHING_GLOBAL_LIMIT to the cores you can spare for hashing.'
+        )
@@ -0,0 +1,99 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+import threading
+import time
+import uuid
+import requests
+
+from benchmarks.driver import percentile
+
+
+class Command(BaseCommand):
+    help = 'Measure read-endpoint latency against a running server during a login storm'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000/api')
+        parser.add_argument(
+            '--read-path',
+            default='/movies/genres/',
+            help='Cheap read endpoint to probe'
+        )
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds per phase')
+        parser.add_argument('--readers', type=int, default=4, help='Concurrent read clients')
+        parser.add_argument('--login-clients', type=int, default=32, help='Concurrent login clients')
+
+    def run_readers(self, url, readers, stop):
+        latencies = []
+        lock = threading.Lock()
+
+        def reader():
+            session = requests.Session()
+            while not stop.is_set():
+                start = time.perf_counter()
+                session.get(url, timeout=30)
+                with lock:
+                    latencies.append((time.perf_counter() - start) * 1000)
+
+        threads = [threading.Thread(target=reader) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+        return latencies, threads
+
+    def run_logins(self, url, clients, stop):
+        statuses = {}
+        lock = threading.Lock()
+
+        def login(_):
+            session = requests.Session()
+            while not stop.is_set():
+                # Unknown users still cost a full hash, so no fixtures are needed
+                response = session.post(url, json={
+                    'username': f'storm-{uuid.uuid4().hex[:12]}',
+                    'password': 'not-a-real-password',
+                }, timeout=30)
+                with lock:
+                    statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        executor = ThreadPoolExecutor(max_workers=clients)
+        for i in range(clients):
+            executor.submit(login, i)
+        return statuses, executor
+
+    def report(self, label, latencies):
+        self.stdout.write(
+            f'{label:<14}{len(latencies):>8}'
+            f'{percentile(latencies, 50):>10.1f}{percentile(latencies, 95):>10.1f}'
+            f'{percentile(latencies, 99):>10.1f}'
+        )
+
+    def handle(self, *args, **options):
+        base_url = options['base_url'].rstrip('/')
+        read_url = f"{base_url}{options['read_path']}"
+        login_url = f'{base_url}/auth/login/'
+        duration = options['duration']
+
+        self.stdout.write(f'Probing {read_url} for {duration:.0f}s per phase...')
+
+        stop = threading.Event()
+        baseline, threads = self.run_readers(read_url, options['readers'], stop)
+        time.sleep(duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        stop = threading.Event()
+        statuses, executor = self.run_logins(login_url, options['login_clients'], stop)
+        time.sleep(1)  # let the storm build up
+        storm, threads = self.run_readers(read_url, options['readers'], stop)
+        time.sleep(duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        executor.shutdown(wait=True)
+
+        self.stdout.write(f'{"phase":<14}{"reads":>8}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}')
+        self.report('baseline', baseline)
+        self.report('login storm', storm)
+        self.stdout.write(
+            'Login responses: ' + ', '.join(f'{code}: {count}' for code, count in sorted(statuses.items()))
+        )
@@ -0,0 +1,21 @@
+from rest_framework import permissions
+from rest_framework_simplejwt.models import TokenUser
+
+from .authentication import get_cached_user
+
+
+class IsStaffUser(permissions.IsAdminUser):
+    """``IsAdminUser`` that re-checks token users against their user row
+
+    In stateless JWT mode ``request.user`` is built from the token's claims,
+    so a revoked ``is_staff`` would otherwise hold until the access token
+    expires. Staff-only views confirm it through the short-TTL user cache.
+    """
+
+    def has_permission(self, request, view):
+        if not super().has_permission(request, view):
+            return False
+        if isinstance(request.user, TokenUser):
+            user = get_cached_user(request.user.id)
+            return bool(user and user.is_active and user.is_staff)
+        return True
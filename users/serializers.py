@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
+from .services.hashing_service import hashing_service
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -21,14 +22,15 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         validated_data.pop('password_confirm')
         
-        # Create user
-        user = User.objects.create_user(
-            username=validated_data['username'],
-            email=validated_data['email'],
+        user = User(
+            username=User.normalize_username(validated_data['username']),
+            email=User.objects.normalize_email(validated_data['email']),
             first_name=validated_data.get('first_name', ''),
             last_name=validated_data.get('last_name', ''),
-            password=validated_data['password']
         )
+        # Hashing takes one of the limited hashing slots
+        hashing_service.run(user.set_password, validated_data['password'])
+        user.save()
         return user
 
 
@@ -42,7 +44,7 @@ class UserLoginSerializer(serializers.Serializer):
         password = attrs.get('password')
         
         if username and password:
-            user = authenticate(username=username, password=password)
+            user = hashing_service.run(authenticate, username=username, password=password)
             if user:
                 if not user.is_active:
                     raise serializers.ValidationError('User account is disabled.')
@@ -74,7 +76,7 @@ class ChangePasswordSerializer(serializers.Serializer):
         return attrs
     
     def validate_old_password(self, value):
-        user = self.context['request'].user
-        if not user.check_password(value):
+        user = self.context.get('user') or self.context['request'].user
+        if not hashing_service.run(user.check_password, value):
             raise serializers.ValidationError('Current password is incorrect.')
         return value
\ No newline at end of file
@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+from rest_framework.exceptions import Throttled
+import threading
+
+from movie_backend.semaphores import RedisSemaphore
+
+
+class AuthOverloaded(Throttled):
+    default_detail = 'Authentication is busy, please try again shortly.'
+    default_code = 'auth_overloaded'
+
+
+class PasswordHashingService:
+    """Admission control for password hashing
+
+    Hashing is deliberately slow, so a login burst could otherwise occupy
+    every request thread. Hashes run on the request thread, but only
+    ``CONCURRENCY`` of a process's threads (``gunicorn.conf.py``) may hash
+    at once, and only ``GLOBAL_LIMIT`` across all processes (a Redis
+    semaphore); the other threads stay free for reads. Requests over either
+    limit fail fast with a 429 instead of waiting.
+    """
+
+    def __init__(self):
+        options = getattr(settings, 'AUTH_HASHING', {})
+        self.concurrency = max(options.get('CONCURRENCY', 2), 1)
+        self.timeout = options.get('TIMEOUT', 5.0)
+        self.retry_after = options.get('RETRY_AFTER', 1)
+
+        self._slots = threading.BoundedSemaphore(self.concurrency)
+        global_limit = options.get('GLOBAL_LIMIT', 0)
+        self._global_slots = (
+            RedisSemaphore('auth_hashing', global_limit, self.timeout) if global_limit else None
+        )
+
+    def run(self, func, *args, **kwargs):
+        """Run a hashing-bound callable, raising AuthOverloaded when saturated"""
+        if not self._slots.acquire(blocking=False):
+            raise AuthOverloaded(wait=self.retry_after)
+        global_token = None
+        try:
+            if self._global_slots is not None:
+                global_token = self._global_slots.acquire()
+                if global_token is None:
+                    raise AuthOverloaded(wait=self.retry_after)
+            return func(*args, **kwargs)
+        finally:
+            if global_token is not None:
+                self._global_slots.release(global_token)
+            self._slots.release()
+
+
+hashing_service = SimpleLazyObject(PasswordHashingService)
@@ -0,0 +1,13 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import get_auth_user_key
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    """Drop the cached user row whenever it changes"""
+    cache.delete(get_auth_user_key(instance.pk))
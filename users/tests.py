@@ -1,3 +1,133 @@
-from django.test import TestCase
+import threading
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.functional import empty
+
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication, JWTStatelessUserAuthentication
+
+from movie_backend.semaphores import RedisSemaphore
+from .authentication import CachedUserJWTAuthentication, ClaimsTokenUser, get_auth_user_key, get_cached_user
+from .permissions import IsStaffUser
+from .services import hashing_service as hashing_module
+from .tokens import UserClaimsRefreshToken
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHE,
+    AUTH_HASHING={**settings.AUTH_HASHING, 'CONCURRENCY': 1, 'GLOBAL_LIMIT': 0, 'PBKDF2_ITERATIONS': 1000},
+)
+class HashingAdmissionTests(TestCase):
+    def setUp(self):
+        # Rebuilt with this class's limits, and again for the next test
+        hashing_module.hashing_service._wrapped = empty
+        self.addCleanup(setattr, hashing_module.hashing_service, '_wrapped', empty)
+        User.objects.create_user('hasher', 'hasher@example.com', 'Hash-pass-123')
+
+    def login(self):
+        return APIClient().post(
+            reverse('user-login'), {'username': 'hasher', 'password': 'Hash-pass-123'}, format='json'
+        )
+
+    def test_saturated_process_slots_fail_fast(self):
+        holding, release = threading.Event(), threading.Event()
+
+        def hold():
+            holding.set()
+            release.wait(5)
+
+        holder = threading.Thread(target=hashing_module.hashing_service.run, args=(hold,))
+        holder.start()
+        self.addCleanup(holder.join)
+        self.addCleanup(release.set)
+        self.assertTrue(holding.wait(5))
+
+        response = self.login()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], str(settings.AUTH_HASHING['RETRY_AFTER']))
+        self.assertEqual(response.data['detail'].code, 'auth_overloaded')
+
+        release.set()
+        holder.join()
+        self.assertEqual(self.login().status_code, 200)
+
+    @override_settings(AUTH_HASHING={**settings.AUTH_HASHING, 'GLOBAL_LIMIT': 2, 'PBKDF2_ITERATIONS': 1000})
+    def test_saturated_global_slots_fail_fast(self):
+        hashing_module.hashing_service._wrapped = empty
+        with mock.patch.object(RedisSemaphore, 'acquire', return_value=None) as acquire:
+            response = self.login()
+        acquire.assert_called_once()
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+        # The process slot was given back
+        self.assertEqual(self.login().status_code, 200)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class AuthModeTests(TestCase):
+    """The three JWT_AUTH_MODE authentication classes"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('member', 'member@example.com', 'Member-pass-123', is_staff=True)
+        self.token = str(UserClaimsRefreshToken.for_user(self.user).access_token)
+
+    def favorites(self, authentication_class):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        with mock.patch.object(APIView, 'authentication_classes', [authentication_class]):
+            return client.get(reverse('user-favorites'))
+
+    def assertAuthQueries(self, authentication_class, queries):
+        # The first request also fills the favorites cache
+        self.assertEqual(self.favorites(authentication_class).status_code, 200)
+        with self.assertNumQueries(queries):
+            self.assertEqual(self.favorites(authentication_class).status_code, 200)
+
+    def test_database_mode_loads_the_user_every_time(self):
+        self.assertAuthQueries(JWTAuthentication, 1)
+
+    def test_cached_mode_loads_the_user_once(self):
+        self.assertAuthQueries(CachedUserJWTAuthentication, 0)
+
+    def test_cached_mode_rejects_inactive_users(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.favorites(CachedUserJWTAuthentication).status_code, 401)
+
+    def test_stateless_mode_builds_the_user_from_claims(self):
+        self.assertAuthQueries(JWTStatelessUserAuthentication, 0)
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        user, _ = JWTStatelessUserAuthentication().authenticate(request)
+        self.assertIsInstance(user, ClaimsTokenUser)
+        self.assertEqual((user.id, user.username, user.is_staff), (self.user.id, 'member', True))
+
+    def test_cached_user_has_no_password_hash(self):
+        get_cached_user(self.user.id)
+        self.assertNotIn('password', cache.get(get_auth_user_key(self.user.id)))
+        with self.assertNumQueries(0):
+            cached = get_cached_user(self.user.id)
+        self.assertEqual((cached.pk, cached.username, cached.is_staff), (self.user.pk, 'member', True))
+        self.assertEqual(cached.password, '')
+        self.assertTrue(cached._from_cache)
+
+    def test_staff_claims_are_rechecked(self):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        user, _ = JWTStatelessUserAuthentication().authenticate(request)
+        request = SimpleNamespace(user=user)
+        self.assertTrue(IsStaffUser().has_permission(request, None))
+
+        User.objects.filter(pk=self.user.pk).update(is_staff=False)
+        cache.delete(get_auth_user_key(self.user.id))
+        # The token still claims staff
+        self.assertTrue(user.is_staff)
+        self.assertFalse(IsStaffUser().has_permission(request, None))
@@ -0,0 +1,18 @@
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+class UserClaimsRefreshToken(RefreshToken):
+    """Refresh token carrying the user claims needed by stateless auth
+
+    Access tokens copy these claims from the refresh token, so token-user
+    authentication can answer ``username``/``is_staff`` checks without a
+    database lookup.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['username'] = user.username
+        token['is_staff'] = user.is_staff
+        token['is_superuser'] = user.is_superuser
+        return token
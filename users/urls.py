@@ -1,5 +1,6 @@
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
+from movie_backend.query_budget import query_budget
 from . import views
 
 urlpatterns = [
@@ -9,7 +10,12 @@ urlpatterns = [
     path('logout/', views.UserLogoutView.as_view(), name='user-logout'),
     
     # JWT token endpoints
-    path('token/refresh/', TokenRefreshView.as_view(), name='token-refresh'),
+    # Rotation with blacklisting re-reads the user several times inside simplejwt
+    path(
+        'token/refresh/',
+        query_budget(queries=11, duplicates=4)(TokenRefreshView.as_view()),
+        name='token-refresh',
+    ),
     
     # User profile endpoints
     path('profile/', views.UserProfileView.as_view(), name='user-profile'),
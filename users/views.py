@@ -7,6 +7,10 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth.models import User
 from django.contrib.auth import login
+from movie_backend.query_budget import QueryBudget, query_budget
+from .authentication import get_full_user
+from .services.hashing_service import hashing_service
+from .tokens import UserClaimsRefreshToken
 from .serializers import (
     UserRegistrationSerializer,
     UserLoginSerializer,
@@ -18,6 +22,7 @@ from .serializers import (
 class UserRegistrationView(APIView):
     """User registration endpoint"""
     permission_classes = [permissions.AllowAny]
+    query_budget = QueryBudget(queries=3)
     
     def post(self, request):
         serializer = UserRegistrationSerializer(data=request.data)
@@ -25,7 +30,7 @@ class UserRegistrationView(APIView):
             user = serializer.save()
             
             # Generate JWT tokens
-            refresh = RefreshToken.for_user(user)
+            refresh = UserClaimsRefreshToken.for_user(user)
             
             return Response({
                 'message': 'User registered successfully',
@@ -48,6 +53,8 @@ class UserRegistrationView(APIView):
 class UserLoginView(APIView):
     """User login endpoint"""
     permission_classes = [permissions.AllowAny]
+    # Load the user, record the refresh token, update last_login
+    query_budget = QueryBudget(queries=3)
     
     def post(self, request):
         serializer = UserLoginSerializer(data=request.data)
@@ -55,7 +62,7 @@ class UserLoginView(APIView):
             user = serializer.validated_data['user']
             
             # Generate JWT tokens
-            refresh = RefreshToken.for_user(user)
+            refresh = UserClaimsRefreshToken.for_user(user)
             
             # Update last login
             login(request, user)
@@ -82,20 +89,23 @@ class UserProfileView(RetrieveUpdateAPIView):
     """User profile view (get and update)"""
     serializer_class = UserProfileSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = QueryBudget(queries=2)
     
     def get_object(self):
-        return self.request.user
+        # Writes need a fresh row; reads can use the cached one
+        return get_full_user(self.request, fresh=self.request.method not in permissions.SAFE_METHODS)
 
 
 class ChangePasswordView(APIView):
     """Change user password"""
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = QueryBudget(queries=2)
     
     def post(self, request):
-        serializer = ChangePasswordSerializer(data=request.data, context={'request': request})
+        user = get_full_user(request, fresh=True)
+        serializer = ChangePasswordSerializer(data=request.data, context={'request': request, 'user': user})
         if serializer.is_valid():
-            user = request.user
-            user.set_password(serializer.validated_data['new_password'])
+            hashing_service.run(user.set_password, serializer.validated_data['new_password'])
             user.save()
             
             return Response({
@@ -108,6 +118,8 @@ class ChangePasswordView(APIView):
 class UserLogoutView(APIView):
     """User logout endpoint"""
     permission_classes = [permissions.IsAuthenticated]
+    # Blacklisting looks the user up again inside simplejwt
+    query_budget = QueryBudget(queries=7, duplicates=1)
     
     def post(self, request):
         try:
@@ -125,16 +137,17 @@ class UserLogoutView(APIView):
             }, status=status.HTTP_400_BAD_REQUEST)
 
 
+@query_budget(queries=2)
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def user_stats(request):
     """Get user statistics"""
-    user = request.user
+    user = get_full_user(request)
     
     # Import here to avoid circular import
-    from movies.models import UserFavorite
+    from movies.services.personalization_service import personalization_service
     
-    favorite_count = UserFavorite.objects.filter(user=user).count()
+    favorite_count = len(personalization_service.get_favorite_ids(user.id))
     
     return Response({
         'user': {